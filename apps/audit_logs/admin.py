@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import reverse
 from django.utils.html import format_html
 import json
+from apps.core.pagination import EstimatedCountPaginator
 from .models import ActionLog
 
 @admin.register(ActionLog)
@@ -11,15 +12,20 @@ class ActionLogAdmin(admin.ModelAdmin):
         'related_object_link', 'ip_address', 'details_preview'
     )
     list_filter = ('action_verb', 'timestamp', 'user', 'content_type')
-    search_fields = ('user__email', 'action_verb', 'details', 'ip_address', 'object_id')
+    search_fields = ('user__email', 'action_verb', 'details', 'ip_address', 'object_id', 'request_id')
     readonly_fields = (
         'timestamp', 'user', 'action_verb', 'content_type',
-        'object_id', 'related_object', 'details', 'ip_address'
+        'object_id', 'related_object', 'details', 'ip_address',
+        'user_agent', 'request_id'
     )
     date_hierarchy = 'timestamp'
+    paginator = EstimatedCountPaginator
+    # Skip the second, unfiltered COUNT(*) the changelist runs when filtering.
+    show_full_result_count = False
 
     fieldsets = (
         (None, {'fields': ('timestamp', 'user', 'action_verb', 'ip_address')}),
+        ('Request', {'fields': ('request_id', 'user_agent')}),
         ('Related Object', {'fields': ('content_type', 'object_id', 'related_object')}),
         ('Details', {'fields': ('details',)}),
     )
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.audit_logs import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Archives action logs older than the retention window to gzipped JSONL "
+        "files and drops them, then makes sure upcoming monthly partitions exist."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=settings.AUDIT_LOG_RETENTION_MONTHS,
+            help="Number of whole months to keep in the live table.",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default=settings.AUDIT_LOG_ARCHIVE_DIR,
+            help="Directory the action_logs_YYYY_MM.jsonl.gz files are written to.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Rows fetched (and, without partitioning, deleted) per batch.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the months that would be archived.",
+        )
+
+    def handle(self, *args, **options):
+        created = partitioning.ensure_partitions(settings.AUDIT_LOG_PARTITIONS_AHEAD)
+        if created:
+            self.stdout.write(f"Partitions present: {', '.join(created)}")
+
+        processed = partitioning.apply_retention(
+            options["months"],
+            options["output_dir"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+        if not processed:
+            self.stdout.write("No action log months past the retention window.")
+            return
+
+        for start, path, count in processed:
+            month = start.strftime("%Y-%m")
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive {month}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Archived {count} rows for {month} to {path}"))
@@ -0,0 +1,44 @@
+# apps/audit_logs/middleware.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .services import async_audit_context, audit_context
+
+REQUEST_ID_HEADER = 'HTTP_X_REQUEST_ID'
+
+
+class AuditContextMiddleware:
+    """
+    Captures the client IP, user agent and a request ID once per request so
+    create_action_log can fill them in without every caller passing the
+    request. Action logs recorded during the request are written together in
+    a single bulk insert once the response has been produced.
+
+    An incoming X-Request-ID header is reused (so IDs can be correlated with
+    a proxy or client); otherwise one is generated. The ID is echoed back in
+    the X-Request-ID response header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        incoming_id = request.META.get(REQUEST_ID_HEADER, '')[:64] or None
+        with audit_context(request=request, request_id=incoming_id) as context:
+            request.audit_context = context
+            response = self.get_response(request)
+        response['X-Request-ID'] = context.request_id
+        return response
+
+    async def __acall__(self, request):
+        incoming_id = request.META.get(REQUEST_ID_HEADER, '')[:64] or None
+        async with async_audit_context(request=request, request_id=incoming_id) as context:
+            request.audit_context = context
+            response = await self.get_response(request)
+        response['X-Request-ID'] = context.request_id
+        return response
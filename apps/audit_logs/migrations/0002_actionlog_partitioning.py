@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+from apps.audit_logs import partitioning
+
+
+def partition_action_logs(apps, schema_editor):
+    if not partitioning.supports_partitioning(schema_editor.connection):
+        return
+    if partitioning.is_partitioned(schema_editor.connection):
+        return
+    partitioning.convert_to_partitioned(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit_logs', '0001_initial'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='actionlog',
+            index=models.Index(fields=['-timestamp'], name='actionlog_timestamp_idx'),
+        ),
+        # The partitioned layout keeps the same columns, so reversing only
+        # needs Django's own operations; the table stays partitioned.
+        migrations.RunPython(partition_action_logs, migrations.RunPython.noop),
+    ]
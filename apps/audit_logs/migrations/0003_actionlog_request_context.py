@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit_logs', '0002_actionlog_partitioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='actionlog',
+            name='request_id',
+            field=models.CharField(blank=True, help_text='Identifier shared by every entry logged during the same request', max_length=64, verbose_name='request ID'),
+        ),
+        migrations.AddField(
+            model_name='actionlog',
+            name='user_agent',
+            field=models.CharField(blank=True, max_length=255, verbose_name='user agent'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit_logs', '0003_actionlog_request_context'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='actionlog',
+            name='actionlog_timestamp_idx',
+        ),
+        migrations.AddIndex(
+            model_name='actionlog',
+            index=models.Index(fields=['-timestamp', '-id'], name='actionlog_timestamp_id_idx'),
+        ),
+    ]
@@ -31,12 +31,22 @@ class ActionLog(models.Model):
         help_text=_("Contextual data about the action, e.g., old/new values, parameters")
     )
     ip_address = models.GenericIPAddressField(_("IP address"), null=True, blank=True)
+    user_agent = models.CharField(_("user agent"), max_length=255, blank=True)
+    request_id = models.CharField(
+        _("request ID"),
+        max_length=64,
+        blank=True,
+        help_text=_("Identifier shared by every entry logged during the same request")
+    )
     timestamp = models.DateTimeField(_("timestamp"), auto_now_add=True)
 
     class Meta:
         verbose_name = _("action log")
         verbose_name_plural = _("action logs")
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='actionlog_timestamp_id_idx'),
+        ]
 
     def __str__(self):
         user_str = self.user.email if self.user else "System/Anonymous"
@@ -0,0 +1,354 @@
+# apps/audit_logs/partitioning.py
+"""
+Monthly range partitioning and retention for the action log table.
+
+On PostgreSQL the ``audit_logs_actionlog`` table is partitioned by month on
+``timestamp`` (see migration 0002). Old months are exported to gzipped JSONL
+files and their partitions are detached and dropped, so the live table never
+has to be vacuumed after a mass delete. Rows outside every monthly partition
+land in the DEFAULT partition; they are moved into their month's partition
+when it is created. On other backends (SQLite in
+development) the same month buckets are exported and then deleted in chunks.
+"""
+import datetime
+import gzip
+import json
+import os
+import re
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection as default_connection, transaction
+from django.utils import timezone
+
+TABLE_NAME = "audit_logs_actionlog"
+DEFAULT_PARTITION = f"{TABLE_NAME}_default"
+SEQUENCE_NAME = f"{TABLE_NAME}_part_id_seq"
+PARTITION_NAME_RE = re.compile(rf"^{TABLE_NAME}_p(\d{{4}})(\d{{2}})$")
+
+EXPORT_FIELDS = (
+    "id",
+    "user_id",
+    "action_verb",
+    "content_type_id",
+    "object_id",
+    "details",
+    "ip_address",
+    "user_agent",
+    "request_id",
+    "timestamp",
+)
+
+
+def supports_partitioning(connection=None):
+    connection = connection or default_connection
+    return connection.vendor == "postgresql"
+
+
+def month_start(value):
+    """Returns the first instant (UTC) of the month containing ``value``."""
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, datetime.timezone.utc)
+    value = value.astimezone(datetime.timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value, months):
+    month_index = value.month - 1 + months
+    return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+
+
+def partition_name(start):
+    return f"{TABLE_NAME}_p{start.year:04d}{start.month:02d}"
+
+
+def _quote(connection, name):
+    return connection.ops.quote_name(name)
+
+
+def _create_partition_sql(connection, start):
+    end = add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {_quote(connection, partition_name(start))} "
+        f"PARTITION OF {_quote(connection, TABLE_NAME)} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def create_month_partition(connection, start):
+    """
+    Creates the partition for the month starting at ``start`` unless it
+    exists. PostgreSQL refuses to create a partition for a range the DEFAULT
+    partition holds rows in, so the default partition is detached while the
+    month's rows are moved out of it and reattached afterwards. Returns
+    whether the partition was created.
+    """
+    end = add_months(start, 1)
+    table, default = _quote(connection, TABLE_NAME), _quote(connection, DEFAULT_PARTITION)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s), to_regclass(%s)", [partition_name(start), DEFAULT_PARTITION])
+        exists, has_default = cursor.fetchone()
+        if exists is not None:
+            return False
+        stranded = False
+        if has_default is not None:
+            cursor.execute(
+                f"SELECT 1 FROM {default} WHERE timestamp >= %s AND timestamp < %s LIMIT 1", [start, end]
+            )
+            stranded = cursor.fetchone() is not None
+        if not stranded:
+            cursor.execute(_create_partition_sql(connection, start))
+            return True
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+        cursor.execute(_create_partition_sql(connection, start))
+        cursor.execute(
+            f"INSERT INTO {table} SELECT * FROM {default} WHERE timestamp >= %s AND timestamp < %s",
+            [start, end],
+        )
+        cursor.execute(f"DELETE FROM {default} WHERE timestamp >= %s AND timestamp < %s", [start, end])
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+    return True
+
+
+def is_partitioned(connection=None):
+    connection = connection or default_connection
+    if not supports_partitioning(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE_NAME],
+        )
+        return cursor.fetchone() is not None
+
+
+def convert_to_partitioned(connection, months_ahead=3):
+    """
+    Rebuilds the plain action log table as a table partitioned by month.
+
+    Column definitions, indexes and foreign keys are copied from the existing
+    table so Django's view of the schema is unchanged. The primary key becomes
+    ``(id, timestamp)`` because PostgreSQL requires the partition key in every
+    unique constraint; ``id`` stays unique through its sequence.
+    """
+    legacy = f"{TABLE_NAME}_legacy"
+
+    def qn(name):
+        return _quote(connection, name)
+
+    with connection.cursor() as cursor:
+        # Index definitions are captured before the rename so they can be
+        # replayed verbatim against the new table under their original names.
+        cursor.execute(
+            "SELECT i.indexname, i.indexdef FROM pg_indexes i "
+            "JOIN pg_class c ON c.relname = i.indexname "
+            "JOIN pg_index x ON x.indexrelid = c.oid "
+            "WHERE i.tablename = %s AND NOT x.indisprimary",
+            [TABLE_NAME],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'f')",
+            [TABLE_NAME],
+        )
+        constraints = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {qn(TABLE_NAME)} RENAME TO {qn(legacy)}")
+        for index_name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {qn(index_name)} RENAME TO {qn(index_name + '_legacy')}")
+        for constraint_name, constraint_type, _ in constraints:
+            if constraint_type == "p":
+                cursor.execute(
+                    f"ALTER TABLE {qn(legacy)} RENAME CONSTRAINT {qn(constraint_name)} "
+                    f"TO {qn(constraint_name + '_legacy')}"
+                )
+
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(SEQUENCE_NAME)}")
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE_NAME)} ("
+            f"LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+            f"PRIMARY KEY (id, timestamp)"
+            f") PARTITION BY RANGE (timestamp)"
+        )
+        # LIKE does not carry the identity over to a partitioned table, so ids
+        # come from a dedicated sequence owned by the new column instead.
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE_NAME)} ALTER COLUMN id SET DEFAULT nextval('{SEQUENCE_NAME}')"
+        )
+        cursor.execute(f"ALTER SEQUENCE {qn(SEQUENCE_NAME)} OWNED BY {qn(TABLE_NAME)}.id")
+        for constraint_name, constraint_type, definition in constraints:
+            if constraint_type == "f":
+                cursor.execute(
+                    f"ALTER TABLE {qn(TABLE_NAME)} ADD CONSTRAINT {qn(constraint_name)} {definition}"
+                )
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {qn(DEFAULT_PARTITION)} "
+            f"PARTITION OF {qn(TABLE_NAME)} DEFAULT"
+        )
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', timestamp AT TIME ZONE 'UTC') FROM {qn(legacy)}"
+        )
+        months = {month_start(row[0]) for row in cursor.fetchall()}
+        current = month_start(timezone.now())
+        months.update(add_months(current, offset) for offset in range(months_ahead + 1))
+        for start in sorted(months):
+            cursor.execute(_create_partition_sql(connection, start))
+
+        # LIKE preserves the column order, so rows can be copied positionally.
+        cursor.execute(f"INSERT INTO {qn(TABLE_NAME)} SELECT * FROM {qn(legacy)}")
+        cursor.execute(
+            f"SELECT setval('{SEQUENCE_NAME}', COALESCE((SELECT MAX(id) FROM {qn(legacy)}), 0) + 1, false)"
+        )
+        cursor.execute(f"DROP TABLE {qn(legacy)}")
+
+
+def ensure_partitions(months_ahead=3, connection=None):
+    """
+    Creates partitions for the current month and the next ``months_ahead``
+    months. Safe to run repeatedly; a no-op on non-PostgreSQL backends.
+    """
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return []
+    current = month_start(timezone.now())
+    created = []
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        create_month_partition(connection, start)
+        created.append(partition_name(start))
+    return created
+
+
+def list_partitions(connection=None):
+    """Returns ``(start, name)`` for every monthly partition, oldest first."""
+    connection = connection or default_connection
+    if not is_partitioned(connection):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [TABLE_NAME],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            start = datetime.datetime(
+                int(match.group(1)), int(match.group(2)), 1, tzinfo=datetime.timezone.utc
+            )
+            partitions.append((start, name))
+    return sorted(partitions)
+
+
+def expired_months(retention_months, connection=None):
+    """
+    Returns the month starts that fall entirely before the retention cutoff
+    and still hold (or may hold) rows, including old rows that sit in the
+    DEFAULT partition because their month never had a partition.
+    """
+    from .models import ActionLog
+
+    connection = connection or default_connection
+    cutoff = add_months(month_start(timezone.now()), -retention_months)
+    if is_partitioned(connection):
+        months = {start for start, _ in list_partitions(connection) if start < cutoff}
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [DEFAULT_PARTITION])
+            if cursor.fetchone()[0] is not None:
+                cursor.execute(
+                    f"SELECT DISTINCT date_trunc('month', timestamp AT TIME ZONE 'UTC') "
+                    f"FROM {_quote(connection, DEFAULT_PARTITION)} WHERE timestamp < %s",
+                    [cutoff],
+                )
+                months.update(month_start(row[0]) for row in cursor.fetchall())
+        return sorted(months)
+
+    oldest = ActionLog.objects.order_by("timestamp").values_list("timestamp", flat=True).first()
+    if oldest is None:
+        return []
+    months = []
+    start = month_start(oldest)
+    while start < cutoff:
+        months.append(start)
+        start = add_months(start, 1)
+    return months
+
+
+def export_month(start, output_dir, chunk_size=5000):
+    """
+    Streams one month of action logs to ``action_logs_YYYY_MM.jsonl.gz`` in
+    ``output_dir`` and returns ``(path, row_count)``. The file is written
+    under a temporary name and renamed once complete.
+    """
+    from .models import ActionLog
+
+    end = add_months(start, 1)
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"action_logs_{start.year:04d}_{start.month:02d}.jsonl.gz")
+    tmp_path = f"{path}.part"
+
+    rows = (
+        ActionLog.objects.filter(timestamp__gte=start, timestamp__lt=end)
+        .order_by()
+        .values(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    count = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+        for row in rows:
+            handle.write(json.dumps(row, cls=DjangoJSONEncoder))
+            handle.write("\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return path, count
+
+
+def drop_month(start, chunk_size=5000, connection=None):
+    """
+    Removes one month of action logs. On PostgreSQL the whole partition is
+    detached and dropped (rows of the month left in the DEFAULT partition are
+    moved into it first); elsewhere rows are deleted in primary-key chunks so
+    no single statement holds a long write lock.
+    """
+    from .models import ActionLog
+
+    connection = connection or default_connection
+    if is_partitioned(connection):
+        name = _quote(connection, partition_name(start))
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            create_month_partition(connection, start)
+            cursor.execute(f"ALTER TABLE {_quote(connection, TABLE_NAME)} DETACH PARTITION {name}")
+            cursor.execute(f"DROP TABLE {name}")
+        return
+
+    end = add_months(start, 1)
+    queryset = ActionLog.objects.filter(timestamp__gte=start, timestamp__lt=end).order_by("pk")
+    while True:
+        pks = list(queryset.values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            break
+        ActionLog.objects.filter(pk__in=pks).delete()
+
+
+def apply_retention(retention_months, output_dir, chunk_size=5000, dry_run=False):
+    """
+    Archives and drops every month older than ``retention_months``. Returns a
+    list of ``(month_start, path, row_count)`` for the months processed.
+    """
+    processed = []
+    for start in expired_months(retention_months):
+        if dry_run:
+            processed.append((start, None, None))
+            continue
+        path, count = export_month(start, output_dir, chunk_size=chunk_size)
+        drop_month(start, chunk_size=chunk_size)
+        processed.append((start, path, count))
+    return processed
@@ -11,7 +11,8 @@ class ActionLogSerializer(serializers.ModelSerializer):
         model = ActionLog
         fields = (
             'id', 'user', 'action_verb', 'content_type_str', 'object_id',
-            'related_object_str', 'details', 'ip_address', 'timestamp'
+            'related_object_str', 'details', 'ip_address', 'user_agent',
+            'request_id', 'timestamp'
         )
         read_only_fields = fields 
 
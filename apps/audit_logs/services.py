@@ -1,6 +1,15 @@
+import contextvars
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from .models import ActionLog
 
+_audit_context = contextvars.ContextVar("audit_context", default=None)
+
+
 def get_client_ip(request):
     """Helper function to get client's IP address from request."""
     if not request:
@@ -12,6 +21,97 @@ def get_client_ip(request):
         ip = request.META.get('REMOTE_ADDR')
     return ip
 
+
+class AuditContext:
+    """
+    Request metadata shared by every action log written while handling one
+    request. Entries are buffered in ``pending`` and written in one batch
+    when the request completes. An entry recorded inside a transaction only
+    joins the buffer once that transaction commits, so rolled-back changes
+    leave no audit trail.
+    """
+
+    def __init__(self, request=None, request_id=None):
+        self.request = request
+        self.ip_address = get_client_ip(request)
+        self.user_agent = request.META.get('HTTP_USER_AGENT', '')[:255] if request else ''
+        self.request_id = request_id or uuid.uuid4().hex
+        self.pending = []
+        self.closed = False
+
+    @property
+    def user(self):
+        # Read lazily: DRF authenticates inside the view and then sets the
+        # user on the underlying HttpRequest, after the middleware has run.
+        user = getattr(self.request, 'user', None)
+        return user if user and user.is_authenticated else None
+
+    def add(self, entry):
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(lambda: self._buffer(entry))
+        else:
+            self._buffer(entry)
+
+    def _buffer(self, entry):
+        # A transaction committing after the request finished writes directly.
+        if self.closed:
+            entry.save()
+        else:
+            self.pending.append(entry)
+
+    def discard(self):
+        self.pending = []
+
+    def flush(self):
+        if not self.pending:
+            return []
+        entries, self.pending = self.pending, []
+        return ActionLog.objects.bulk_create(entries)
+
+
+def get_audit_context():
+    return _audit_context.get()
+
+
+@contextmanager
+def audit_context(request=None, request_id=None):
+    """
+    Opens an audit context for the duration of the block and flushes the
+    buffered action logs when it exits normally. If the block raised, the
+    buffer is dropped and the exception propagates untouched.
+    """
+    context = AuditContext(request=request, request_id=request_id)
+    token = _audit_context.set(context)
+    try:
+        yield context
+    except BaseException:
+        context.discard()
+        raise
+    else:
+        context.flush()
+    finally:
+        context.closed = True
+        _audit_context.reset(token)
+
+
+@asynccontextmanager
+async def async_audit_context(request=None, request_id=None):
+    """Async counterpart of audit_context, for async middleware."""
+    context = AuditContext(request=request, request_id=request_id)
+    token = _audit_context.set(context)
+    try:
+        yield context
+    except BaseException:
+        context.discard()
+        raise
+    else:
+        if context.pending:
+            await sync_to_async(context.flush)()
+    finally:
+        context.closed = True
+        _audit_context.reset(token)
+
+
 def create_action_log(
     user, 
     action_verb, 
@@ -21,21 +121,86 @@ def create_action_log(
 ):
     """
     Creates an ActionLog entry.
+
+    Inside a request (see AuditContextMiddleware) the user, IP address, user
+    agent and request ID default to the request's, and the entry is written
+    together with the request's other entries when the response is ready,
+    provided the transaction it was recorded in commits. Outside a request
+    the entry is saved immediately.
     """
+    context = get_audit_context()
     content_type = None
     object_id = None
-    ip_address = get_client_ip(request) if request else None
+
+    if user is None and context is not None:
+        user = context.user
+    if request is not None:
+        ip_address = get_client_ip(request)
+    else:
+        ip_address = context.ip_address if context else None
 
     if related_object:
         content_type = ContentType.objects.get_for_model(related_object)
         object_id = related_object.pk
 
-    ActionLog.objects.create(
+    entry = ActionLog(
         user=user if user and user.is_authenticated else None,
         action_verb=action_verb,
         content_type=content_type,
         object_id=object_id,
         details=details or {},
-        ip_address=ip_address
+        ip_address=ip_address,
+        user_agent=context.user_agent if context else '',
+        request_id=context.request_id if context else '',
+    )
+    if context is not None:
+        context.add(entry)
+    else:
+        entry.save()
+    return entry
+
+
+def _audit_value(value):
+    return None if value is None else str(value)
+
+
+def _related_display(field, pk):
+    if pk is None:
+        return 'None'
+    related = field.related_model._default_manager.filter(pk=pk).first()
+    return str(related) if related is not None else str(pk)
+
+
+def _change_entry(instance, field_name, old_value, new_value):
+    field = instance._meta.get_field(field_name)
+    if not field.is_relation:
+        return {'old': _audit_value(old_value), 'new': _audit_value(new_value)}
+    # Foreign keys keep their ids and add the names people read in the log.
+    return {
+        'old': old_value,
+        'new': new_value,
+        'old_display': _related_display(field, old_value),
+        'new_display': _related_display(field, new_value),
+    }
+
+
+def log_model_changes(instance, action_verb, user=None, details=None):
+    """
+    Logs the fields changed by the last save of a TrackedModelMixin instance.
+    Foreign keys are logged by id with ``old_display``/``new_display`` names.
+    Nothing is written when the save did not change any tracked field.
+    """
+    changes = getattr(instance, 'saved_changes', None)
+    if not changes:
+        return None
+    details = dict(details or {})
+    details['changes'] = {
+        field_name: _change_entry(instance, field_name, old_value, new_value)
+        for field_name, (old_value, new_value) in changes.items()
+    }
+    return create_action_log(
+        user=user,
+        action_verb=action_verb,
+        related_object=instance,
+        details=details,
     )
-    print(f"Audit Log: User '{user if user else 'System'}' performed '{action_verb}' on '{related_object if related_object else 'N/A'}'")
\ No newline at end of file
@@ -0,0 +1,80 @@
+# apps/audit_logs/tracking.py
+
+
+class TrackedModelMixin:
+    """
+    Model mixin that remembers the field values a row was loaded with, so the
+    fields changed since then can be computed on save without re-fetching the
+    row. After every save the changes are available as ``saved_changes``
+    ({field name: (old value, new value)}) for audit logging.
+
+    Primary keys and ``auto_now`` timestamps are not tracked; foreign keys are
+    compared by their raw ``<name>_id`` value.
+    """
+    tracked_exclude = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _tracked_fields(self):
+        for field in self._meta.concrete_fields:
+            if field.primary_key or getattr(field, "auto_now", False):
+                continue
+            if field.name in self.tracked_exclude:
+                continue
+            yield field
+
+    def _snapshot_loaded_values(self, fields=None):
+        """
+        Records the current values as loaded: all of them, or only those of
+        ``fields`` (names or attnames) so edits to other fields stay pending.
+        """
+        loaded = {} if fields is None else dict(getattr(self, "_loaded_values", None) or {})
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            if field.attname in self.__dict__:
+                loaded[field.attname] = self.__dict__[field.attname]
+        self._loaded_values = loaded
+
+    def get_changed_fields(self):
+        loaded = getattr(self, "_loaded_values", None)
+        if not loaded:
+            return {}
+        changes = {}
+        for field in self._tracked_fields():
+            # Deferred fields were never loaded, so there is nothing to compare.
+            if field.attname not in loaded or field.attname not in self.__dict__:
+                continue
+            old_value = loaded[field.attname]
+            new_value = self.__dict__[field.attname]
+            if old_value != new_value:
+                changes[field.name] = (old_value, new_value)
+        return changes
+
+    def has_changed(self, field_name):
+        return field_name in self.get_changed_fields()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+        changes = self.get_changed_fields()
+        if update_fields is not None:
+            # Only the listed fields are written; the rest stay pending.
+            changes = {
+                name: change for name, change in changes.items()
+                if name in update_fields or self._meta.get_field(name).attname in update_fields
+            }
+        self.saved_changes = changes
+        super().save(*args, **kwargs)
+        self._snapshot_loaded_values(update_fields)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # Deferred-field loads refresh single fields; unsaved edits to the
+        # others must survive them.
+        self._snapshot_loaded_values(None if fields is None else set(fields))
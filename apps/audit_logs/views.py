@@ -1,16 +1,82 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from .models import ActionLog
 from .serializers import ActionLogSerializer
 from apps.users.permissions import IsAdminUserRole, IsWarehouseManagerRole 
+from apps.core.exports import ExportMixin
+from apps.core.pagination import KeysetCursorPagination
+
+
+def parse_timestamp_param(value, param_name):
+    """Accepts an ISO date or datetime query parameter and returns an aware datetime."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ValidationError({param_name: "Enter a valid ISO date or datetime."})
+        parsed = datetime.combine(parsed_date, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
 
-class ActionLogViewSet(viewsets.ReadOnlyModelViewSet):
+class ActionLogViewSet(ExportMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for viewing action logs.
     Only accessible by Admins or Warehouse Managers.
+
+    Results can be limited to a time window so that, with the table
+    partitioned by month, only the partitions covering that window are
+    scanned:
+    - since: ISO date/datetime lower bound (inclusive)
+    - until: ISO date/datetime upper bound (exclusive)
+    - recent: set to true to default ``since`` to AUDIT_LOG_DEFAULT_WINDOW_DAYS
+      ago; the effective lower bound is echoed in the X-Window-Since header
+    Without any of them every log is listed. The same window applies to the
+    streaming `export/` action.
     """
-    queryset = ActionLog.objects.select_related('user', 'content_type').all()
+    queryset = ActionLog.objects.select_related('user', 'content_type').prefetch_related('related_object')
     serializer_class = ActionLogSerializer
     permission_classes = [IsAuthenticated, (IsAdminUserRole | IsWarehouseManagerRole)]
     filterset_fields = ['user__email', 'action_verb', 'content_type__model', 'ip_address'] 
     search_fields = ['user__email', 'action_verb', 'details', 'object_id'] 
+    pagination_class = KeysetCursorPagination
+    ordering = ('-timestamp', '-id')
+    export_fields = (
+        'id', 'timestamp', 'user_id', 'user__email', 'action_verb', 'content_type__model',
+        'object_id', 'details', 'ip_address', 'user_agent', 'request_id',
+    )
+    export_filename = 'action-logs'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'export'):
+            return queryset
+
+        params = self.request.query_params
+        since_param = params.get('since')
+        until_param = params.get('until')
+        since = None
+        if since_param:
+            since = parse_timestamp_param(since_param, 'since')
+        elif params.get('recent', '').lower() in ('1', 'true', 'yes'):
+            since = timezone.now() - timedelta(days=settings.AUDIT_LOG_DEFAULT_WINDOW_DAYS)
+        self.window_since = since
+        if since is not None:
+            queryset = queryset.filter(timestamp__gte=since)
+        if until_param:
+            queryset = queryset.filter(timestamp__lt=parse_timestamp_param(until_param, 'until'))
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        since = getattr(self, 'window_since', None)
+        if since is not None:
+            response['X-Window-Since'] = since.isoformat()
+        return response
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('containers', '0004_container_bank_charges_container_discharge_and_more'),
+        ('inventory', '0010_producttransferlog_transferlog_timestamp_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='container',
+            index=models.Index(fields=['-updated_at', '-id'], name='container_updated_id_idx'),
+        ),
+    ]
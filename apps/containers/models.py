@@ -1,8 +1,9 @@
 from django.db import models, transaction
-from django.db.models import Sum, F, DecimalField
+from django.db.models import Sum, F, DecimalField, OuterRef, Subquery
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from decimal import Decimal  
+from apps.audit_logs.tracking import TrackedModelMixin
 
 
 class ContainerCodeSequence(models.Model):
@@ -21,7 +22,30 @@ class ContainerCodeSequence(models.Model):
             return sequence.current_number
 
 
-class Container(models.Model):
+class ContainerQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Annotates the product cost and revenue sums read by
+        calculate_purchased_cost and calculate_expected_revenue, so a list
+        of containers doesn't aggregate their products one by one.
+        """
+        products = (
+            self.model._meta.get_field("products").related_model.objects
+            .filter(container=OuterRef("pk"))
+            .order_by()
+            .values("container")
+        )
+        return self.annotate(
+            purchased_cost_total=Subquery(products.annotate(total=Sum("cost_of_product")).values("total")),
+            expected_revenue_total=Subquery(products.annotate(total=Sum("selling_price")).values("total")),
+        )
+
+    def with_details(self):
+        """with_totals() plus the related rows ContainerSerializer shows."""
+        return self.with_totals().select_related("current_warehouse__created_by", "created_by")
+
+
+class Container(TrackedModelMixin, models.Model):
     class ContainerStatus(models.TextChoices):
         EMPTY = "EM", _("Empty")
         AVAILABLE = "AV", _("Available")
@@ -92,8 +116,10 @@ class Container(models.Model):
         Calculate the sum of the cost_of_product for all products in this container.
         Ensures the return type is Decimal.
         """
-        aggregation = self.products.aggregate(total_cost=Sum("cost_of_product"))
-        total_cost_value = aggregation["total_cost"]
+        if hasattr(self, "purchased_cost_total"):
+            total_cost_value = self.purchased_cost_total
+        else:
+            total_cost_value = self.products.aggregate(total_cost=Sum("cost_of_product"))["total_cost"]
         if total_cost_value is None:
             return Decimal("0.00")
         # Explicitly convert to Decimal, handling potential float from aggregation
@@ -104,8 +130,10 @@ class Container(models.Model):
         Calculate the sum of the selling_price for all products in this container.
         Ensures the return type is Decimal.
         """
-        aggregation = self.products.aggregate(total_revenue=Sum("selling_price"))
-        total_revenue_value = aggregation["total_revenue"]
+        if hasattr(self, "expected_revenue_total"):
+            total_revenue_value = self.expected_revenue_total
+        else:
+            total_revenue_value = self.products.aggregate(total_revenue=Sum("selling_price"))["total_revenue"]
         if total_revenue_value is None:
             return Decimal("0.00")
         return Decimal(str(total_revenue_value))
@@ -174,10 +202,15 @@ class Container(models.Model):
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
     updated_at = models.DateTimeField(_("updated at"), auto_now=True)
 
+    objects = ContainerQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("container")
         verbose_name_plural = _("containers")
         ordering = ["-updated_at", "container_id_code"]
+        indexes = [
+            models.Index(fields=["-updated_at", "-id"], name="container_updated_id_idx"),
+        ]
 
     # def save(self, *args, **kwargs):
     #     if not self.container_id_code:
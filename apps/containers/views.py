@@ -4,21 +4,24 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from django.db import transaction, models
+from django.db import transaction
 from rest_framework.authentication import SessionAuthentication, TokenAuthentication
 
 
 from .models import Container
 from .serializers import ContainerSerializer
 from apps.users.permissions import IsAdminUserRole, IsWarehouseManagerRole
-from apps.audit_logs.services import create_action_log
+from apps.audit_logs.services import create_action_log, log_model_changes
 from apps.inventory.models import Warehouse
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.pagination import KeysetCursorPagination
 
 
-class ContainerViewSet(viewsets.ModelViewSet):
-    queryset = Container.objects.select_related("current_warehouse", "created_by").all()
+class ContainerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Container.objects.with_details()
     serializer_class = ContainerSerializer  # Use the main serializer for all actions
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
 
     # permission_classes = [IsAuthenticated, IsAdminUserRole | IsWarehouseManagerRole]
     # permission_classes = [permissions.AllowAny]
@@ -51,7 +54,7 @@ class ContainerViewSet(viewsets.ModelViewSet):
         "created_at",
         "current_warehouse__name",
     ]
-    ordering = ["-updated_at"]
+    ordering = ["-updated_at", "-id"]
 
     def perform_create(self, serializer):
         container = serializer.save(created_by=self.request.user)
@@ -67,59 +70,13 @@ class ContainerViewSet(viewsets.ModelViewSet):
         )
 
     def perform_update(self, serializer):
-        instance_before_update = Container.objects.select_related(
-            "current_warehouse"
-        ).get(pk=self.get_object().pk)
-
-        updated_fields_data = serializer.validated_data
-        changed_fields_log = {}
-
-        for field_name, new_value in updated_fields_data.items():
-            old_value = getattr(instance_before_update, field_name)
-            if isinstance(old_value, models.Model) and isinstance(
-                new_value, models.Model
-            ):
-                if old_value.pk != new_value.pk:
-                    changed_fields_log[field_name] = {
-                        "old": old_value.pk if old_value else None,
-                        "new": new_value.pk if new_value else None,
-                        "old_display": str(old_value) if old_value else "None",
-                        "new_display": str(new_value) if new_value else "None",
-                    }
-            elif isinstance(old_value, models.Model) and new_value is None:
-                if old_value is not None:
-                    changed_fields_log[field_name] = {
-                        "old": old_value.pk,
-                        "new": None,
-                        "old_display": str(old_value),
-                        "new_display": "None",
-                    }
-            elif old_value is None and isinstance(new_value, models.Model):
-                if new_value is not None:
-                    changed_fields_log[field_name] = {
-                        "old": None,
-                        "new": new_value.pk,
-                        "old_display": "None",
-                        "new_display": str(new_value),
-                    }
-            elif old_value != new_value:
-                changed_fields_log[field_name] = {
-                    "old": str(old_value),
-                    "new": str(new_value),
-                }
-
         container = serializer.save()
-
-        if changed_fields_log:
-            create_action_log(
-                user=self.request.user,
-                action_verb="CONTAINER_UPDATED",
-                related_object=container,
-                details={
-                    "id_code": container.container_id_code,
-                    "changes": changed_fields_log,
-                },
-            )
+        log_model_changes(
+            container,
+            "CONTAINER_UPDATED",
+            user=self.request.user,
+            details={"id_code": container.container_id_code},
+        )
 
     def perform_destroy(self, instance):
         create_action_log(
@@ -0,0 +1,74 @@
+# apps/core/async_api.py
+"""
+Helpers for native async JSON endpoints.
+
+DRF views are synchronous, so the hottest read paths are plain Django async
+views instead: they authenticate with the same stateless JWT scheme, query
+through the async ORM and render with the same JSON renderer as the API.
+Under an ASGI server (uvicorn, daphne) a worker can serve many of these
+concurrently while they wait on the database.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+
+from .renderers import FastJSONRenderer
+
+_renderer = FastJSONRenderer()
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        _renderer.render(data), status=status, content_type="application/json", headers=headers
+    )
+
+
+def async_api_view(view):
+    """
+    Wraps an ``async def view(request, ...)``: allows GET/HEAD only and sets
+    ``request.user`` from the JWT access token, answering 401 like DRF does.
+    Token-authenticated, so exempt from CSRF like DRF's APIView.
+    """
+
+    @csrf_exempt
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        from apps.users.authentication import StatelessJWTAuthentication
+
+        if request.method not in ("GET", "HEAD"):
+            return json_response(
+                {"detail": f'Method "{request.method}" not allowed.'},
+                status=status.HTTP_405_METHOD_NOT_ALLOWED,
+                headers={"Allow": "GET, HEAD"},
+            )
+        authenticator = StatelessJWTAuthentication()
+        challenge = {"WWW-Authenticate": authenticator.authenticate_header(request)}
+        try:
+            result = await sync_to_async(authenticator.authenticate)(request)
+        except AuthenticationFailed as exc:
+            return json_response(
+                exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail},
+                status=status.HTTP_401_UNAUTHORIZED,
+                headers=challenge,
+            )
+        if result is None:
+            return json_response(
+                {"detail": "Authentication credentials were not provided."},
+                status=status.HTTP_401_UNAUTHORIZED,
+                headers=challenge,
+            )
+        request.user, request.auth = result
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def bounded_int(value, default, maximum):
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        return default
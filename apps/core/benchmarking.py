@@ -0,0 +1,174 @@
+# apps/core/benchmarking.py
+"""
+Latency, query count and memory benchmarks for the API's viewsets.
+
+Every list route registered under ``apps/`` (see testing.list_viewset_routes)
+is requested through the Django test client, followed by the detail route of
+the first row it returns. Each endpoint gets warm-up requests, then timed
+requests for the latency percentiles, with queries counted on every
+connection. A final request runs under tracemalloc for peak memory, which is
+kept out of the timed runs because tracing slows every allocation down.
+
+Results are plain JSON so a run can be saved as a baseline and later runs
+compared against it with ``compare_results``.
+"""
+import json
+import math
+import platform
+import time
+import tracemalloc
+
+from django.db import connection
+from django.test import Client
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+
+from .middleware import QueryStats, instrument_queries
+from .testing import list_viewset_routes
+
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+# List requests ask for this many rows; unpaginated views would otherwise
+# return the whole table.
+BENCHMARK_PAGE_SIZE = 50
+# Latency changes smaller than this are timer and scheduler noise.
+LATENCY_NOISE_MS = 1.0
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _first_pk(response):
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    rows = data.get("results") if isinstance(data, dict) else data
+    if rows and isinstance(rows[0], dict):
+        return rows[0].get("id")
+    return None
+
+
+def measure(client, url, params=None, iterations=30, warmup=3):
+    """Requests ``url`` repeatedly and returns its metrics (and the last response)."""
+    for _ in range(warmup):
+        client.get(url, params)
+
+    stats = QueryStats()
+    latencies, query_counts = [], []
+    response = None
+    for _ in range(iterations):
+        queries_before = stats.count
+        with instrument_queries(stats):
+            start = time.perf_counter()
+            response = client.get(url, params)
+            latencies.append((time.perf_counter() - start) * 1000)
+        query_counts.append(stats.count - queries_before)
+
+    tracemalloc.start()
+    try:
+        client.get(url, params)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    metrics = {
+        "url": url,
+        "status": response.status_code,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "queries": max(query_counts),
+        "peak_memory_kib": round(peak / 1024, 1),
+        "response_kib": round(len(response.content) / 1024, 1),
+    }
+    return metrics, response
+
+
+def run_benchmarks(user, iterations=30, warmup=3, only=None, log=None):
+    """
+    Benchmarks every list route and its detail route as ``user``, authenticated
+    with a JWT bearer token like a real client. ``only`` limits the run to the
+    given URL names.
+    """
+    from apps.users.serializers import MyTokenObtainPairSerializer
+
+    log = log or (lambda message: None)
+    token = MyTokenObtainPairSerializer.get_token(user).access_token
+    client = Client(headers={"authorization": f"Bearer {token}"})
+    endpoints = {}
+
+    for url_name, _, _ in list_viewset_routes():
+        detail_name = url_name[: -len("-list")] + "-detail" if url_name.endswith("-list") else None
+        if only and url_name not in only and detail_name not in only:
+            continue
+        params = {"page_size": BENCHMARK_PAGE_SIZE}
+        metrics, response = measure(client, reverse(url_name), params, iterations, warmup)
+        if not only or url_name in only:
+            endpoints[url_name] = metrics
+            log(f"{url_name}: p95 {metrics['p95_ms']} ms, {metrics['queries']} queries")
+
+        pk = _first_pk(response) if response.status_code == 200 else None
+        if detail_name is None or pk is None or (only and detail_name not in only):
+            continue
+        try:
+            detail_url = reverse(detail_name, kwargs={"pk": pk})
+        except NoReverseMatch:
+            continue
+        endpoints[detail_name], _ = measure(client, detail_url, None, iterations, warmup)
+        log(f"{detail_name}: p95 {endpoints[detail_name]['p95_ms']} ms, "
+            f"{endpoints[detail_name]['queries']} queries")
+
+    return {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "iterations": iterations,
+            "warmup": warmup,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def compare_results(current, baseline, tolerance=0.25):
+    """
+    Returns one ``(endpoint, metric, baseline value, current value)`` tuple per
+    regression. Latency and memory may grow by ``tolerance`` (a fraction)
+    before they count, and latency also by at least LATENCY_NOISE_MS; any
+    increase in the query count is a regression.
+    Endpoints missing from either run are ignored.
+    """
+    regressions = []
+    for name, before in baseline.get("endpoints", {}).items():
+        after = current.get("endpoints", {}).get(name)
+        if after is None:
+            continue
+        if after["status"] != before["status"]:
+            regressions.append((name, "status", before["status"], after["status"]))
+        if after["queries"] > before["queries"]:
+            regressions.append((name, "queries", before["queries"], after["queries"]))
+        for metric in LATENCY_METRICS + ("peak_memory_kib",):
+            if after[metric] <= before[metric] * (1 + tolerance):
+                continue
+            if metric in LATENCY_METRICS and after[metric] - before[metric] < LATENCY_NOISE_MS:
+                continue
+            regressions.append((name, metric, before[metric], after[metric]))
+    return regressions
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_results(results, path):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+        handle.write("\n")
@@ -0,0 +1,190 @@
+# apps/core/caching.py
+"""
+Versioned response caching for read-mostly endpoints.
+
+Each cached model has a version counter in the shared cache that is bumped
+whenever a row is saved or deleted (see the signal receivers in the owning
+apps). Response cache keys include the current versions of every model a
+response depends on, so a write makes all older entries unreachable without
+having to find and delete them.
+
+Rendered responses are kept in two tiers: a small in-process LRU (entries
+live at most RESPONSE_CACHE_LRU_TIMEOUT seconds) in front of the
+RESPONSE_CACHE_ALIAS cache (Redis through django-redis in production).
+The key digest doubles as the ETag, so a matching If-None-Match gets a 304
+without touching the database at all.
+
+Versions are bumped once the writing transaction commits, so a reader can
+never cache uncommitted data under the new version. They must live in a
+shared default cache: with a per-process cache a worker would never see
+another worker's bumps, so caching is switched off there.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .metrics import record_cache_lookup
+
+VERSION_KEY_PREFIX = "model-version"
+
+# Backends whose entries live in (and die with) one worker process.
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def cache_is_shared(alias="default"):
+    """Whether every worker process reads and writes the same ``alias`` cache."""
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_BACKENDS
+
+
+def _version_key(model):
+    return f"{VERSION_KEY_PREFIX}:{model._meta.label_lower}"
+
+
+def get_model_versions(models):
+    """Returns the current version of each model, in order, with one cache round trip."""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed evicted counters with the clock so they never fall back to
+            # a value that older cache entries were keyed with.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _bump(model):
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_model_version(model):
+    """Invalidates cached responses for ``model`` once the current transaction commits."""
+    transaction.on_commit(lambda: _bump(model))
+
+
+def bump_model_version_receiver(sender, **kwargs):
+    """post_save/post_delete receiver; connect it for every cached model."""
+    bump_model_version(sender)
+
+
+class LRUCache:
+    """A tiny thread-safe in-process LRU map whose entries expire after ``timeout`` seconds."""
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            expires_at, value = self._data[key]
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_responses = LRUCache(settings.RESPONSE_CACHE_LRU_SIZE, settings.RESPONSE_CACHE_LRU_TIMEOUT)
+
+
+class CachedResponseMixin:
+    """
+    Caches rendered JSON ``list`` and ``retrieve`` responses of a viewset.
+
+    - cache_models: models whose rows appear in the response (including
+      nested serializers); a write to any of them invalidates the entry.
+    - cache_per_user: set when the queryset or payload depends on who is
+      asking, e.g. role-scoped user lookups.
+    """
+    cache_models = ()
+    cache_per_user = False
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(request, super().retrieve, *args, **kwargs)
+
+    def get_response_cache_key(self, request):
+        versions = get_model_versions(self.cache_models or (self.get_queryset().model,))
+        parts = [
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.action,
+            request.path,
+            "&".join(sorted(request.GET.urlencode().split("&"))),
+            ",".join(str(version) for version in versions),
+        ]
+        if self.cache_per_user:
+            parts.append(str(request.user.pk))
+        return "response:" + hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+    def _cached(self, request, handler, *args, **kwargs):
+        # Only JSON is cached: the browsable API embeds per-request markup.
+        if request.accepted_renderer.format != "json" or not cache_is_shared():
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        etag = f'"{key.split(":", 1)[1]}"'
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        cached = local_responses.get(key)
+        if cached is None:
+            cached = caches[settings.RESPONSE_CACHE_ALIAS].get(key)
+            if cached is not None:
+                local_responses.set(key, cached)
+        record_cache_lookup("responses", hit=cached is not None)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response["ETag"] = etag
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+
+            def store(rendered):
+                value = (rendered.content, rendered["Content-Type"])
+                local_responses.set(key, value)
+                caches[settings.RESPONSE_CACHE_ALIAS].set(
+                    key, value, timeout=settings.RESPONSE_CACHE_TIMEOUT
+                )
+
+            response.add_post_render_callback(store)
+        return response
@@ -0,0 +1,83 @@
+# apps/core/conditional.py
+"""
+Conditional GET (ETag / Last-Modified) for list and detail endpoints.
+
+Validators are derived without serializing anything: for a list, from
+MAX(updated_at) and COUNT(*) of the filtered queryset (the count catches
+deletions, which don't move the maximum); for a detail, from the instance's
+own updated_at. Changes to related rows that don't touch ``updated_at`` are
+not reflected.
+"""
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def _make_etag(*parts):
+    return '"%s"' % hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+class ConditionalGetMixin:
+    """
+    Answers unchanged ``list`` and ``retrieve`` requests with 304 Not Modified.
+    The model must have an auto-updated ``last_modified_field``.
+    """
+    last_modified_field = "updated_at"
+
+    def _not_modified(self, request, etag, last_modified):
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def _set_validators(self, response, etag, last_modified):
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(timegm(last_modified.utctimetuple()))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        state = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field), count=Count("pk")
+        )
+        # The same rows can be visible to different users through different
+        # role scopes, and paginated pages differ by query string.
+        etag = _make_etag(
+            request.get_full_path(),
+            request.user.pk,
+            request.accepted_renderer.format,
+            state["count"],
+            state["last_modified"] and state["last_modified"].isoformat(),
+        )
+        not_modified = self._not_modified(request, etag, state["last_modified"])
+        if not_modified is not None:
+            return not_modified
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+        else:
+            serializer = self.get_serializer(queryset, many=True)
+            response = Response(serializer.data)
+        return self._set_validators(response, etag, state["last_modified"])
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = getattr(instance, self.last_modified_field)
+        etag = _make_etag(
+            instance._meta.label_lower,
+            instance.pk,
+            request.user.pk,
+            request.accepted_renderer.format,
+            last_modified and last_modified.isoformat(),
+        )
+        not_modified = self._not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return self._set_validators(Response(serializer.data), etag, last_modified)
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from apps.core.benchmarking import compare_results, load_results, run_benchmarks, save_results
+from apps.core.seeding import DEFAULT_VOLUMES, DatasetSeeder, scaled_volumes
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a dataset into a throwaway test database, benchmarks every API list "
+        "and detail endpoint (p50/p95/p99 latency, queries, peak memory) and writes "
+        "the results as JSON. With --baseline, exits non-zero on regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the default volumes.")
+        for name in DEFAULT_VOLUMES:
+            parser.add_argument(
+                f"--{name.replace('_', '-')}", type=int, dest=name,
+                help=f"Rows of {name.replace('_', ' ')} to seed (default {DEFAULT_VOLUMES[name]} x scale).",
+            )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the dataset.")
+        parser.add_argument("--iterations", type=int, default=30, help="Timed requests per endpoint.")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests per endpoint.")
+        parser.add_argument(
+            "--endpoint", action="append", dest="endpoints",
+            help="URL name to benchmark (e.g. shipment-list); repeat for several. Default: all.",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--baseline", help="Compare against the results saved in this JSON file.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25,
+            help="Allowed latency/memory growth over the baseline, as a fraction.",
+        )
+        parser.add_argument(
+            "--current-db", action="store_true",
+            help="Benchmark the configured database instead of a test database.",
+        )
+        parser.add_argument(
+            "--no-seed", action="store_true",
+            help="With --current-db, benchmark the existing data as the first active superuser.",
+        )
+
+    def handle(self, *args, **options):
+        if options["no_seed"] and not options["current_db"]:
+            raise CommandError("--no-seed needs --current-db; a fresh test database is empty.")
+        baseline = load_results(options["baseline"]) if options["baseline"] else None
+
+        setup_test_environment()
+        old_config = None
+        if not options["current_db"]:
+            old_config = setup_databases(verbosity=0, interactive=False, serialized_aliases=set())
+        try:
+            user = self._prepare_data(options)
+            results = run_benchmarks(
+                user,
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+                only=set(options["endpoints"] or ()),
+                log=lambda message: self.stdout.write(f"  {message}"),
+            )
+        finally:
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        results["meta"].update(seed=options["seed"], volumes=self.volumes)
+        if options["output"]:
+            save_results(results, options["output"])
+            self.stdout.write(f"Results written to {options['output']}.")
+        if baseline is not None:
+            self._report_regressions(compare_results(results, baseline, options["tolerance"]))
+
+    def _prepare_data(self, options):
+        if options["no_seed"]:
+            self.volumes = None
+            user = get_user_model().objects.filter(is_superuser=True, is_active=True).order_by("pk").first()
+            if user is None:
+                raise CommandError("No active superuser to benchmark as.")
+            return user
+
+        self.volumes = scaled_volumes(
+            options["scale"], **{name: options[name] for name in DEFAULT_VOLUMES}
+        )
+        seeder = DatasetSeeder(
+            volumes=self.volumes,
+            seed=options["seed"],
+            prefix=f"bench{options['seed']}",
+            log=self.stdout.write,
+        )
+        counts = seeder.run()
+        self.stdout.write(
+            "Seeded " + ", ".join(f"{count} {label}" for label, count in sorted(counts.items())) + "."
+        )
+        self.stdout.write("Benchmarking:")
+        return seeder.admin
+
+    def _report_regressions(self, regressions):
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+            return
+        for endpoint, metric, before, after in regressions:
+            self.stdout.write(self.style.ERROR(f"{endpoint}: {metric} {before} -> {after}"))
+        raise CommandError(f"{len(regressions)} regression(s) against the baseline.")
@@ -0,0 +1,69 @@
+import io
+import timeit
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.renderers import FastJSONParser, FastJSONRenderer, orjson
+from apps.inventory.models import ProductStock
+from apps.inventory.serializers import ProductStockSerializer
+from apps.shipments.models import Shipment
+from apps.shipments.serializers import ShipmentSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares DRF's JSONRenderer/JSONParser with the orjson-backed classes "
+        "on real ShipmentSerializer and ProductStockSerializer output."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Rows serialized per payload.")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed iterations per measurement.")
+
+    def _payloads(self, rows):
+        shipments = (
+            Shipment.objects.select_related(
+                "customer", "container", "origin_warehouse", "created_by"
+            ).prefetch_related("items__product")[:rows]
+        )
+        stock = ProductStock.objects.select_related("product", "warehouse")[:rows]
+        return [
+            ("shipments", ShipmentSerializer(shipments, many=True).data),
+            ("product stock", ProductStockSerializer(stock, many=True).data),
+        ]
+
+    def _time(self, func, repeat):
+        return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING(
+                "orjson is not installed; the fast classes fall back to the standard encoder."
+            ))
+        repeat = options["repeat"]
+        stock_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        stock_parser, fast_parser = JSONParser(), FastJSONParser()
+
+        for label, data in self._payloads(options["rows"]):
+            if not data:
+                self.stdout.write(f"{label}: no rows, skipped.")
+                continue
+            body = stock_renderer.render(data)
+            results = {
+                "render": (
+                    self._time(lambda: stock_renderer.render(data), repeat),
+                    self._time(lambda: fast_renderer.render(data), repeat),
+                ),
+                "parse": (
+                    self._time(lambda: stock_parser.parse(io.BytesIO(body)), repeat),
+                    self._time(lambda: fast_parser.parse(io.BytesIO(body)), repeat),
+                ),
+            }
+            self.stdout.write(f"{label}: {len(data)} rows, {len(body) / 1024:.1f} KiB")
+            for step, (stock_ms, fast_ms) in results.items():
+                speedup = stock_ms / fast_ms if fast_ms else float("inf")
+                self.stdout.write(
+                    f"  {step:<6} stdlib {stock_ms:8.2f} ms   fast {fast_ms:8.2f} ms   x{speedup:.1f}"
+                )
@@ -0,0 +1,92 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from apps.core.stress import StressFixture, run_stress
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires concurrent shipment creates and stock transfers at a few hot products "
+        "from threads (and optionally processes), then reports throughput, latency, "
+        "lock waits and deadlocks and verifies that stock was conserved. Meant for a "
+        "local PostgreSQL; exits non-zero on deadlocks, errors or lost stock."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8, help="Threads per process.")
+        parser.add_argument("--processes", type=int, default=1, help="Forked worker processes.")
+        parser.add_argument("--operations", type=int, default=50, help="Requests per thread.")
+        parser.add_argument(
+            "--transfer-ratio", type=float, default=0.3,
+            help="Fraction of requests that are transfers rather than shipment creates.",
+        )
+        parser.add_argument("--products", type=int, default=5, help="Hot products in the fixture.")
+        parser.add_argument("--warehouses", type=int, default=3, help="Warehouses stocking every product.")
+        parser.add_argument("--initial-quantity", type=int, default=200, help="Starting stock per row.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the workload.")
+        parser.add_argument("--output", help="Also write the report to this JSON file.")
+        parser.add_argument(
+            "--current-db", action="store_true",
+            help="Run against the configured database instead of a throwaway test database.",
+        )
+
+    def handle(self, *args, **options):
+        if options["warehouses"] < 2:
+            raise CommandError("Transfers need at least two warehouses.")
+
+        setup_test_environment()
+        old_config = None
+        if not options["current_db"]:
+            old_config = setup_databases(verbosity=0, interactive=False, serialized_aliases=set())
+        try:
+            if connection.vendor != "postgresql":
+                self.stdout.write(self.style.WARNING(
+                    f"Running on {connection.vendor}: row locks, lock waits and deadlocks "
+                    "are PostgreSQL features, so this run only checks conservation."
+                ))
+            fixture = StressFixture(
+                products=options["products"],
+                warehouses=options["warehouses"],
+                initial_quantity=options["initial_quantity"],
+            )
+            report = run_stress(
+                fixture,
+                threads=options["threads"],
+                processes=options["processes"],
+                operations=options["operations"],
+                transfer_ratio=options["transfer_ratio"],
+                seed=options["seed"],
+            )
+        finally:
+            if old_config is not None:
+                teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(json.dumps(report, indent=2))
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+                handle.write("\n")
+
+        failures = []
+        if report["conservation_problems"]:
+            failures.append(f"{len(report['conservation_problems'])} stock conservation problem(s)")
+        deadlocks = report["deadlocks"]["reported_by_clients"] or report["deadlocks"]["reported_by_server"]
+        if deadlocks:
+            failures.append(f"{deadlocks} deadlock(s)")
+        errors = sum(outcomes.get("error", 0) for outcomes in report["outcomes"].values())
+        if errors:
+            failures.append(f"{errors} failed request(s)")
+        if failures:
+            raise CommandError("; ".join(failures) + ".")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['requests']} requests at {report['throughput_per_second']}/s; stock conserved."
+        ))
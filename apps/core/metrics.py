@@ -0,0 +1,134 @@
+# apps/core/metrics.py
+"""
+Prometheus metrics for the API and background work.
+
+prometheus_client is optional: without it every metric below is a no-op and
+the /metrics endpoint answers 503. Under gunicorn, set
+PROMETHEUS_MULTIPROC_DIR (an empty, writable directory) before the workers
+start so each process writes its samples there and /metrics aggregates them;
+config/gunicorn.conf.py cleans up after exited workers.
+"""
+import os
+from contextlib import nullcontext
+
+from django.db.models import Count
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+    def inc(self, amount=1):
+        pass
+
+    def time(self):
+        return nullcontext()
+
+
+def _metric(kind, name, documentation, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+REQUEST_LATENCY = _metric(
+    "Histogram",
+    "logistics_http_request_duration_seconds",
+    "Time spent handling API requests.",
+    ("view", "method", "status"),
+)
+REQUEST_QUERIES = _metric(
+    "Histogram",
+    "logistics_http_request_queries",
+    "SQL queries run per API request.",
+    ("view",),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+CACHE_REQUESTS = _metric(
+    "Counter",
+    "logistics_cache_requests",
+    "Cache lookups by cache and result (hit/miss).",
+    ("cache", "result"),
+)
+NOTIFICATION_DISPATCH = _metric(
+    "Counter",
+    "logistics_notification_dispatch",
+    "Notification dispatch attempts by channel and result (success/failure).",
+    ("channel", "result"),
+)
+STOCK_LOCK_WAIT = _metric(
+    "Histogram",
+    "logistics_stock_lock_wait_seconds",
+    "Time spent waiting for row locks on stock records.",
+    ("operation",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+STOCK_UPDATE_CONFLICTS = _metric(
+    "Counter",
+    "logistics_stock_update_conflicts",
+    "Compare-and-swap stock updates that lost to a concurrent writer and were retried.",
+    ("operation",),
+)
+STOCK_RESERVATIONS_RELEASED = _metric(
+    "Counter",
+    "logistics_stock_reservations_released",
+    "Stock reservations given back without being committed.",
+    ("reason",),
+)
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache=cache_name, result="hit" if hit else "miss").inc()
+
+
+class NotificationQueueCollector:
+    """Reports pending notifications per channel, read when /metrics is scraped."""
+
+    def collect(self):
+        from apps.notifications.models import Notification
+
+        gauge = GaugeMetricFamily(
+            "logistics_notification_queue_depth",
+            "Notifications waiting to be dispatched.",
+            labels=["channel"],
+        )
+        rows = (
+            Notification.objects.filter(status=Notification.NotificationStatus.PENDING)
+            .order_by()
+            .values_list("channel")
+            .annotate(count=Count("id"))
+        )
+        for channel, count in rows:
+            gauge.add_metric([channel], count)
+        yield gauge
+
+
+class _DefaultRegistryCollector:
+    """Exposes this process's default registry inside a per-scrape registry."""
+
+    def collect(self):
+        return prometheus_client.REGISTRY.collect()
+
+
+def build_registry():
+    """
+    Returns the registry to expose for one scrape: samples aggregated across
+    worker processes in multiprocess mode, this process's otherwise.
+    """
+    registry = prometheus_client.CollectorRegistry()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(_DefaultRegistryCollector())
+    registry.register(NotificationQueueCollector())
+    return registry
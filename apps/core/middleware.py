@@ -0,0 +1,310 @@
+# apps/core/middleware.py
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import metrics
+from .caching import cache_is_shared
+from .routers import replica_aliases, replica_reads
+
+logger = logging.getLogger(__name__)
+
+PIN_KEY_PREFIX = "db-primary-pin"
+PIN_COOKIE = "db_primary_pin"
+PIN_COOKIE_SALT = "apps.core.middleware.ReplicaRoutingMiddleware"
+
+
+def request_user_id(request, user=None):
+    """
+    Returns the id of the user making the request: from the session user
+    if there is one, otherwise from the validated JWT access token (which
+    needs no database query).
+    """
+    if user is None:
+        user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    from apps.users.authentication import StatelessJWTAuthentication
+
+    authenticator = StatelessJWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        token = authenticator.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return token.get(jwt_settings.USER_ID_CLAIM)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of safe-method requests to a read replica.
+
+    A client that has just written is pinned to the primary for
+    DATABASE_REPLICA_PIN_SECONDS, so it reads its own writes despite
+    replication lag. The pin travels in a signed cookie, so it holds on
+    whichever worker serves the next request; with a shared cache the user
+    is pinned there as well, for clients that do not keep cookies. Does
+    nothing unless a replica is configured.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _pinned(self, request, user_id):
+        cookie = request.get_signed_cookie(
+            PIN_COOKIE, default=None, salt=PIN_COOKIE_SALT, max_age=settings.DATABASE_REPLICA_PIN_SECONDS
+        )
+        if cookie is not None:
+            return True
+        # A per-process cache only knows about writes this worker served.
+        return (
+            user_id is not None
+            and cache_is_shared()
+            and cache.get(f"{PIN_KEY_PREFIX}:{user_id}") is not None
+        )
+
+    def _use_replica(self, request, user_id):
+        return request.method in SAFE_METHODS and not self._pinned(request, user_id)
+
+    def _pin_writer(self, request, response, state, user_id):
+        wrote = state.wrote or (request.method not in SAFE_METHODS and response.status_code < 400)
+        if not wrote:
+            return
+        response.set_signed_cookie(
+            PIN_COOKIE, "1", salt=PIN_COOKIE_SALT, max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+            httponly=True, samesite="Lax", secure=settings.SESSION_COOKIE_SECURE,
+        )
+        if user_id is not None and cache_is_shared():
+            cache.set(f"{PIN_KEY_PREFIX}:{user_id}", True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        user_id = request_user_id(request)
+        with replica_reads(self._use_replica(request, user_id)) as state:
+            response = self.get_response(request)
+        self._pin_writer(request, response, state, user_id)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        user_id = request_user_id(request, user=await request.auser())
+        with replica_reads(self._use_replica(request, user_id)) as state:
+            response = await self.get_response(request)
+        self._pin_writer(request, response, state, user_id)
+        return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs natively under ASGI. The stock middleware is
+    sync-only, which would force every async request through a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class QueryStats:
+    """Database execute wrapper that counts queries and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def get_query_budget(view_func, method):
+    """
+    Returns the query budget for a view: its ``query_budget`` attribute (an
+    int, or a dict keyed by viewset action) or QUERY_BUDGET_DEFAULT.
+    """
+    view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        action = (getattr(view_func, "actions", None) or {}).get(method.lower())
+        budget = budget.get(action)
+    return settings.QUERY_BUDGET_DEFAULT if budget is None else budget
+
+
+# QueryStats collecting for the current request. A context variable rather
+# than per-connection wrappers: async views run their ORM calls through
+# sync_to_async on another thread, with that thread's connections, and
+# asgiref copies the context into it.
+_active_stats = ContextVar("query_stats", default=())
+
+
+def _record_query(execute, sql, params, many, context):
+    for stats in _active_stats.get():
+        execute = partial(stats, execute)
+    return execute(sql, params, many, context)
+
+
+def _install_recorder(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@receiver(connection_created)
+def _install_recorder_on_connect(sender, connection, **kwargs):
+    _install_recorder(connection)
+
+
+@contextmanager
+def instrument_queries(stats):
+    """
+    Feeds every query run on behalf of the current request - on this thread
+    or in a sync_to_async worker - to ``stats``.
+    """
+    # Connections opened before this module was imported missed the signal.
+    for connection in connections.all(initialized_only=True):
+        _install_recorder(connection)
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the SQL queries a request runs and the time spent in them, and
+    reports both in a Server-Timing header. Requests that run more queries
+    than their view's budget are logged and marked with an
+    X-Query-Budget-Exceeded header - usually a sign of an N+1 pattern.
+
+    Queries run while a streaming response is consumed are not counted.
+    Enabled with QUERY_BUDGET_ENABLED (defaults to DEBUG).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_BUDGET_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = get_query_budget(view_func, request.method)
+
+    def _report(self, request, response, stats, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = stats.duration * 1000
+        response["Server-Timing"] = (
+            f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={total_ms:.2f}'
+        )
+        budget = getattr(request, "query_budget", None)
+        if budget is not None and stats.count > budget:
+            response["X-Query-Budget-Exceeded"] = f"{stats.count}/{budget}"
+            logger.warning(
+                "%s %s ran %d queries (budget %d, %.1f ms in SQL)",
+                request.method, request.path, stats.count, budget, db_ms,
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, started = QueryStats(), time.perf_counter()
+        with instrument_queries(stats):
+            response = self.get_response(request)
+        return self._report(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats, started = QueryStats(), time.perf_counter()
+        with instrument_queries(stats):
+            response = await self.get_response(request)
+        return self._report(request, response, stats, started)
+
+
+class MetricsMiddleware:
+    """
+    Records request latency and query counts per view for Prometheus
+    (see apps.core.metrics). Disabled when prometheus_client is missing or
+    METRICS_ENABLED is off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if metrics.prometheus_client is None or not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _observe(self, request, response, stats, started):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name if match else None) or "unmatched"
+        metrics.REQUEST_LATENCY.labels(
+            view=view, method=request.method, status=response.status_code
+        ).observe(time.perf_counter() - started)
+        metrics.REQUEST_QUERIES.labels(view=view).observe(stats.count)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, started = QueryStats(), time.perf_counter()
+        with instrument_queries(stats):
+            response = self.get_response(request)
+        return self._observe(request, response, stats, started)
+
+    async def __acall__(self, request):
+        stats, started = QueryStats(), time.perf_counter()
+        with instrument_queries(stats):
+            response = await self.get_response(request)
+        return self._observe(request, response, stats, started)
@@ -0,0 +1,153 @@
+# apps/core/pagination.py
+import json
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+def estimated_count(queryset):
+    """
+    Returns the planner's row estimate for ``queryset`` on PostgreSQL, or
+    None when no estimate is available (other backends, empty querysets).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedPage(Page):
+    # Whether rows follow this page, when known from fetching one row more.
+    has_more = None
+
+    def has_next(self):
+        if self.has_more is not None:
+            return self.has_more
+        return super().has_next()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that trusts the query planner's row estimate once it exceeds
+    PAGINATION_ESTIMATE_THRESHOLD, instead of running an exact COUNT(*) over
+    very large tables. Smaller (typically filtered) result sets still get an
+    exact count, so their last page is always correct.
+
+    An estimate is only shown (``count``, ``num_pages``); it never bounds the
+    pages that can be fetched. Pages past it are served while they have rows,
+    and whether a next page exists is decided by fetching one extra row.
+    """
+    estimated = False
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet):
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate >= settings.PAGINATION_ESTIMATE_THRESHOLD:
+                self.estimated = True
+                return estimate
+        return super().count
+
+    def validate_number(self, number):
+        self.count
+        if not self.estimated:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedPage(*args, **kwargs)
+
+
+class EstimatedPageNumberPagination(PageNumberPagination):
+    """
+    Project-wide page-number pagination. Lists stay unpaginated unless a
+    page size is configured or requested with ``?page_size=``.
+    """
+    django_paginator_class = EstimatedCountPaginator
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class StandardPageNumberPagination(EstimatedPageNumberPagination):
+    page_size = 50
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination over a view's natural ordering, so fetching a
+    deep page costs the same as the first one: no COUNT(*) and no OFFSET scan.
+
+    The ordering comes from the view's ``ordering`` attribute, e.g.
+    ``("-timestamp", "-id")``; the first field drives the cursor position and
+    should be backed by a matching composite index.
+
+    Page-number mode is still available for admin-style UIs: passing ``page``
+    (or an explicit ``ordering`` on views with an OrderingFilter) switches the
+    request to StandardPageNumberPagination.
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-pk",)
+    page_number_class = StandardPageNumberPagination
+
+    def _uses_page_numbers(self, request, view):
+        if self.page_number_class.page_query_param in request.query_params:
+            return True
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter) and backend.ordering_param in request.query_params:
+                return True
+        return False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_number_paginator = None
+        if self._uses_page_numbers(request, view):
+            self.page_number_paginator = self.page_number_class()
+            return self.page_number_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_ordering(self, request, queryset, view):
+        view_ordering = getattr(view, "ordering", None)
+        if view_ordering:
+            return (view_ordering,) if isinstance(view_ordering, str) else tuple(view_ordering)
+        return super().get_ordering(request, queryset, view)
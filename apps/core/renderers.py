@@ -0,0 +1,59 @@
+# apps/core/renderers.py
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+orjson serializes dicts, lists, strings, numbers, datetimes and UUIDs
+natively; anything else (Decimal, lazy translation strings, querysets, ...)
+goes through DRF's own encoder, so the output matches the standard
+JSONRenderer. Without orjson both classes behave exactly like DRF's.
+"""
+from django.conf import settings
+from rest_framework import renderers, parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        # Indented output (the browsable API, ?indent=) is rare enough to
+        # leave to the standard encoder.
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+
+
+class FastJSONParser(parsers.JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read() if stream is not None else b""
+            if encoding.lower().replace("-", "") != "utf8":
+                body = body.decode(encoding).encode("utf-8")
+            return orjson.loads(body)
+        except (ValueError, UnicodeError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,64 @@
+# apps/core/routers.py
+"""
+Primary/replica database routing.
+
+Reads go to a replica only inside a request that ReplicaRoutingMiddleware
+has marked as replica-safe (a safe-method API request from a user who has
+not written recently). Everything else - writes, reads inside
+transaction.atomic(), reads after the request has written, management
+commands and background jobs - uses the primary ("default").
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_routing_state = ContextVar("db_routing_state", default=None)
+
+
+class RoutingState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+def replica_aliases():
+    return settings.DATABASE_REPLICAS
+
+
+@contextmanager
+def replica_reads(use_replica=True):
+    """Routes ORM reads in this block to a replica when ``use_replica`` is true."""
+    state = RoutingState(use_replica)
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        replicas = replica_aliases()
+        if state is None or not state.use_replica or state.wrote or not replicas:
+            return DEFAULT_DB_ALIAS
+        # Reads inside an atomic block must see that block's writes.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            # Once the request has written, read its own writes from the primary.
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
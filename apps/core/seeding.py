@@ -0,0 +1,654 @@
+# apps/core/seeding.py
+"""
+Bulk seeding of a consistent logistics dataset for benchmarks and capacity
+tests.
+
+Every table is filled with chunked ``bulk_create`` calls, so no model
+``save()`` or signal runs; the seeder keeps the invariants those would
+otherwise maintain itself: products sit in containers at one of the
+warehouses holding their stock, shipment items are drawn from stock that
+exists at the shipment's origin warehouse and decrement it (or, for
+shipments pending confirmation, are held by reservations),
+``Product.quantity`` equals the product's total stock, the stock ledger
+(receipts, shipment and transfer movements) adds up to the stock rows, and
+tracking and container codes are set explicitly.
+
+Reference data (users, suppliers, warehouses, containers) is created first.
+Everything else is split into independent blocks: each block owns a slice of
+the products, the shipments drawing on them and the activity about them, so
+blocks never touch the same rows and can be seeded by parallel worker
+processes. Each block has its own random stream derived from ``seed``, so
+the generated content depends only on the seed, the volumes and the number
+of blocks - not on the number of workers (primary keys may interleave).
+"""
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.utils import timezone
+
+from apps.audit_logs.models import ActionLog
+from apps.containers.models import Container
+from apps.deliveries.models import DeliveryTask
+from apps.inventory.models import (
+    Product,
+    ProductStock,
+    ProductTransferLog,
+    StockMovement,
+    StockReservation,
+    Supplier,
+    Warehouse,
+)
+from apps.notifications.models import Notification
+from apps.shipments.models import Shipment, ShipmentItem
+from apps.users.models import UserRole
+
+from .caching import bump_model_version
+
+DEFAULT_VOLUMES = {
+    "customers": 200,
+    "dispatchers": 20,
+    "suppliers": 50,
+    "warehouses": 20,
+    "containers": 500,
+    "products": 2000,
+    "shipments": 5000,
+    "delivery_tasks": 3000,
+    "transfer_logs": 2000,
+    "notifications": 10000,
+    "action_logs": 20000,
+}
+# Volumes split across blocks; the rest is reference data.
+BLOCK_VOLUMES = ("products", "shipments", "delivery_tasks", "transfer_logs", "notifications", "action_logs")
+SEED_PASSWORD = "seed-password-123"
+
+CONTAINER_TYPES = ("20ft Standard", "40ft Standard", "40ft High Cube", "20ft Reefer")
+CITIES = ("Lagos", "Accra", "Nairobi", "Mombasa", "Durban", "Tema", "Abidjan", "Dakar")
+ACTION_VERBS = (
+    "SHIPMENT_CREATED",
+    "SHIPMENT_STATUS_UPDATED",
+    "PRODUCT_UPDATED",
+    "CONTAINER_CREATED",
+    "CONTAINER_TRANSFERRED_WAREHOUSE",
+    "PRODUCT_STOCK_TRANSFERRED",
+    "DELIVERY_TASK_UPDATED",
+)
+# Shipments in these states never took their goods out of stock.
+UNRESERVED_SHIPMENT_STATUSES = {Shipment.ShipmentStatus.CANCELLED}
+# Shipments in these states hold their goods with a reservation instead.
+HELD_SHIPMENT_STATUSES = {Shipment.ShipmentStatus.PENDING_CONFIRMATION}
+# Seeded rows carry explicit creation times spread over the history window.
+BACKDATED_FIELDS = (
+    (Shipment, "created_at"),
+    (ProductTransferLog, "timestamp"),
+    (Notification, "created_at"),
+    (StockReservation, "created_at"),
+    (ActionLog, "timestamp"),
+)
+
+
+def scaled_volumes(scale=1.0, **overrides):
+    """Returns DEFAULT_VOLUMES multiplied by ``scale``, with explicit overrides."""
+    volumes = {name: max(1, int(count * scale)) for name, count in DEFAULT_VOLUMES.items()}
+    volumes.update({name: count for name, count in overrides.items() if count is not None})
+    return volumes
+
+
+@contextmanager
+def explicit_timestamps(model, field_name):
+    """
+    Lets bulk_create keep the values set on an ``auto_now_add`` field, so
+    seeded rows can be spread over time instead of all sharing "now".
+    """
+    field = model._meta.get_field(field_name)
+    original = field.auto_now_add
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = original
+
+
+def _share(total, index, blocks):
+    """The ``index``-th of ``blocks`` contiguous, near-equal slices of range(total)."""
+    return range(total * index // blocks, total * (index + 1) // blocks)
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+
+
+def _seed_block_in_worker(options, reference, index, blocks):
+    seeder = DatasetSeeder(**options)
+    seeder.reference = reference
+    seeder.seed_block(index, blocks)
+    return seeder.counts
+
+
+class DatasetSeeder:
+    """
+    Creates ``volumes`` rows (see DEFAULT_VOLUMES) under a common ``prefix``
+    that keeps emails, names and codes unique across seeded datasets.
+    """
+
+    def __init__(self, volumes=None, seed=0, chunk_size=2000, prefix="seed", history_days=180, log=None):
+        self.volumes = dict(DEFAULT_VOLUMES, **(volumes or {}))
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+        self.history_days = history_days
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self.counts = {}
+        self.reference = {}
+
+    def _options(self):
+        """Constructor arguments a worker process needs to rebuild this seeder."""
+        return {
+            "volumes": self.volumes,
+            "seed": self.seed,
+            "chunk_size": self.chunk_size,
+            "prefix": self.prefix,
+            "history_days": self.history_days,
+        }
+
+    # Helpers ----------------------------------------------------------------
+
+    def _bulk_create(self, model, objects):
+        model.objects.bulk_create(objects, batch_size=self.chunk_size)
+        self.counts[model._meta.label] = self.counts.get(model._meta.label, 0) + len(objects)
+        return objects
+
+    def _chunks(self, indexes):
+        for start in range(0, len(indexes), self.chunk_size):
+            yield indexes[start:start + self.chunk_size]
+
+    def _past(self, days=None):
+        seconds = self.rng.randint(0, int((days or self.history_days) * 86400))
+        return self.now - timedelta(seconds=seconds)
+
+    def _money(self, low, high):
+        return Decimal(self.rng.randint(low * 100, high * 100)) / 100
+
+    # Reference data ---------------------------------------------------------
+
+    def seed_users(self):
+        User = get_user_model()
+        if User.objects.filter(email__startswith=f"{self.prefix}-").exists():
+            raise ValueError(f"A dataset with prefix '{self.prefix}' already exists.")
+        # One hash for everyone: hashing is the slow part of creating users.
+        password = make_password(SEED_PASSWORD)
+
+        def user(label, role, **extra):
+            return User(
+                email=f"{self.prefix}-{label}@example.com",
+                password=password,
+                first_name=label.split("-")[0].title(),
+                last_name=self.prefix.title(),
+                role=role,
+                **extra,
+            )
+
+        self.admin, self.manager = self._bulk_create(User, [
+            user("admin", UserRole.ADMIN, is_staff=True, is_superuser=True),
+            user("manager", UserRole.WAREHOUSE_MANAGER, is_staff=True),
+        ])
+        customer_ids = []
+        for chunk in self._chunks(range(self.volumes["customers"])):
+            created = self._bulk_create(User, [user(f"customer-{i}", UserRole.CUSTOMER) for i in chunk])
+            customer_ids.extend(obj.pk for obj in created)
+        dispatcher_ids = [
+            obj.pk
+            for obj in self._bulk_create(User, [
+                user(f"dispatcher-{i}", UserRole.DISPATCHER) for i in range(self.volumes["dispatchers"])
+            ])
+        ]
+        self.reference.update(
+            admin_id=self.admin.pk,
+            manager_id=self.manager.pk,
+            customer_ids=customer_ids,
+            dispatcher_ids=dispatcher_ids,
+        )
+
+    def seed_locations(self):
+        label = self.prefix.title()
+        manager_id = self.reference["manager_id"]
+        supplier_ids = [
+            obj.pk
+            for obj in self._bulk_create(Supplier, [
+                Supplier(
+                    name=f"{label} Supplier {i}",
+                    email=f"{self.prefix}-supplier-{i}@example.com",
+                    contact_person=f"Contact {i}",
+                    created_by_id=manager_id,
+                )
+                for i in range(self.volumes["suppliers"])
+            ])
+        ]
+        warehouse_ids = [
+            obj.pk
+            for obj in self._bulk_create(Warehouse, [
+                Warehouse(
+                    name=f"{label} Warehouse {i}",
+                    location_address=f"{i + 1} Dock Road, {CITIES[i % len(CITIES)]}",
+                    contact_email=f"{self.prefix}-warehouse-{i}@example.com",
+                    created_by_id=manager_id,
+                )
+                for i in range(self.volumes["warehouses"])
+            ])
+        ]
+        statuses = Container.ContainerStatus.values
+        containers_by_warehouse = {warehouse_id: [] for warehouse_id in warehouse_ids}
+        for chunk in self._chunks(range(self.volumes["containers"])):
+            created = self._bulk_create(Container, [
+                Container(
+                    container_id_code=f"{self.prefix.upper()}-C{i:07d}",
+                    type=self.rng.choice(CONTAINER_TYPES),
+                    status=self.rng.choice(statuses),
+                    current_warehouse_id=self.rng.choice(warehouse_ids),
+                    last_known_origin=self.rng.choice(CITIES),
+                    transportation_fees=self._money(200, 2000),
+                    created_by_id=manager_id,
+                )
+                for i in chunk
+            ])
+            for container in created:
+                containers_by_warehouse[container.current_warehouse_id].append(container.pk)
+        self.reference.update(
+            supplier_ids=supplier_ids,
+            warehouse_ids=warehouse_ids,
+            containers_by_warehouse=containers_by_warehouse,
+        )
+
+    # Blocks -----------------------------------------------------------------
+
+    def seed_block(self, index, blocks):
+        """
+        Seeds the ``index``-th of ``blocks`` slices of every block volume:
+        products and their stock, then shipments drawing on that stock,
+        delivery tasks, transfers between stock rows, notifications and
+        action logs.
+        """
+        self.rng = random.Random(f"{self.seed}:{index}")
+        share = {name: _share(self.volumes[name], index, blocks) for name in BLOCK_VOLUMES}
+        with ExitStack() as stack:
+            for model, field_name in BACKDATED_FIELDS:
+                stack.enter_context(explicit_timestamps(model, field_name))
+            product_ids, stock = self._seed_inventory(share["products"])
+            shipment_ids = self._seed_shipments(share["shipments"], share["delivery_tasks"], stock, index, blocks)
+            self._seed_transfer_logs(share["transfer_logs"], stock)
+            self._write_back_stock(stock)
+            self._seed_notifications(share["notifications"], shipment_ids)
+            self._seed_action_logs(share["action_logs"], shipment_ids, product_ids)
+        return self.counts
+
+    def _seed_inventory(self, indexes):
+        """
+        Creates products with one to three stock rows each. Returns the
+        product ids and the stock per warehouse as
+        ``[stock id, product id, quantity, reserved]`` entries, which
+        shipments draw on.
+        """
+        warehouse_ids = self.reference["warehouse_ids"]
+        containers_by_warehouse = self.reference["containers_by_warehouse"]
+        product_ids, stock_by_warehouse = [], {warehouse_id: [] for warehouse_id in warehouse_ids}
+        for chunk in self._chunks(indexes):
+            products, placements = [], []
+            for i in chunk:
+                warehouses = self.rng.sample(warehouse_ids, self.rng.randint(1, min(3, len(warehouse_ids))))
+                quantities = [self.rng.randint(0, 500) for _ in warehouses]
+                # The product arrived in a container now at its main warehouse.
+                containers = containers_by_warehouse[warehouses[0]]
+                cost = self._money(1, 500)
+                products.append(Product(
+                    name=f"{self.prefix.title()} Product {i}",
+                    quantity=sum(quantities),
+                    supplier_id=self.rng.choice(self.reference["supplier_ids"]),
+                    container_id=self.rng.choice(containers) if containers and self.rng.random() < 0.7 else None,
+                    cost_of_product=cost,
+                    selling_price=(cost * Decimal("1.35")).quantize(Decimal("0.01")),
+                    created_by_id=self.reference["manager_id"],
+                ))
+                placements.append(list(zip(warehouses, quantities)))
+            self._bulk_create(Product, products)
+
+            rows = [
+                ProductStock(product_id=product.pk, warehouse_id=warehouse_id, quantity=quantity)
+                for product, product_placements in zip(products, placements)
+                for warehouse_id, quantity in product_placements
+            ]
+            self._bulk_create(ProductStock, rows)
+            # Opening stock is received at the start of the history window.
+            opened = self.now - timedelta(days=self.history_days)
+            self._bulk_create(StockMovement, [
+                StockMovement(
+                    product_id=row.product_id,
+                    warehouse_id=row.warehouse_id,
+                    movement_type=StockMovement.MovementType.RECEIPT,
+                    quantity=row.quantity,
+                    created_by_id=self.reference["manager_id"],
+                    created_at=opened,
+                )
+                for row in rows
+                if row.quantity
+            ])
+            for row in rows:
+                stock_by_warehouse[row.warehouse_id].append([row.pk, row.product_id, row.quantity, 0])
+            product_ids.extend(product.pk for product in products)
+        return product_ids, stock_by_warehouse
+
+    def _pick_items(self, entries, status, returned=False):
+        """
+        Draws items from ``entries``: held for pending shipments, taken for
+        the rest. Cancelled shipments and those whose delivery was returned
+        have given everything back already.
+        """
+        items, used = [], set()
+        for _ in range(self.rng.randint(1, 4)):
+            entry = self.rng.choice(entries)
+            available = entry[2] - entry[3]
+            if available <= 0 or entry[0] in used:
+                continue
+            quantity = self.rng.randint(1, min(available, 20))
+            if returned or status in UNRESERVED_SHIPMENT_STATUSES:
+                pass
+            elif status in HELD_SHIPMENT_STATUSES:
+                entry[3] += quantity
+            else:
+                entry[2] -= quantity
+            used.add(entry[0])
+            items.append((entry[1], quantity))
+        return items
+
+    def _seed_shipments(self, indexes, task_indexes, stock_by_warehouse, index, blocks):
+        statuses = Shipment.ShipmentStatus.values
+        task_statuses = DeliveryTask.DeliveryStatus.values
+        stocked_warehouses = [warehouse_id for warehouse_id, entries in stock_by_warehouse.items() if entries]
+        if not stocked_warehouses:
+            return []
+        # Each block gets its own containers: a shipment holds a container exclusively.
+        free_containers = sorted(
+            container_id
+            for container_ids in self.reference["containers_by_warehouse"].values()
+            for container_id in container_ids
+        )[index::blocks]
+        self.rng.shuffle(free_containers)
+        task_numbers = iter(task_indexes)
+        shipment_ids = []
+
+        returned_status = DeliveryTask.DeliveryStatus.RETURNED
+        for chunk in self._chunks(indexes):
+            shipments, shipment_items, task_states = [], [], []
+            for i in chunk:
+                status = self.rng.choice(statuses)
+                warehouse_id = self.rng.choice(stocked_warehouses)
+                created = self._past()
+                # Tasks cycle through every status so each one is represented.
+                number = next(task_numbers, None)
+                task_status = None if number is None else task_statuses[number % len(task_statuses)]
+                returned = task_status == returned_status
+                restocked = (
+                    status in UNRESERVED_SHIPMENT_STATUSES
+                    or (returned and status not in HELD_SHIPMENT_STATUSES)
+                )
+                task_states.append(task_status)
+                shipments.append(Shipment(
+                    shipment_tracking_id=f"{self.prefix.upper()}-S{i:09d}",
+                    customer_id=self.rng.choice(self.reference["customer_ids"]),
+                    container_id=free_containers.pop() if free_containers and self.rng.random() < 0.1 else None,
+                    origin_warehouse_id=warehouse_id,
+                    destination_address=f"{self.rng.randint(1, 999)} Market Street, {self.rng.choice(CITIES)}",
+                    status=status,
+                    estimated_departure_date=created + timedelta(days=2),
+                    estimated_delivery_date=created + timedelta(days=self.rng.randint(5, 30)),
+                    created_by_id=self.reference["manager_id"],
+                    # Given back straight away, so the replayed ledger never
+                    # has the goods out while other shipments draw on them.
+                    restocked_at=created if restocked else None,
+                    created_at=created,
+                ))
+                shipment_items.append(self._pick_items(stock_by_warehouse[warehouse_id], status, returned))
+            self._bulk_create(Shipment, shipments)
+            self._bulk_create(ShipmentItem, [
+                ShipmentItem(shipment_id=shipment.pk, product_id=product_id, quantity=quantity)
+                for shipment, items in zip(shipments, shipment_items)
+                for product_id, quantity in items
+            ])
+            movements = []
+            for shipment, items in zip(shipments, shipment_items):
+                if shipment.status in UNRESERVED_SHIPMENT_STATUSES | HELD_SHIPMENT_STATUSES:
+                    continue
+                for product_id, quantity in items:
+                    movements.append(StockMovement(
+                        product_id=product_id,
+                        warehouse_id=shipment.origin_warehouse_id,
+                        movement_type=StockMovement.MovementType.SHIPMENT,
+                        quantity=-quantity,
+                        shipment_id=shipment.pk,
+                        created_by_id=self.reference["manager_id"],
+                        created_at=shipment.created_at,
+                    ))
+                    if shipment.restocked_at:
+                        movements.append(StockMovement(
+                            product_id=product_id,
+                            warehouse_id=shipment.origin_warehouse_id,
+                            movement_type=StockMovement.MovementType.RESTOCK,
+                            quantity=quantity,
+                            shipment_id=shipment.pk,
+                            created_by_id=self.reference["manager_id"],
+                            created_at=shipment.restocked_at,
+                        ))
+            self._bulk_create(StockMovement, movements)
+            # Most of these holds are long expired, which leaves the
+            # reservation sweeper a realistic backlog.
+            ttl = timedelta(minutes=settings.STOCK_RESERVATION_TTL_MINUTES)
+            self._bulk_create(StockReservation, [
+                StockReservation(
+                    shipment_id=shipment.pk,
+                    product_id=product_id,
+                    warehouse_id=shipment.origin_warehouse_id,
+                    quantity=quantity,
+                    expires_at=shipment.created_at + ttl,
+                    # A returned delivery gave the held stock back.
+                    status=(
+                        StockReservation.ReservationStatus.RELEASED if task_status == returned_status
+                        else StockReservation.ReservationStatus.ACTIVE
+                    ),
+                    created_at=shipment.created_at,
+                )
+                for shipment, items, task_status in zip(shipments, shipment_items, task_states)
+                if shipment.status in HELD_SHIPMENT_STATUSES
+                for product_id, quantity in items
+            ])
+            shipment_ids.extend(shipment.pk for shipment in shipments)
+
+            tasks = []
+            for shipment, status in zip(shipments, task_states):
+                if status is None:
+                    continue
+                scheduled = self._past(days=30)
+                tasks.append(DeliveryTask(
+                    shipment_id=shipment.pk,
+                    dispatcher_id=(
+                        None if status == DeliveryTask.DeliveryStatus.PENDING_ASSIGNMENT
+                        else self.rng.choice(self.reference["dispatcher_ids"])
+                    ),
+                    status=status,
+                    scheduled_pickup_datetime=scheduled,
+                    scheduled_delivery_datetime=scheduled + timedelta(hours=self.rng.randint(2, 48)),
+                ))
+            self._bulk_create(DeliveryTask, tasks)
+        return shipment_ids
+
+    def _write_back_stock(self, stock_by_warehouse):
+        """Persists the stock drawn and held by shipments and the matching product totals."""
+        rows, totals = [], {}
+        for entries in stock_by_warehouse.values():
+            for stock_id, product_id, quantity, reserved in entries:
+                rows.append(ProductStock(pk=stock_id, quantity=quantity, reserved=reserved))
+                totals[product_id] = totals.get(product_id, 0) + quantity
+        ProductStock.objects.bulk_update(rows, ["quantity", "reserved"], batch_size=self.chunk_size)
+        Product.objects.bulk_update(
+            [Product(pk=product_id, quantity=total) for product_id, total in totals.items()],
+            ["quantity"],
+            batch_size=self.chunk_size,
+        )
+
+    def _seed_transfer_logs(self, indexes, stock_by_warehouse):
+        """
+        Past transfers between two warehouses that both stock the product.
+        Each moves stock the source row received directly (never stock it was
+        itself transferred), so the replayed ledger never dips below zero.
+        """
+        rows = {}
+        for warehouse_id, entries in stock_by_warehouse.items():
+            for entry in entries:
+                rows.setdefault(entry[1], {})[warehouse_id] = entry
+        candidates = [(product_id, by_warehouse) for product_id, by_warehouse in rows.items() if len(by_warehouse) > 1]
+        if not candidates:
+            return
+        received = {}
+        for chunk in self._chunks(indexes):
+            logs = []
+            for _ in chunk:
+                product_id, by_warehouse = self.rng.choice(candidates)
+                from_warehouse_id, to_warehouse_id = self.rng.sample(sorted(by_warehouse), 2)
+                source, target = by_warehouse[from_warehouse_id], by_warehouse[to_warehouse_id]
+                available = source[2] - source[3] - received.get(source[0], 0)
+                if available <= 0:
+                    continue
+                quantity = self.rng.randint(1, min(available, 50))
+                source[2] -= quantity
+                target[2] += quantity
+                received[target[0]] = received.get(target[0], 0) + quantity
+                logs.append(ProductTransferLog(
+                    product_id=product_id,
+                    quantity_transferred=quantity,
+                    from_warehouse_id=from_warehouse_id,
+                    to_warehouse_id=to_warehouse_id,
+                    transferred_by_id=self.reference["manager_id"],
+                    timestamp=self._past(),
+                ))
+            self._bulk_create(ProductTransferLog, logs)
+            movements = []
+            for log_entry in logs:
+                for warehouse_id, movement_type, quantity in (
+                    (log_entry.from_warehouse_id, StockMovement.MovementType.TRANSFER_OUT, -log_entry.quantity_transferred),
+                    (log_entry.to_warehouse_id, StockMovement.MovementType.TRANSFER_IN, log_entry.quantity_transferred),
+                ):
+                    movements.append(StockMovement(
+                        product_id=log_entry.product_id,
+                        warehouse_id=warehouse_id,
+                        movement_type=movement_type,
+                        quantity=quantity,
+                        transfer_id=log_entry.pk,
+                        created_by_id=log_entry.transferred_by_id,
+                        created_at=log_entry.timestamp,
+                    ))
+            self._bulk_create(StockMovement, movements)
+
+    def _seed_notifications(self, indexes, shipment_ids):
+        if not shipment_ids:
+            return
+        shipment_type = ContentType.objects.get_for_model(Shipment)
+        recipients = [self.reference["admin_id"], self.reference["manager_id"]] + self.reference["customer_ids"]
+        statuses = Notification.NotificationStatus
+        for chunk in self._chunks(indexes):
+            notifications = []
+            for _ in chunk:
+                status = self.rng.choice(statuses.values)
+                created = self._past()
+                notifications.append(Notification(
+                    recipient_id=self.rng.choice(recipients),
+                    title="Shipment update",
+                    message="Your shipment status has changed.",
+                    channel=self.rng.choice(Notification.NotificationChannel.values),
+                    status=status,
+                    content_type=shipment_type,
+                    object_id=self.rng.choice(shipment_ids),
+                    created_at=created,
+                    sent_at=created if status in (statuses.SENT, statuses.READ) else None,
+                    read_at=created + timedelta(hours=1) if status == statuses.READ else None,
+                ))
+            self._bulk_create(Notification, notifications)
+
+    def _seed_action_logs(self, indexes, shipment_ids, product_ids):
+        reference = self.reference
+        container_ids = [pk for ids in reference["containers_by_warehouse"].values() for pk in ids]
+        targets = [
+            (ContentType.objects.get_for_model(model), ids)
+            for model, ids in ((Shipment, shipment_ids), (Product, product_ids), (Container, container_ids))
+            if ids
+        ]
+        user_ids = (
+            [reference["admin_id"], reference["manager_id"]]
+            + reference["customer_ids"]
+            + reference["dispatcher_ids"]
+        )
+        for chunk in self._chunks(indexes):
+            logs = []
+            for _ in chunk:
+                content_type, ids = self.rng.choice(targets)
+                logs.append(ActionLog(
+                    user_id=self.rng.choice(user_ids),
+                    action_verb=self.rng.choice(ACTION_VERBS),
+                    content_type=content_type,
+                    object_id=self.rng.choice(ids),
+                    details={"source": "seed"},
+                    ip_address=f"10.{self.rng.randint(0, 255)}.{self.rng.randint(0, 255)}.{self.rng.randint(1, 254)}",
+                    user_agent="seed",
+                    request_id=uuid.UUID(int=self.rng.getrandbits(128)).hex,
+                    timestamp=self._past(),
+                ))
+            self._bulk_create(ActionLog, logs)
+
+    # Entry point ------------------------------------------------------------
+
+    def _merge_counts(self, counts):
+        for label, count in counts.items():
+            self.counts[label] = self.counts.get(label, 0) + count
+
+    def run(self, workers=1, blocks=None):
+        """
+        Seeds reference data, then every block - in this process, or spread
+        over ``workers`` processes. ``blocks`` defaults to one per 50,000
+        shipments (at least one per worker). Returns row counts per model.
+        """
+        self.log("Seeding users...")
+        self.seed_users()
+        self.log("Seeding suppliers, warehouses and containers...")
+        self.seed_locations()
+
+        blocks = blocks or max(workers, -(-self.volumes["shipments"] // 50000))
+        if workers <= 1:
+            for index in range(blocks):
+                self.log(f"Seeding block {index + 1}/{blocks}...")
+                self.seed_block(index, blocks)
+        else:
+            # Forked workers must not share the parent's database connections.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = [
+                    pool.submit(_seed_block_in_worker, self._options(), self.reference, index, blocks)
+                    for index in range(blocks)
+                ]
+                for number, future in enumerate(futures, start=1):
+                    self._merge_counts(future.result())
+                    self.log(f"Seeded block {number}/{blocks}.")
+
+        # bulk_create sends no post_save signals, so cached lists are
+        # invalidated by hand.
+        for model in (get_user_model(), Supplier, Warehouse):
+            bump_model_version(model)
+        return self.counts
@@ -0,0 +1,396 @@
+# apps/core/stress.py
+"""
+Concurrency stress test for the stock-mutating endpoints.
+
+A small fixture of "hot" products, each stocked at every warehouse of the
+fixture, is hammered with concurrent shipment creates and stock transfers
+through the real API (Django test client, JWT bearer auth) from threads,
+optionally spread over forked worker processes. Shipments pick several
+products in random order, which is what used to let two requests lock the
+same rows in opposite orders.
+
+Afterwards the stock is checked against what the successful operations
+recorded: for every product and warehouse, the initial quantity minus the
+shipped items and outgoing transfers plus incoming transfers must equal the
+quantity on hand, the stock movement ledger must add up to the same
+quantities, and the database must hold exactly as many shipments and
+transfer logs as requests succeeded. On PostgreSQL a monitor samples
+``pg_stat_activity`` for sessions waiting on locks and reads the deadlock
+counter from ``pg_stat_database``.
+"""
+import multiprocessing
+import random
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, close_old_connections, connection, connections
+from django.db.models import Sum
+from django.test import Client
+from django.urls import reverse
+
+from apps.containers.models import Container
+from apps.inventory.models import Product, ProductStock, ProductTransferLog, StockMovement, Warehouse
+from apps.inventory.services import record_movements
+from apps.shipments.models import Shipment, ShipmentItem
+from apps.users.models import UserRole
+
+from .benchmarking import percentile
+
+DEADLOCK_SQLSTATE = "40P01"
+LOCK_TIMEOUT_SQLSTATE = "55P03"
+SERIALIZATION_SQLSTATE = "40001"
+
+
+def _sqlstate(exc):
+    cause = exc.__cause__ or exc
+    return getattr(cause, "sqlstate", None) or getattr(cause, "pgcode", None)
+
+
+def classify(response=None, exc=None):
+    """Maps one request's outcome to success/rejected/conflict/deadlock/lock_timeout/error."""
+    if exc is not None:
+        state = _sqlstate(exc) if isinstance(exc, DatabaseError) else None
+        if state == DEADLOCK_SQLSTATE or "deadlock" in str(exc).lower():
+            return "deadlock"
+        if state in (LOCK_TIMEOUT_SQLSTATE, SERIALIZATION_SQLSTATE):
+            return "lock_timeout"
+        return "error"
+    if response.status_code in (200, 201):
+        return "success"
+    if response.status_code == 400:
+        return "rejected"
+    if response.status_code == 409:
+        return "conflict"
+    # The transfer view turns unexpected exceptions into a 500 with details.
+    if b"deadlock" in response.content.lower():
+        return "deadlock"
+    return "error"
+
+
+class StressFixture:
+    """Users, warehouses and hot products stocked at every warehouse."""
+
+    def __init__(self, products=5, warehouses=3, initial_quantity=200, prefix="stress"):
+        User = get_user_model()
+        suffix = f"{prefix}-{int(time.time() * 1000)}"
+        self.manager = User.objects.create_user(
+            email=f"{suffix}-manager@example.com", password=None, role=UserRole.WAREHOUSE_MANAGER
+        )
+        self.customer = User.objects.create_user(
+            email=f"{suffix}-customer@example.com", password=None, role=UserRole.CUSTOMER
+        )
+        self.warehouses = [
+            Warehouse.objects.create(name=f"{suffix} Warehouse {i}", location_address=f"{i} Stress Way")
+            for i in range(warehouses)
+        ]
+        # Transfers always leave from the warehouse of the product's container.
+        container = Container.objects.create(
+            container_id_code=f"{suffix.upper()}-C", type="40ft Standard",
+            current_warehouse=self.warehouses[0],
+        )
+        self.products = [
+            Product.objects.create(
+                name=f"{suffix} Product {i}",
+                container=container, cost_of_product=Decimal("10.00"), selling_price=Decimal("15.00"),
+            )
+            for i in range(products)
+        ]
+        ProductStock.objects.bulk_create([
+            ProductStock(product=product, warehouse=warehouse, quantity=initial_quantity)
+            for product in self.products
+            for warehouse in self.warehouses
+        ])
+        record_movements(
+            [
+                (product.pk, warehouse.pk, StockMovement.MovementType.RECEIPT, initial_quantity)
+                for product in self.products
+                for warehouse in self.warehouses
+            ],
+            created_by=self.manager,
+        )
+        self.initial = self.stock()
+
+    def stock(self):
+        return {
+            (row["product_id"], row["warehouse_id"]): row["quantity"]
+            for row in ProductStock.objects.filter(product__in=self.products).values(
+                "product_id", "warehouse_id", "quantity"
+            )
+        }
+
+    def plan(self):
+        """The picklable subset a worker needs to issue requests."""
+        from apps.users.serializers import MyTokenObtainPairSerializer
+
+        return {
+            "token": str(MyTokenObtainPairSerializer.get_token(self.manager).access_token),
+            "customer_id": self.customer.pk,
+            "product_ids": [product.pk for product in self.products],
+            "warehouse_ids": [warehouse.pk for warehouse in self.warehouses],
+            "transfer_source_id": self.warehouses[0].pk,
+        }
+
+    def verify(self, successes):
+        """
+        Returns a list of problems: per-row stock that disagrees with the
+        recorded shipments and transfers or with the movement ledger, product
+        totals that disagree with their stock rows, or row counts that
+        disagree with the number of successful requests.
+        """
+        problems = []
+        shipments = Shipment.objects.filter(created_by=self.manager)
+        transfers = ProductTransferLog.objects.filter(transferred_by=self.manager)
+        if shipments.count() != successes.get("shipment", 0):
+            problems.append(
+                f"{shipments.count()} shipments stored, {successes.get('shipment', 0)} creates succeeded."
+            )
+        if transfers.count() != successes.get("transfer", 0):
+            problems.append(
+                f"{transfers.count()} transfer logs stored, {successes.get('transfer', 0)} transfers succeeded."
+            )
+
+        expected = dict(self.initial)
+        shipped = (
+            ShipmentItem.objects.filter(shipment__in=shipments)
+            .values("product_id", "shipment__origin_warehouse_id")
+            .annotate(total=Sum("quantity"))
+            .order_by()
+        )
+        for row in shipped:
+            key = (row["product_id"], row["shipment__origin_warehouse_id"])
+            expected[key] = expected.get(key, 0) - row["total"]
+        moved = (
+            transfers.values("product_id", "from_warehouse_id", "to_warehouse_id")
+            .annotate(total=Sum("quantity_transferred"))
+            .order_by()
+        )
+        for row in moved:
+            source = (row["product_id"], row["from_warehouse_id"])
+            target = (row["product_id"], row["to_warehouse_id"])
+            expected[source] = expected.get(source, 0) - row["total"]
+            expected[target] = expected.get(target, 0) + row["total"]
+
+        actual = self.stock()
+        for key in sorted(set(expected) | set(actual)):
+            if expected.get(key, 0) != actual.get(key, 0):
+                problems.append(
+                    f"Product {key[0]} at warehouse {key[1]}: expected {expected.get(key, 0)}, "
+                    f"found {actual.get(key, 0)}."
+                )
+            if expected.get(key, 0) < 0:
+                problems.append(f"Product {key[0]} at warehouse {key[1]} oversold to {expected[key]}.")
+
+        ledger = {
+            (row["product_id"], row["warehouse_id"]): row["total"]
+            for row in StockMovement.objects.filter(product__in=self.products)
+            .values("product_id", "warehouse_id")
+            .annotate(total=Sum("quantity"))
+            .order_by()
+        }
+        for key in sorted(set(ledger) | set(actual)):
+            if ledger.get(key, 0) != actual.get(key, 0):
+                problems.append(
+                    f"Product {key[0]} at warehouse {key[1]}: ledger adds up to {ledger.get(key, 0)}, "
+                    f"found {actual.get(key, 0)}."
+                )
+
+        totals = {}
+        for (product_id, _), quantity in actual.items():
+            totals[product_id] = totals.get(product_id, 0) + quantity
+        for product in Product.objects.filter(pk__in=totals).order_by("pk"):
+            if product.quantity != totals[product.pk]:
+                problems.append(
+                    f"Product {product.pk} records {product.quantity} in stock, "
+                    f"its stock rows add up to {totals[product.pk]}."
+                )
+        return problems
+
+
+def _operation(rng, plan, transfer_ratio):
+    if rng.random() < transfer_ratio:
+        targets = [pk for pk in plan["warehouse_ids"] if pk != plan["transfer_source_id"]]
+        return "transfer", reverse("product-transfer-product-stock"), {
+            "product": rng.choice(plan["product_ids"]),
+            "to_warehouse": rng.choice(targets),
+            "quantity": rng.randint(1, 5),
+        }
+    products = rng.sample(plan["product_ids"], rng.randint(1, min(3, len(plan["product_ids"]))))
+    return "shipment", reverse("shipment-list"), {
+        "customer_id": plan["customer_id"],
+        "origin_warehouse_id": rng.choice(plan["warehouse_ids"]),
+        "destination_address": "1 Stress Test Road",
+        # Confirmed straight away, so the stock is taken rather than reserved.
+        "status": "PR",
+        "items": [{"product_id": pk, "quantity": rng.randint(1, 5)} for pk in products],
+    }
+
+
+def _run_thread(plan, operations, seed, transfer_ratio, records):
+    rng = random.Random(seed)
+    client = Client(headers={"authorization": f"Bearer {plan['token']}"})
+    try:
+        for _ in range(operations):
+            kind, url, payload = _operation(rng, plan, transfer_ratio)
+            start = time.perf_counter()
+            response, error = None, None
+            try:
+                response = client.post(url, payload, content_type="application/json")
+            except Exception as exc:
+                error = exc
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            outcome = classify(response, error)
+            detail = None
+            if outcome not in ("success", "rejected", "conflict"):
+                detail = f"{type(error).__name__}: {error}" if error else response.content.decode(errors="replace")
+            records.append((kind, outcome, elapsed_ms, detail and detail[:300]))
+    finally:
+        connection.close()
+
+
+def run_threads(plan, threads, operations, seed, transfer_ratio):
+    """Runs ``threads`` threads of ``operations`` requests; returns outcome records."""
+    records = []
+    workers = [
+        threading.Thread(
+            target=_run_thread, args=(plan, operations, seed * 1000 + index, transfer_ratio, records)
+        )
+        for index in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return records
+
+
+def _run_process(plan, threads, operations, seed, transfer_ratio):
+    close_old_connections()
+    return run_threads(plan, threads, operations, seed, transfer_ratio)
+
+
+class LockMonitor(threading.Thread):
+    """Samples PostgreSQL sessions waiting on locks until stopped."""
+
+    def __init__(self, interval=0.02):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = 0
+        self.waiting_samples = 0
+        self.max_waiting = 0
+        self.wait_seconds = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            with connection.cursor() as cursor:
+                while not self._stop_event.is_set():
+                    cursor.execute(
+                        "SELECT count(*) FROM pg_stat_activity "
+                        "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                    )
+                    waiting = cursor.fetchone()[0]
+                    self.samples += 1
+                    if waiting:
+                        self.waiting_samples += 1
+                        self.max_waiting = max(self.max_waiting, waiting)
+                        self.wait_seconds += waiting * self.interval
+                    self._stop_event.wait(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def report(self):
+        return {
+            "samples": self.samples,
+            "samples_with_waiters": self.waiting_samples,
+            "max_sessions_waiting": self.max_waiting,
+            "estimated_wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+def _deadlock_count():
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()")
+        return cursor.fetchone()[0]
+
+
+def run_stress(fixture, threads=8, processes=1, operations=50, transfer_ratio=0.3, seed=0):
+    """
+    Runs the workload against ``fixture`` - ``threads`` threads in each of
+    ``processes`` processes, ``operations`` requests per thread - and returns
+    a report with throughput, latency, outcomes, lock waits, deadlocks, the
+    most frequent failure messages and the conservation check.
+    """
+    plan = fixture.plan()
+    pool = None
+    if processes > 1:
+        # Workers are forked up front, before the monitor thread opens its
+        # connection, and must not share the parent's connections either.
+        connections.close_all()
+        pool = multiprocessing.get_context("fork").Pool(processes)
+    deadlocks_before = _deadlock_count()
+    monitor = LockMonitor() if connection.vendor == "postgresql" else None
+    if monitor:
+        monitor.start()
+
+    started = time.perf_counter()
+    if pool is None:
+        records = run_threads(plan, threads, operations, seed, transfer_ratio)
+    else:
+        with pool:
+            results = pool.starmap(_run_process, [
+                (plan, threads, operations, seed * 100 + index, transfer_ratio)
+                for index in range(processes)
+            ])
+        records = [record for result in results for record in result]
+    elapsed = time.perf_counter() - started
+
+    if monitor:
+        monitor.stop()
+    deadlocks_after = _deadlock_count()
+
+    outcomes, successes, failures = {}, {}, {}
+    for kind, outcome, _, detail in records:
+        if detail:
+            failures[detail] = failures.get(detail, 0) + 1
+        outcomes.setdefault(kind, {}).setdefault(outcome, 0)
+        outcomes[kind][outcome] += 1
+        if outcome == "success":
+            successes[kind] = successes.get(kind, 0) + 1
+    latencies = {}
+    for kind in outcomes:
+        values = [ms for record_kind, _, ms, _ in records if record_kind == kind]
+        latencies[kind] = {
+            "p50_ms": round(percentile(values, 0.50), 3),
+            "p95_ms": round(percentile(values, 0.95), 3),
+            "p99_ms": round(percentile(values, 0.99), 3),
+        }
+
+    problems = fixture.verify(successes)
+    return {
+        "database": connection.vendor,
+        "threads": threads,
+        "processes": processes,
+        "requests": len(records),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(records) / elapsed, 1) if elapsed else None,
+        "successful_per_second": round(sum(successes.values()) / elapsed, 1) if elapsed else None,
+        "outcomes": outcomes,
+        "latency": latencies,
+        "lock_waits": monitor.report() if monitor else None,
+        "deadlocks": {
+            "reported_by_clients": sum(kind.get("deadlock", 0) for kind in outcomes.values()),
+            "reported_by_server": (
+                deadlocks_after - deadlocks_before if deadlocks_before is not None else None
+            ),
+        },
+        "failure_samples": dict(sorted(failures.items(), key=lambda item: -item[1])[:10]),
+        "conservation_problems": problems,
+    }
@@ -0,0 +1,105 @@
+# apps/core/testing.py
+"""
+Test helpers that keep list endpoints free of N+1 query patterns.
+
+A list endpoint should run the same number of queries for one row as for
+fifty; if the count grows with the list, a serializer is resolving a
+relation per row. Typical use in an app's tests.py::
+
+    class ProductListQueryTests(QueryScalingMixin, APITestCase):
+        def test_list_queries_do_not_grow(self):
+            self.client.force_authenticate(self.admin)
+            self.assertListQueriesConstant(reverse("product-list"), make_products)
+
+    class AllListQueryTests(QueryScalingMixin, APITestCase):
+        def test_every_list_endpoint(self):
+            self.client.force_authenticate(self.admin)
+            self.assertEveryListEndpointConstant({Product: make_products, ...})
+
+where ``make_products(n)`` creates ``n`` more rows.
+"""
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+
+def _walk(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+
+def _viewset_model(viewset):
+    queryset = getattr(viewset, "queryset", None)
+    if queryset is not None:
+        return queryset.model
+    serializer_class = getattr(viewset, "serializer_class", None)
+    meta = getattr(serializer_class, "Meta", None)
+    return getattr(meta, "model", None)
+
+
+def list_viewset_routes():
+    """
+    Returns ``(url_name, viewset, model)`` for every DRF viewset list route
+    registered by an app under ``apps/``.
+    """
+    routes = {}
+    for pattern in _walk(get_resolver().url_patterns):
+        callback = pattern.callback
+        viewset = getattr(callback, "cls", None)
+        actions = getattr(callback, "actions", None) or {}
+        if viewset is None or actions.get("get") != "list" or not pattern.name:
+            continue
+        if not viewset.__module__.startswith("apps."):
+            continue
+        routes.setdefault(pattern.name, (pattern.name, viewset, _viewset_model(viewset)))
+    return sorted(routes.values(), key=lambda route: route[0])
+
+
+class QueryScalingMixin:
+    """Mix into a DRF APITestCase; uses ``self.client``."""
+    query_scaling_sizes = (1, 10)
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, f"GET {url} returned {response.status_code}")
+        return len(captured), captured
+
+    def assertListQueriesConstant(self, url, make_rows, sizes=None, params=None):
+        """
+        Grows the list with ``make_rows(n)`` to each of ``sizes`` rows and
+        fails if the list endpoint's query count changes along the way.
+        """
+        counts, created, last_captured = {}, 0, None
+        for size in sizes or self.query_scaling_sizes:
+            make_rows(size - created)
+            created = size
+            counts[size], last_captured = self.count_queries(url, params)
+        if len(set(counts.values())) > 1:
+            queries = "\n".join(query["sql"] for query in last_captured.captured_queries)
+            self.fail(
+                f"Query count for {url} grows with the number of rows "
+                f"(rows: queries = {counts}).\nQueries at {created} rows:\n{queries}"
+            )
+
+    def assertEveryListEndpointConstant(self, factories, exclude=()):
+        """
+        Runs assertListQueriesConstant over every viewset list route under
+        ``apps/``. ``factories`` maps a model to its ``make_rows`` callable;
+        routes whose model has no factory are reported as skipped subtests.
+        """
+        for url_name, viewset, model in list_viewset_routes():
+            if url_name in exclude:
+                continue
+            # Each route starts from the same data, not the rows the
+            # previous routes' factories left behind.
+            with self.subTest(url_name=url_name, viewset=viewset.__name__), transaction.atomic():
+                try:
+                    if model not in factories:
+                        self.skipTest(f"No row factory for {model}")
+                    self.assertListQueriesConstant(reverse(url_name), factories[model])
+                finally:
+                    transaction.set_rollback(True)
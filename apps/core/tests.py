@@ -0,0 +1,160 @@
+from itertools import count
+
+from rest_framework.test import APITestCase
+
+from apps.audit_logs.models import ActionLog
+from apps.containers.models import Container
+from apps.deliveries.models import DeliveryTask
+from apps.inventory.models import (
+    Product,
+    ProductStock,
+    ProductTransferLog,
+    StockMovement,
+    Supplier,
+    Warehouse,
+)
+from apps.notifications.models import Notification
+from apps.shipments.models import Shipment, ShipmentItem
+from apps.users.models import User, UserRole
+
+from .testing import QueryScalingMixin, list_viewset_routes
+
+
+class ListEndpointQueryTests(QueryScalingMixin, APITestCase):
+    """Every list endpoint runs the same number of queries for 1 row as for 10."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email="admin@example.com", password="pass", role=UserRole.ADMIN, is_superuser=True
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+        self.serial = count(1)
+
+    def _n(self):
+        return next(self.serial)
+
+    def _user(self, role):
+        return User.objects.create_user(email=f"{role.lower()}{self._n()}@example.com", role=role)
+
+    def _warehouse(self):
+        return Warehouse.objects.create(
+            name=f"Warehouse {self._n()}", location_address="1 Dock Road", created_by=self._user(UserRole.ADMIN)
+        )
+
+    def _container(self, **fields):
+        return Container.objects.create(container_id_code=f"#C-{self._n():05d}", type="20ft Dry Standard", **fields)
+
+    def _product(self):
+        n = self._n()
+        supplier = Supplier.objects.create(name=f"Supplier {n}", email=f"supplier{n}@example.com")
+        return Product.objects.create(
+            name=f"Product {n}",
+            supplier=supplier,
+            container=self._container(),
+            created_by=self._user(UserRole.WAREHOUSE_MANAGER),
+        )
+
+    def _shipment(self):
+        shipment = Shipment.objects.create(
+            customer=self._user(UserRole.CUSTOMER),
+            origin_warehouse=self._warehouse(),
+            destination_address="2 Harbour Street",
+            container=self._container(),
+            created_by=self._user(UserRole.ADMIN),
+        )
+        ShipmentItem.objects.create(shipment=shipment, product=self._product(), quantity=2)
+        ShipmentItem.objects.create(shipment=shipment, product=self._product(), quantity=3)
+        return shipment
+
+    def make_action_logs(self, n):
+        for _ in range(n):
+            product = self._product()
+            ActionLog.objects.create(
+                user=self._user(UserRole.ADMIN), action_verb="PRODUCT_UPDATED", related_object=product
+            )
+
+    def make_containers(self, n):
+        for _ in range(n):
+            self._container(current_warehouse=self._warehouse(), created_by=self._user(UserRole.ADMIN))
+
+    def make_delivery_tasks(self, n):
+        for _ in range(n):
+            DeliveryTask.objects.create(shipment=self._shipment(), dispatcher=self._user(UserRole.DISPATCHER))
+
+    def make_notifications(self, n):
+        for _ in range(n):
+            Notification.objects.create(recipient=self.admin, message="Shipment updated", related_object=self._shipment())
+
+    def make_products(self, n):
+        for _ in range(n):
+            ProductStock.objects.create(product=self._product(), warehouse=self._warehouse(), quantity=5)
+
+    def make_product_stock(self, n):
+        self.make_products(n)
+
+    def make_transfer_logs(self, n):
+        for _ in range(n):
+            ProductTransferLog.objects.create(
+                product=self._product(),
+                quantity_transferred=1,
+                from_warehouse=self._warehouse(),
+                to_warehouse=self._warehouse(),
+                transferred_by=self._user(UserRole.WAREHOUSE_MANAGER),
+            )
+
+    def make_shipments(self, n):
+        for _ in range(n):
+            self._shipment()
+
+    def make_movements(self, n):
+        for _ in range(n):
+            StockMovement.objects.create(
+                product=self._product(),
+                warehouse=self._warehouse(),
+                movement_type=StockMovement.MovementType.SHIPMENT,
+                quantity=-1,
+                shipment=self._shipment(),
+                created_by=self._user(UserRole.ADMIN),
+            )
+
+    def make_suppliers(self, n):
+        for _ in range(n):
+            serial = self._n()
+            Supplier.objects.create(
+                name=f"Supplier {serial}", email=f"supplier{serial}@example.com", created_by=self._user(UserRole.ADMIN)
+            )
+
+    def make_users(self, n):
+        for _ in range(n):
+            self._user(UserRole.CUSTOMER)
+
+    def make_warehouses(self, n):
+        for _ in range(n):
+            self._warehouse()
+
+    def test_every_list_endpoint_is_covered(self):
+        factories = self.factories()
+        missing = [url_name for url_name, _, model in list_viewset_routes() if model not in factories]
+        self.assertEqual(missing, [], "Add a row factory for these list endpoints.")
+
+    def test_every_list_endpoint_runs_constant_queries(self):
+        self.assertEveryListEndpointConstant(self.factories())
+
+    def factories(self):
+        return {
+            ActionLog: self.make_action_logs,
+            Container: self.make_containers,
+            DeliveryTask: self.make_delivery_tasks,
+            Notification: self.make_notifications,
+            Product: self.make_products,
+            ProductStock: self.make_product_stock,
+            ProductTransferLog: self.make_transfer_logs,
+            Shipment: self.make_shipments,
+            StockMovement: self.make_movements,
+            Supplier: self.make_suppliers,
+            User: self.make_users,
+            Warehouse: self.make_warehouses,
+        }
@@ -0,0 +1,31 @@
+# apps/core/views.py
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from . import metrics
+
+LOOPBACK_ADDRESSES = {"127.0.0.1", "::1"}
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires `Bearer METRICS_TOKEN`; without a
+    token configured it only answers scrapes from the local host.
+    """
+    if metrics.prometheus_client is None:
+        return HttpResponse("prometheus_client is not installed.", status=503, content_type="text/plain")
+    if not settings.METRICS_TOKEN:
+        if request.META.get("REMOTE_ADDR") not in LOOPBACK_ADDRESSES:
+            return HttpResponse(status=403)
+    elif not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponse(status=401)
+    registry = metrics.build_registry()
+    return HttpResponse(
+        metrics.prometheus_client.generate_latest(registry),
+        content_type=metrics.prometheus_client.CONTENT_TYPE_LATEST,
+    )
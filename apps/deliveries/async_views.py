@@ -0,0 +1,64 @@
+# apps/deliveries/async_views.py
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+from rest_framework import status
+
+from apps.core.async_api import async_api_view, json_response
+from apps.users.models import UserRole
+from .models import DeliveryTask
+
+CLOSED_STATUSES = (
+    DeliveryTask.DeliveryStatus.DELIVERED,
+    DeliveryTask.DeliveryStatus.RETURNED,
+    DeliveryTask.DeliveryStatus.CANCELLED,
+)
+MANIFEST_FIELDS = (
+    "id",
+    "status",
+    "shipment_id",
+    "shipment__shipment_tracking_id",
+    "shipment__customer__email",
+    "pickup_address",
+    "delivery_address",
+    "scheduled_pickup_datetime",
+    "scheduled_delivery_datetime",
+    "recipient_name",
+    "dispatcher_notes",
+)
+
+
+@async_api_view
+async def dispatcher_manifest(request):
+    """
+    The requesting dispatcher's open delivery tasks in pickup order, with
+    pickup and delivery addresses resolved in the query (the async
+    counterpart of tasks/assigned-to-me/).
+    """
+    if request.user.role != UserRole.DISPATCHER:
+        return json_response(
+            {"detail": "This endpoint is for dispatchers only."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    tasks = (
+        DeliveryTask.objects.filter(dispatcher=request.user)
+        .exclude(status__in=CLOSED_STATUSES)
+        .annotate(
+            pickup_address=Coalesce(
+                NullIf(F("pickup_address_override"), Value("", output_field=TextField())),
+                F("shipment__origin_warehouse__location_address"),
+            ),
+            delivery_address=Coalesce(
+                NullIf(F("delivery_address_override"), Value("", output_field=TextField())),
+                F("shipment__destination_address"),
+            ),
+        )
+        .order_by("scheduled_pickup_datetime", "scheduled_delivery_datetime")
+        .values(*MANIFEST_FIELDS)
+    )
+    results = []
+    async for task in tasks:
+        task["status_display"] = DeliveryTask.DeliveryStatus(task["status"]).label
+        task["tracking_id"] = task.pop("shipment__shipment_tracking_id")
+        task["customer_email"] = task.pop("shipment__customer__email")
+        results.append(task)
+    return json_response({"count": len(results), "results": results})
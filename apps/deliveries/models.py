@@ -1,13 +1,15 @@
 # apps/deliveries/models.py
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.users.models import UserRole
 from apps.shipments.models import Shipment
+from apps.shipments.services import return_stock
+from apps.audit_logs.tracking import TrackedModelMixin
 
 
-class DeliveryTask(models.Model):
+class DeliveryTask(TrackedModelMixin, models.Model):
     class DeliveryStatus(models.TextChoices):
         PENDING_ASSIGNMENT = "PA", _("Pending Assignment")
         ASSIGNED = "AS", _("Assigned to Dispatcher")
@@ -98,17 +100,16 @@ class DeliveryTask(models.Model):
             self.shipment.destination_address if self.shipment else "N/A"
         )
 
+    @transaction.atomic
     def save(self, *args, **kwargs):
-        is_new = self._state.adding
-        old_status = None
-        if not is_new:
-            try:
-                old_status = DeliveryTask.objects.get(pk=self.pk).status
-            except DeliveryTask.DoesNotExist:
-                pass
-
+        # The shipment follows the task's status in the same transaction, so
+        # a shipment that cannot move (e.g. its stock is gone) keeps both.
         super().save(*args, **kwargs)
 
+        returned = self.saved_changes.get("status", (None, None))[1] == DeliveryTask.DeliveryStatus.RETURNED
+        if returned and self.shipment_id:
+            return_stock([self.shipment_id])
+
         if self.shipment:
             shipment_updated = False
             if (
@@ -1,3 +1,60 @@
-from django.test import TestCase
+from rest_framework import status
 
-# Create your tests here.
+from apps.shipments.tests import ShipmentStatus, ShipmentStockTestCase
+
+from .models import DeliveryTask
+
+DeliveryStatus = DeliveryTask.DeliveryStatus
+
+
+class CancelledShipmentDeliveryTests(ShipmentStockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shipment = self.create_shipment(status_code=ShipmentStatus.PROCESSING)
+        self.task = DeliveryTask.objects.create(shipment=self.shipment, status=DeliveryStatus.ASSIGNED)
+        self.assertEqual(self.set_status(self.shipment, ShipmentStatus.CANCELLED).status_code, status.HTTP_200_OK)
+
+    def test_picking_up_does_not_reopen_the_shipment(self):
+        response = self.client.post(f"/api/deliveries/tasks/{self.task.pk}/mark-picked-up/")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.shipment.refresh_from_db()
+        self.task.refresh_from_db()
+        self.assertEqual(self.shipment.status, ShipmentStatus.CANCELLED)
+        self.assertEqual(self.task.status, DeliveryStatus.ASSIGNED)
+        self.assertStock(100)
+
+    def test_delivering_does_not_reopen_the_shipment(self):
+        response = self.client.patch(
+            f"/api/deliveries/tasks/{self.task.pk}/", {"status": DeliveryStatus.DELIVERED}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.shipment.refresh_from_db()
+        self.assertEqual(self.shipment.status, ShipmentStatus.CANCELLED)
+        self.assertStock(100)
+
+
+class ReturnedDeliveryTests(ShipmentStockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shipment = self.create_shipment(status_code=ShipmentStatus.PROCESSING)
+        self.task = DeliveryTask.objects.create(shipment=self.shipment, status=DeliveryStatus.RETURN_TO_HUB)
+
+    def set_task_status(self, status_code):
+        response = self.client.patch(f"/api/deliveries/tasks/{self.task.pk}/", {"status": status_code}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+
+    def test_returned_delivery_restocks(self):
+        self.assertStock(80)
+        self.set_task_status(DeliveryStatus.RETURNED)
+        self.assertStock(100)
+
+    def test_returning_again_restocks_once(self):
+        self.set_task_status(DeliveryStatus.RETURNED)
+        self.set_task_status(DeliveryStatus.RETURN_TO_HUB)
+        self.set_task_status(DeliveryStatus.RETURNED)
+        self.assertStock(100)
+
+    def test_returning_a_cancelled_shipment_restocks_once(self):
+        self.set_status(self.shipment, ShipmentStatus.CANCELLED)
+        self.set_task_status(DeliveryStatus.RETURNED)
+        self.assertStock(100)
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import DeliveryTaskViewSet
+from .async_views import dispatcher_manifest
 
 router = DefaultRouter()
 router.register(r'tasks', DeliveryTaskViewSet, basename='deliverytask') # /api/deliveries/tasks/
 
 urlpatterns = [
+    path('manifest/', dispatcher_manifest, name='dispatcher-manifest'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
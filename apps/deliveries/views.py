@@ -2,20 +2,24 @@
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from django.utils import timezone
 
 from .models import DeliveryTask
 from .serializers import DeliveryTaskSerializer, DeliveryTaskUpdateByDispatcherSerializer
+from apps.shipments.serializers import eager_load_shipments
 from apps.users.models import UserRole
 from apps.users.permissions import IsAdminUserRole, IsWarehouseManagerRole
 from .permissions import IsDeliveryTaskAssigneeOrManager, CanCreateDeliveryTask
+from apps.audit_logs.services import log_model_changes
+from apps.core.conditional import ConditionalGetMixin
+from apps.inventory.services import InsufficientStockError, StockConflictError
+from apps.shipments.services import ShipmentCancelledError
 
 
-class DeliveryTaskViewSet(viewsets.ModelViewSet):
-    queryset = DeliveryTask.objects.select_related(
-        'shipment__customer', 'shipment__origin_warehouse', 'dispatcher'
-    ).all()
+class DeliveryTaskViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = eager_load_shipments(DeliveryTask.objects.select_related('dispatcher'), 'shipment__')
     serializer_class = DeliveryTaskSerializer
 
     def get_permissions(self):
@@ -54,6 +58,18 @@ class DeliveryTaskViewSet(viewsets.ModelViewSet):
             return queryset.filter(dispatcher=user)
         return DeliveryTask.objects.none() 
 
+    def perform_update(self, serializer):
+        try:
+            task = serializer.save()
+        except (InsufficientStockError, StockConflictError, ShipmentCancelledError) as exc:
+            raise ValidationError({"status": [str(exc)]})
+        log_model_changes(
+            task,
+            "DELIVERY_TASK_UPDATED",
+            user=self.request.user,
+            details={"shipment_id": task.shipment_id},
+        )
+
     @action(detail=False, methods=['get'], url_path='assigned-to-me', permission_classes=[IsAuthenticated])
     def assigned_to_me(self, request):
         """
@@ -87,7 +103,11 @@ class DeliveryTaskViewSet(viewsets.ModelViewSet):
             return Response({"error": f"Cannot mark as picked up from status {task.get_status_display()}"}, status=status.HTTP_400_BAD_REQUEST)
         task.status = DeliveryTask.DeliveryStatus.PICKED_UP
         task.actual_pickup_datetime = timezone.now()
-        task.save()
+        try:
+            task.save()
+        except (InsufficientStockError, StockConflictError, ShipmentCancelledError) as exc:
+            # Picking up confirms a still-pending shipment, which takes its stock.
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
         return Response(DeliveryTaskSerializer(task).data)
 
     @action(detail=True, methods=['post'], url_path='mark-delivered')
@@ -101,5 +121,8 @@ class DeliveryTaskViewSet(viewsets.ModelViewSet):
 
         task.status = DeliveryTask.DeliveryStatus.DELIVERED
         task.actual_delivery_datetime = timezone.now()
-        task.save()
+        try:
+            task.save()
+        except (InsufficientStockError, StockConflictError, ShipmentCancelledError) as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
         return Response(DeliveryTaskSerializer(task).data)
\ No newline at end of file
@@ -51,7 +51,7 @@ class ProductAdmin(admin.ModelAdmin):
     )
     search_fields = ("name", "supplier__name", "container__name")
     list_filter = ("created_at", "supplier")
-    readonly_fields = ("created_by", "created_at", "updated_at")
+    readonly_fields = ("quantity", "created_by", "created_at", "updated_at")
 
     def save_model(self, request, obj, form, change):
         if not obj.pk:
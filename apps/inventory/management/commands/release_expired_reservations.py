@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.inventory.services import StockConflictError, release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = (
+        "Gives back stock held for pending shipments whose reservation has expired. "
+        "Run it from cron, or with --interval as a long-running sweeper."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Reservations expired per transaction.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running, sweeping every this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                released = release_expired_reservations(batch_size=options["batch_size"])
+            except StockConflictError as exc:
+                # The rest of the batch is picked up by the next sweep.
+                self.stderr.write(str(exc))
+                released = 0
+            if released or options["verbosity"] > 1:
+                self.stdout.write(self.style.SUCCESS(f"Released {released} expired reservation(s)."))
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
+            close_old_connections()
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.services import verify_product_quantities
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes every product's quantity from its per-warehouse stock rows in "
+        "chunks and reports products whose stored quantity has drifted. With --fix "
+        "the stored quantities are corrected; without it, drift exits non-zero."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Products checked per query.",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Set drifted products to the sum of their stock rows.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        drifted = verify_product_quantities(
+            chunk_size=options["chunk_size"],
+            fix=options["fix"],
+            log=self.stdout.write if options["verbosity"] > 1 else None,
+        )
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Product quantities match their stock."))
+            return
+        for product_id, recorded, actual in drifted:
+            self.stdout.write(f"  product {product_id}: recorded {recorded}, stock rows add up to {actual}")
+        if options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Corrected {len(drifted)} product quantity(ies)."))
+            return
+        raise CommandError(f"{len(drifted)} product quantity(ies) drifted; rerun with --fix to correct them.")
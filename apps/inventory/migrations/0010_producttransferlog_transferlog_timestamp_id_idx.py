@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_rename_selling_cost_product_selling_price'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producttransferlog',
+            index=models.Index(fields=['-timestamp', '-id'], name='transferlog_timestamp_id_idx'),
+        ),
+    ]
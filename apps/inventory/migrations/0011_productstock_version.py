@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_producttransferlog_transferlog_timestamp_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productstock',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='version'),
+        ),
+    ]
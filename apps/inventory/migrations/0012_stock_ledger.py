@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    # Existing stock enters the ledger as one adjustment per row, so
+    # balances replayed from movements match the stock table from day one.
+    ProductStock = apps.get_model('inventory', 'ProductStock')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    now = django.utils.timezone.now()
+    batch = []
+    rows = ProductStock.objects.filter(quantity__gt=0).values_list('product_id', 'warehouse_id', 'quantity')
+    for product_id, warehouse_id, quantity in rows.iterator(chunk_size=2000):
+        batch.append(StockMovement(
+            product_id=product_id,
+            warehouse_id=warehouse_id,
+            movement_type='AD',
+            quantity=quantity,
+            note='Opening balance',
+            created_at=now,
+        ))
+        if len(batch) >= 2000:
+            StockMovement.objects.bulk_create(batch)
+            batch = []
+    StockMovement.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_productstock_version'),
+        ('shipments', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockLedgerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('compacted_through', models.DateField(blank=True, null=True, verbose_name='compacted through')),
+            ],
+            options={
+                'verbose_name': 'stock ledger checkpoint',
+                'verbose_name_plural': 'stock ledger checkpoints',
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('movement_type', models.CharField(choices=[('RC', 'Receipt'), ('SH', 'Shipment'), ('TO', 'Transfer Out'), ('TI', 'Transfer In'), ('AD', 'Adjustment')], max_length=2, verbose_name='movement type')),
+                ('quantity', models.IntegerField(help_text='Signed change in stock.', verbose_name='quantity')),
+                ('note', models.CharField(blank=True, max_length=255, verbose_name='note')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='created by')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='inventory.product', verbose_name='product')),
+                ('shipment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='shipments.shipment', verbose_name='shipment')),
+                ('transfer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='inventory.producttransferlog', verbose_name='transfer')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='inventory.warehouse', verbose_name='warehouse')),
+            ],
+            options={
+                'verbose_name': 'stock movement',
+                'verbose_name_plural': 'stock movements',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['-created_at', '-id'], name='stockmove_created_id_idx'), models.Index(fields=['warehouse', 'product', 'created_at'], name='stockmove_wh_product_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='date')),
+                ('quantity', models.IntegerField(verbose_name='quantity')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='inventory.product', verbose_name='product')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='inventory.warehouse', verbose_name='warehouse')),
+            ],
+            options={
+                'verbose_name': 'stock snapshot',
+                'verbose_name_plural': 'stock snapshots',
+                'constraints': [models.UniqueConstraint(fields=('warehouse', 'product', 'date'), name='stocksnapshot_unique_day')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_stock_ledger'),
+        ('shipments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productstock',
+            name='reserved',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='reserved'),
+        ),
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(verbose_name='quantity')),
+                ('status', models.CharField(choices=[('AC', 'Active'), ('CO', 'Committed'), ('RL', 'Released'), ('EX', 'Expired')], default='AC', max_length=2, verbose_name='status')),
+                ('expires_at', models.DateTimeField(verbose_name='expires at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventory.product', verbose_name='product')),
+                ('shipment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservations', to='shipments.shipment', verbose_name='shipment')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventory.warehouse', verbose_name='warehouse')),
+            ],
+            options={
+                'verbose_name': 'stock reservation',
+                'verbose_name_plural': 'stock reservations',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'AC')), fields=['expires_at'], name='stockres_active_expiry_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='stockmovement',
+            name='movement_type',
+            field=models.CharField(choices=[('RC', 'Receipt'), ('SH', 'Shipment'), ('TO', 'Transfer Out'), ('TI', 'Transfer In'), ('AD', 'Adjustment'), ('RS', 'Restock')], max_length=2, verbose_name='movement type'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:08
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def recompute_product_quantities(apps, schema_editor):
+    # From here on Product.quantity moves with the stock rows, so it has to
+    # start out equal to their sum.
+    Product = apps.get_model('inventory', 'Product')
+    ProductStock = apps.get_model('inventory', 'ProductStock')
+    last_pk = 0
+    while True:
+        ids = list(Product.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:2000])
+        if not ids:
+            break
+        last_pk = ids[-1]
+        totals = dict(
+            ProductStock.objects.filter(product_id__in=ids)
+            .values('product_id')
+            .annotate(total=Sum('quantity'))
+            .order_by()
+            .values_list('product_id', 'total')
+        )
+        Product.objects.bulk_update(
+            [Product(pk=pk, quantity=totals.get(pk, 0)) for pk in ids], ['quantity']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_alter_stockmovement_movement_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='quantity',
+            field=models.IntegerField(default=0, editable=False, verbose_name='quantity'),
+        ),
+        migrations.RunPython(recompute_product_quantities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_product_quantity_from_stock'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='productstock',
+            constraint=models.CheckConstraint(condition=models.Q(('quantity__gte', models.F('reserved'))), name='productstock_quantity_covers_reserved'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.containers.models import Container
+from apps.audit_logs.tracking import TrackedModelMixin
 
 
 class Supplier(models.Model):
@@ -55,9 +57,11 @@ class Warehouse(models.Model):
         return self.name
 
 
-class Product(models.Model):
+class Product(TrackedModelMixin, models.Model):
     name = models.CharField(_("product name"), max_length=255)
-    quantity = models.IntegerField(_("quantity"), default=0)
+    # Sum of the product's stock rows, kept in step by the stock services in
+    # the same transaction as each stock change (see record_movements).
+    quantity = models.IntegerField(_("quantity"), default=0, editable=False)
     description = models.TextField(_("description"), blank=True)
     supplier = models.ForeignKey(
         Supplier,
@@ -118,6 +122,16 @@ class Product(models.Model):
     def __str__(self):
         return f"{self.name} ({self.quantity})"
 
+    def save(self, *args, **kwargs):
+        # quantity is written only by the stock services; saving back the
+        # value this instance loaded would undo stock changes made since.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "quantity"
+            ]
+        super().save(*args, **kwargs)
+
 
 class ProductStock(models.Model):
     product = models.ForeignKey(
@@ -133,6 +147,11 @@ class ProductStock(models.Model):
         verbose_name=_("warehouse"),
     )
     quantity = models.PositiveIntegerField(_("quantity"), default=0)
+    # Sum of the active StockReservation rows for this product and warehouse;
+    # quantity - reserved is what can still be promised to new orders.
+    reserved = models.PositiveIntegerField(_("reserved"), default=0, editable=False)
+    # Bumped by every write; compare-and-swap updates match on it.
+    version = models.PositiveIntegerField(_("version"), default=0, editable=False)
     last_updated = models.DateTimeField(_("last updated"), auto_now=True)
 
     class Meta:
@@ -140,10 +159,29 @@ class ProductStock(models.Model):
         verbose_name_plural = _("product stocks")
         unique_together = ("product", "warehouse")
         ordering = ["warehouse", "product"]
+        constraints = [
+            # Enforced by the database so no write path, however racy, can
+            # promise more than is on hand.
+            models.CheckConstraint(
+                condition=models.Q(quantity__gte=models.F("reserved")),
+                name="productstock_quantity_covers_reserved",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.product.name} in {self.warehouse.name}: {self.quantity}"
 
+    @property
+    def available(self):
+        return self.quantity - self.reserved
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+        super().save(*args, **kwargs)
+
 
 class ProductTransferLog(models.Model): 
     product = models.ForeignKey(
@@ -175,6 +213,9 @@ class ProductTransferLog(models.Model):
         verbose_name = _("product transfer log")
         verbose_name_plural = _("product transfer logs")
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="transferlog_timestamp_id_idx"),
+        ]
 
     def __str__(self):
         return (
@@ -186,4 +227,164 @@ class ProductTransferLog(models.Model):
     def save(self, *args, **kwargs):
         if self.product and hasattr(self.product, 'container') and self.product.container and self.product.container.current_warehouse:
             self.from_warehouse = self.product.container.current_warehouse
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class StockMovement(models.Model):
+    """
+    One signed change to the stock of a product at a warehouse. Rows are
+    only ever inserted; the running sum per product and warehouse is the
+    quantity on hand. See StockSnapshot for the daily compaction.
+    """
+    class MovementType(models.TextChoices):
+        RECEIPT = "RC", _("Receipt")
+        SHIPMENT = "SH", _("Shipment")
+        TRANSFER_OUT = "TO", _("Transfer Out")
+        TRANSFER_IN = "TI", _("Transfer In")
+        ADJUSTMENT = "AD", _("Adjustment")
+        RESTOCK = "RS", _("Restock")
+
+    product = models.ForeignKey(
+        Product, related_name="stock_movements", on_delete=models.PROTECT, verbose_name=_("product")
+    )
+    warehouse = models.ForeignKey(
+        Warehouse, related_name="stock_movements", on_delete=models.PROTECT, verbose_name=_("warehouse")
+    )
+    movement_type = models.CharField(_("movement type"), max_length=2, choices=MovementType.choices)
+    quantity = models.IntegerField(_("quantity"), help_text=_("Signed change in stock."))
+    shipment = models.ForeignKey(
+        "shipments.Shipment",
+        related_name="stock_movements",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("shipment"),
+    )
+    transfer = models.ForeignKey(
+        ProductTransferLog,
+        related_name="stock_movements",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("transfer"),
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("created by"),
+    )
+    note = models.CharField(_("note"), max_length=255, blank=True)
+    created_at = models.DateTimeField(_("created at"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("stock movement")
+        verbose_name_plural = _("stock movements")
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="stockmove_created_id_idx"),
+            models.Index(fields=["warehouse", "product", "created_at"], name="stockmove_wh_product_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_movement_type_display()} {self.quantity:+d} of {self.product_id} at {self.warehouse_id}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Stock movements are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Stock movements are append-only.")
+
+
+class StockSnapshot(models.Model):
+    """
+    Quantity on hand of a product at a warehouse at the end of ``date``
+    (UTC). A snapshot is written for every compacted day on which the pair
+    had movements, so the latest one at or before a day is its balance.
+    """
+    product = models.ForeignKey(
+        Product, related_name="stock_snapshots", on_delete=models.CASCADE, verbose_name=_("product")
+    )
+    warehouse = models.ForeignKey(
+        Warehouse, related_name="stock_snapshots", on_delete=models.CASCADE, verbose_name=_("warehouse")
+    )
+    date = models.DateField(_("date"))
+    quantity = models.IntegerField(_("quantity"))
+
+    class Meta:
+        verbose_name = _("stock snapshot")
+        verbose_name_plural = _("stock snapshots")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["warehouse", "product", "date"], name="stocksnapshot_unique_day"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} at {self.warehouse_id} on {self.date}: {self.quantity}"
+
+
+class StockLedgerCheckpoint(models.Model):
+    """Single row recording the last day compacted into StockSnapshot."""
+    compacted_through = models.DateField(_("compacted through"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("stock ledger checkpoint")
+        verbose_name_plural = _("stock ledger checkpoints")
+
+    @classmethod
+    def load(cls, for_update=False):
+        queryset = cls.objects.select_for_update() if for_update else cls.objects
+        checkpoint, _created = queryset.get_or_create(pk=1)
+        return checkpoint
+
+
+class StockReservation(models.Model):
+    """
+    Stock held for a shipment awaiting confirmation. While ACTIVE its
+    quantity is counted in ProductStock.reserved; confirming the shipment
+    commits it (the stock is deducted), cancelling releases it, and the
+    sweeper expires it once ``expires_at`` has passed.
+    """
+
+    class ReservationStatus(models.TextChoices):
+        ACTIVE = "AC", _("Active")
+        COMMITTED = "CO", _("Committed")
+        RELEASED = "RL", _("Released")
+        EXPIRED = "EX", _("Expired")
+
+    shipment = models.ForeignKey(
+        "shipments.Shipment",
+        related_name="stock_reservations",
+        on_delete=models.CASCADE,
+        verbose_name=_("shipment"),
+    )
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, verbose_name=_("product"))
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.PROTECT, verbose_name=_("warehouse"))
+    quantity = models.PositiveIntegerField(_("quantity"))
+    status = models.CharField(
+        _("status"),
+        max_length=2,
+        choices=ReservationStatus.choices,
+        default=ReservationStatus.ACTIVE,
+    )
+    expires_at = models.DateTimeField(_("expires at"))
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("stock reservation")
+        verbose_name_plural = _("stock reservations")
+        ordering = ["-created_at"]
+        indexes = [
+            # The sweeper's scan: only active holds, oldest expiry first.
+            models.Index(
+                fields=["expires_at"],
+                condition=models.Q(status="AC"),
+                name="stockres_active_expiry_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} at {self.warehouse_id} for shipment {self.shipment_id}"
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.db import transaction
-from .models import Supplier, Warehouse, Product, ProductStock, ProductTransferLog
+from django.db.models import Prefetch
+from .models import Supplier, Warehouse, Product, ProductStock, ProductTransferLog, StockMovement
+from .services import transfer_stock
 from apps.users.serializers import UserSimpleSerializer
 from apps.containers.models import Container
 
@@ -90,6 +92,23 @@ class ProductSerializer(serializers.ModelSerializer):
         validated_data["created_by"] = self.context["request"].user
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        product = super().update(instance, validated_data)
+        # The container's totals were annotated before this product's prices
+        # changed; reload it on access.
+        product._state.fields_cache.pop("container", None)
+        return product
+
+
+def eager_load_products(queryset, prefix=""):
+    """
+    Loads what ProductSerializer shows for the products at ``prefix`` (e.g.
+    ``"product__"``) of ``queryset`` in a fixed number of queries.
+    """
+    return queryset.select_related(
+        f"{prefix}supplier__created_by", f"{prefix}created_by"
+    ).prefetch_related(Prefetch(f"{prefix}container", queryset=Container.objects.with_details()))
+
 
 class ProductStockSerializer(serializers.ModelSerializer):
     product_id = serializers.PrimaryKeyRelatedField(
@@ -110,9 +129,23 @@ class ProductStockSerializer(serializers.ModelSerializer):
             "product",
             "warehouse",
             "quantity",
+            "reserved",
+            "available",
+            "version",
             "last_updated",
         )
-        read_only_fields = ("last_updated",)
+        read_only_fields = ("reserved", "available", "version", "last_updated")
+
+    def validate(self, data):
+        stock = self.instance
+        if stock is not None and stock.reserved:
+            if data.get("quantity", stock.quantity) < stock.reserved:
+                raise serializers.ValidationError(
+                    {"quantity": [f"{stock.reserved} units are reserved for pending shipments."]}
+                )
+            if data.get("product", stock.product) != stock.product or data.get("warehouse", stock.warehouse) != stock.warehouse:
+                raise serializers.ValidationError("Stock with active reservations cannot be moved.")
+        return data
 
 
 class ProductTransferLogSerializer(serializers.ModelSerializer):
@@ -144,6 +177,29 @@ class ProductTransferLogSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class StockMovementSerializer(serializers.ModelSerializer):
+    movement_type_display = serializers.CharField(
+        source="get_movement_type_display", read_only=True
+    )
+
+    class Meta:
+        model = StockMovement
+        fields = (
+            "id",
+            "product",
+            "warehouse",
+            "movement_type",
+            "movement_type_display",
+            "quantity",
+            "shipment",
+            "transfer",
+            "created_by",
+            "note",
+            "created_at",
+        )
+        read_only_fields = fields
+
+
 class ProductTransferActionSerializer(serializers.Serializer):
     product = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(), help_text="ID of the product to transfer."
@@ -206,13 +262,12 @@ class ProductTransferActionSerializer(serializers.Serializer):
         description_text = validated_data.get("description", "")
         user = self.context["request"].user
 
-        # Only log the transfer, do not check or update ProductStock
-        log_entry = ProductTransferLog.objects.create(
-            product=product_obj,
-            quantity_transferred=quantity_transferred,
-            from_warehouse=from_warehouse_obj,
-            to_warehouse=to_warehouse_obj,
-            transferred_by=user,
+        # Raises InsufficientStockError when the source warehouse is short.
+        return transfer_stock(
+            product_obj,
+            from_warehouse_obj,
+            to_warehouse_obj,
+            quantity_transferred,
+            user=user,
             description=description_text,
         )
-        return log_entry
@@ -0,0 +1,631 @@
+# apps/inventory/services.py
+"""
+Stock mutations.
+
+Stock rows are never locked up front. Each change is a compare-and-swap:
+the row is read, the new quantity is checked, and an UPDATE that matches
+on the ``version`` it was read with writes it and bumps the version. A
+writer that loses the race re-reads the row and tries again, up to
+STOCK_UPDATE_RETRIES times. Row locks are therefore held only from the
+UPDATE to the end of the transaction, not for the whole request. Rows are
+updated in primary key order, so concurrent writers cannot deadlock.
+
+Shipments awaiting confirmation reserve stock instead of taking it: the
+held amount is added to ProductStock.reserved (through the same
+compare-and-swap) and recorded as StockReservation rows with an expiry.
+Confirming the shipment commits the hold, cancelling releases it, and
+release_expired_reservations gives back holds nobody confirmed in time.
+Every check against stock is against quantity - reserved.
+
+Every change is also appended to the StockMovement ledger in the same
+transaction, and the net change per product is added to Product.quantity
+there as well, so a product's quantity is always the sum of its stock rows
+without aggregating at read time; verify_product_quantities recomputes it
+to catch drift. compact_stock_ledger folds finished days into StockSnapshot
+rows, so stock_at answers "what was on hand at time T" from one snapshot
+per product and warehouse plus at most a day of movements (more only while
+compaction is behind).
+"""
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.core.metrics import STOCK_LOCK_WAIT, STOCK_RESERVATIONS_RELEASED, STOCK_UPDATE_CONFLICTS
+
+from .models import (
+    Product,
+    ProductStock,
+    ProductTransferLog,
+    StockLedgerCheckpoint,
+    StockMovement,
+    StockReservation,
+    StockSnapshot,
+)
+
+MovementType = StockMovement.MovementType
+ReservationStatus = StockReservation.ReservationStatus
+
+
+class InsufficientStockError(ValueError):
+    def __init__(self, product_id, warehouse_id, available, requested):
+        self.product_id = product_id
+        self.warehouse_id = warehouse_id
+        self.available = available
+        self.requested = requested
+        if available is None:
+            message = f"No stock record for product {product_id} in warehouse {warehouse_id}."
+        else:
+            message = (
+                f"Insufficient stock for product {product_id} in warehouse {warehouse_id}. "
+                f"Available: {available}, Requested: {requested}."
+            )
+        super().__init__(message)
+
+
+class StockConflictError(RuntimeError):
+    """A stock row kept changing underneath a compare-and-swap update."""
+
+    def __init__(self, product_id, warehouse_id):
+        self.product_id = product_id
+        self.warehouse_id = warehouse_id
+        super().__init__(
+            f"Stock for product {product_id} in warehouse {warehouse_id} is being changed "
+            "concurrently; please retry."
+        )
+
+
+def compare_and_set(stock_id, version, operation="update", **values):
+    """
+    Writes ``values`` to the stock row only if it still has ``version``, and
+    bumps the version. Returns whether the row was updated.
+    """
+    with STOCK_LOCK_WAIT.labels(operation=operation).time():
+        updated = ProductStock.objects.filter(pk=stock_id, version=version).update(
+            version=F("version") + 1, last_updated=timezone.now(), **values
+        )
+    return updated == 1
+
+
+def _read_rows(pairs):
+    condition = Q()
+    for product_id, warehouse_id in pairs:
+        condition |= Q(product_id=product_id, warehouse_id=warehouse_id)
+    rows = ProductStock.objects.filter(condition).values(
+        "pk", "product_id", "warehouse_id", "quantity", "reserved", "version"
+    )
+    return {(row["product_id"], row["warehouse_id"]): row for row in rows}
+
+
+@transaction.atomic
+def apply_stock_deltas(deltas, operation, reserved_deltas=None):
+    """
+    Adds ``deltas`` ({(product id, warehouse id): signed quantity}) to the
+    quantity of the matching stock rows and ``reserved_deltas`` (same shape)
+    to their reserved amount, all or nothing. Raises InsufficientStockError
+    if a row is missing, would go negative, or would need more than its
+    available (unreserved) stock; StockConflictError if a row could not be
+    updated within STOCK_UPDATE_RETRIES attempts.
+    """
+    reserved_deltas = reserved_deltas or {}
+    pairs = set(deltas) | set(reserved_deltas)
+    # How much of each row's available stock the change uses up.
+    consumed = {pair: reserved_deltas.get(pair, 0) - deltas.get(pair, 0) for pair in pairs}
+    rows = _read_rows(pairs)
+    for pair in pairs:
+        if pair not in rows:
+            raise InsufficientStockError(pair[0], pair[1], None, consumed[pair])
+
+    for pair in sorted(pairs, key=lambda key: rows[key]["pk"]):
+        delta, reserved_delta, row = deltas.get(pair, 0), reserved_deltas.get(pair, 0), rows[pair]
+        for _ in range(settings.STOCK_UPDATE_RETRIES):
+            quantity = row["quantity"] + delta
+            reserved = max(row["reserved"] + reserved_delta, 0)
+            if quantity < 0 or (consumed[pair] > 0 and quantity < reserved):
+                raise InsufficientStockError(
+                    pair[0], pair[1], row["quantity"] - row["reserved"], consumed[pair]
+                )
+            if compare_and_set(row["pk"], row["version"], operation, quantity=quantity, reserved=reserved):
+                break
+            STOCK_UPDATE_CONFLICTS.labels(operation=operation).inc()
+            row = ProductStock.objects.filter(pk=row["pk"]).values("pk", "quantity", "reserved", "version").first()
+            if row is None:
+                raise InsufficientStockError(pair[0], pair[1], None, consumed[pair])
+        else:
+            raise StockConflictError(*pair)
+
+
+def record_movements(entries, **fields):
+    """
+    Appends ledger rows for ``(product id, warehouse id, movement type,
+    signed quantity)`` entries; ``fields`` (shipment, transfer, created_by,
+    note) apply to all of them. Zero changes are skipped.
+    """
+    save_movements([
+        StockMovement(
+            product_id=product_id,
+            warehouse_id=warehouse_id,
+            movement_type=movement_type,
+            quantity=quantity,
+            **fields,
+        )
+        for product_id, warehouse_id, movement_type, quantity in entries
+        if quantity
+    ])
+
+
+def save_movements(movements):
+    """
+    Inserts StockMovement rows and adds their net change per product to
+    Product.quantity. Must run in the transaction that changed the stock.
+    """
+    StockMovement.objects.bulk_create(movements)
+    deltas = {}
+    for movement in movements:
+        deltas[movement.product_id] = deltas.get(movement.product_id, 0) + movement.quantity
+    adjust_product_quantities(deltas)
+
+
+def adjust_product_quantities(deltas):
+    """
+    Adds ``deltas`` ({product id: signed quantity}) to Product.quantity with
+    a single ``quantity = quantity + CASE id ...`` UPDATE. Transfers net to
+    zero per product and leave the product row alone.
+    """
+    deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    increment = Case(
+        *[When(pk=product_id, then=Value(delta)) for product_id, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    Product.objects.filter(pk__in=deltas).update(quantity=F("quantity") + increment)
+
+
+@transaction.atomic
+def deduct_stock(warehouse_id, quantities, operation="shipment_create", shipment=None, user=None):
+    """Takes ``quantities`` ({product id: quantity}) out of one warehouse, all or nothing."""
+    apply_stock_deltas(
+        {(product_id, warehouse_id): -quantity for product_id, quantity in quantities.items()},
+        operation,
+    )
+    record_movements(
+        [
+            (product_id, warehouse_id, MovementType.SHIPMENT, -quantity)
+            for product_id, quantity in quantities.items()
+        ],
+        shipment=shipment,
+        created_by=user,
+    )
+
+
+@transaction.atomic
+def restock(warehouse_id, quantities, operation="restock"):
+    """
+    Adds ``quantities`` ({product id: quantity}) back to one warehouse's
+    stock with a single ``quantity = quantity + CASE product_id ...``
+    UPDATE. Increments cannot lose updates, so this skips the
+    compare-and-swap, but it bumps the versions so compare-and-swap writers
+    notice. Stock rows that no longer exist are recreated first.
+    """
+    quantities = {product_id: quantity for product_id, quantity in quantities.items() if quantity}
+    if not quantities:
+        return
+    rows = ProductStock.objects.filter(warehouse_id=warehouse_id, product_id__in=quantities)
+    missing = set(quantities) - set(rows.values_list("product_id", flat=True))
+    if missing:
+        ProductStock.objects.bulk_create(
+            [ProductStock(product_id=product_id, warehouse_id=warehouse_id) for product_id in missing],
+            ignore_conflicts=True,
+        )
+    increment = Case(
+        *[When(product_id=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    with STOCK_LOCK_WAIT.labels(operation=operation).time():
+        rows.update(
+            quantity=F("quantity") + increment,
+            version=F("version") + 1,
+            last_updated=timezone.now(),
+        )
+
+
+@transaction.atomic
+def transfer_stock(product, from_warehouse, to_warehouse, quantity, user=None, description=""):
+    """
+    Moves ``quantity`` of ``product`` between warehouses, creating the
+    destination stock row if needed, and records the transfer.
+    """
+    ProductStock.objects.get_or_create(product=product, warehouse=to_warehouse)
+    apply_stock_deltas(
+        {(product.pk, from_warehouse.pk): -quantity, (product.pk, to_warehouse.pk): quantity},
+        operation="transfer",
+    )
+    log_entry = ProductTransferLog.objects.create(
+        product=product,
+        quantity_transferred=quantity,
+        from_warehouse=from_warehouse,
+        to_warehouse=to_warehouse,
+        transferred_by=user,
+        description=description or "",
+    )
+    record_movements(
+        [
+            (product.pk, from_warehouse.pk, MovementType.TRANSFER_OUT, -quantity),
+            (product.pk, to_warehouse.pk, MovementType.TRANSFER_IN, quantity),
+        ],
+        transfer=log_entry,
+        created_by=user,
+    )
+    return log_entry
+
+
+# Reservations ----------------------------------------------------------------
+
+def available_to_promise(warehouse_id, product_ids):
+    """
+    {product id: quantity - reserved} at one warehouse, read in one query
+    through the (product, warehouse) unique index. Products without a stock
+    record there are left out.
+    """
+    return dict(
+        ProductStock.objects.filter(warehouse_id=warehouse_id, product_id__in=product_ids)
+        .annotate(available=F("quantity") - F("reserved"))
+        .values_list("product_id", "available")
+    )
+
+
+@transaction.atomic
+def reserve_stock(shipment, quantities):
+    """
+    Holds ``quantities`` ({product id: quantity}) at the shipment's origin
+    warehouse for STOCK_RESERVATION_TTL_MINUTES, all or nothing.
+    """
+    warehouse_id = shipment.origin_warehouse_id
+    apply_stock_deltas(
+        {},
+        "shipment_reserve",
+        reserved_deltas={(product_id, warehouse_id): quantity for product_id, quantity in quantities.items()},
+    )
+    expires_at = timezone.now() + datetime.timedelta(minutes=settings.STOCK_RESERVATION_TTL_MINUTES)
+    return StockReservation.objects.bulk_create([
+        StockReservation(
+            shipment=shipment,
+            product_id=product_id,
+            warehouse_id=warehouse_id,
+            quantity=quantity,
+            expires_at=expires_at,
+        )
+        for product_id, quantity in quantities.items()
+    ])
+
+
+def _claim_active_reservations(shipment_ids):
+    """
+    Locks the shipments' active holds, so the sweeper (which skips locked
+    rows) cannot expire them while they are being committed or released.
+    """
+    return list(
+        StockReservation.objects.select_for_update()
+        .filter(shipment_id__in=shipment_ids, status=ReservationStatus.ACTIVE)
+        .order_by("pk")
+    )
+
+
+def shipments_only_holding_stock(shipment_ids):
+    """
+    Returns the ids among ``shipment_ids`` whose stock has only been held:
+    they have reservations, none committed, and no shipment movement. The
+    others' stock was taken, when they were confirmed or - created before
+    reservations existed - up front.
+    """
+    reserved = StockReservation.objects.filter(shipment_id__in=shipment_ids).order_by()
+    taken = set(
+        reserved.filter(status=ReservationStatus.COMMITTED).values_list("shipment_id", flat=True)
+    ) | set(
+        StockMovement.objects.filter(shipment_id__in=shipment_ids, movement_type=MovementType.SHIPMENT)
+        .order_by()
+        .values_list("shipment_id", flat=True)
+    )
+    return set(reserved.values_list("shipment_id", flat=True)) - taken
+
+
+def _held(reservations):
+    held = {}
+    for reservation in reservations:
+        pair = (reservation.product_id, reservation.warehouse_id)
+        held[pair] = held.get(pair, 0) + reservation.quantity
+    return held
+
+
+@transaction.atomic
+def commit_reservations(shipment, user=None):
+    """
+    Takes a confirmed shipment's items out of stock. Quantities still held
+    for it move out of ``reserved`` and ``quantity`` together; items whose
+    hold already expired are taken from available stock like a new order.
+    Does nothing if the shipment's stock was already taken.
+    """
+    reservations = _claim_active_reservations([shipment.pk])
+    if shipment.pk not in shipments_only_holding_stock([shipment.pk]):
+        return
+    warehouse_id = shipment.origin_warehouse_id
+    quantities = {}
+    for product_id, quantity in shipment.items.values_list("product_id", "quantity"):
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    apply_stock_deltas(
+        {(product_id, warehouse_id): -quantity for product_id, quantity in quantities.items()},
+        "shipment_confirm",
+        reserved_deltas={pair: -quantity for pair, quantity in _held(reservations).items()},
+    )
+    StockReservation.objects.filter(pk__in=[reservation.pk for reservation in reservations]).update(
+        status=ReservationStatus.COMMITTED
+    )
+    record_movements(
+        [
+            (product_id, warehouse_id, MovementType.SHIPMENT, -quantity)
+            for product_id, quantity in quantities.items()
+        ],
+        shipment=shipment,
+        created_by=user,
+    )
+
+
+@transaction.atomic
+def release_reservations(shipment_ids):
+    """Gives back the active holds of ``shipment_ids``. Returns how many were released."""
+    reservations = _claim_active_reservations(shipment_ids)
+    if not reservations:
+        return 0
+    apply_stock_deltas(
+        {},
+        "reservation_release",
+        reserved_deltas={pair: -quantity for pair, quantity in _held(reservations).items()},
+    )
+    StockReservation.objects.filter(pk__in=[reservation.pk for reservation in reservations]).update(
+        status=ReservationStatus.RELEASED
+    )
+    STOCK_RESERVATIONS_RELEASED.labels(reason="released").inc(len(reservations))
+    return len(reservations)
+
+
+def release_expired_reservations(batch_size=1000, now=None):
+    """
+    Expires active holds whose ``expires_at`` has passed, ``batch_size`` at
+    a time, each batch in one transaction: one read of the partial expiry
+    index, one stock update per product and warehouse, one status update.
+    Holds locked by a concurrent commit or release are skipped. Returns the
+    number of holds expired.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(status=ReservationStatus.ACTIVE, expires_at__lte=now)
+                .order_by("expires_at")
+                .values_list("pk", "product_id", "warehouse_id", "quantity")[:batch_size]
+            )
+            if not batch:
+                break
+            held = {}
+            for _, product_id, warehouse_id, quantity in batch:
+                held[(product_id, warehouse_id)] = held.get((product_id, warehouse_id), 0) + quantity
+            apply_stock_deltas(
+                {}, "reservation_expiry", reserved_deltas={pair: -quantity for pair, quantity in held.items()}
+            )
+            StockReservation.objects.filter(pk__in=[row[0] for row in batch]).update(
+                status=ReservationStatus.EXPIRED
+            )
+        STOCK_RESERVATIONS_RELEASED.labels(reason="expired").inc(len(batch))
+        expired += len(batch)
+        if len(batch) < batch_size:
+            break
+    return expired
+
+
+# Point-in-time stock ---------------------------------------------------------
+
+def day_start(day):
+    """The first instant (UTC) of ``day``."""
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=datetime.timezone.utc)
+
+
+def _utc_date(value):
+    return value.astimezone(datetime.timezone.utc).date()
+
+
+def stock_at(at, warehouse_id=None, product_id=None):
+    """
+    Returns {(product id, warehouse id): quantity} as of the instant ``at``,
+    optionally for one warehouse and/or product. Reads the latest snapshot
+    of each pair from before ``at``'s day (capped at the compaction
+    checkpoint) and adds the movements recorded after it.
+    """
+    filters = {}
+    if warehouse_id is not None:
+        filters["warehouse_id"] = warehouse_id
+    if product_id is not None:
+        filters["product_id"] = product_id
+
+    compacted_through = (
+        StockLedgerCheckpoint.objects.filter(pk=1).values_list("compacted_through", flat=True).first()
+    )
+    boundary = None
+    if compacted_through is not None:
+        boundary = min(compacted_through, _utc_date(at) - datetime.timedelta(days=1))
+
+    balances = {}
+    tail = StockMovement.objects.filter(created_at__lte=at, **filters)
+    if boundary is not None:
+        latest_date = (
+            StockSnapshot.objects.filter(
+                product=OuterRef("product"), warehouse=OuterRef("warehouse"), date__lte=boundary
+            )
+            .order_by("-date")
+            .values("date")[:1]
+        )
+        snapshots = StockSnapshot.objects.filter(date__lte=boundary, **filters).filter(
+            date=Subquery(latest_date)
+        )
+        for row in snapshots.values("product_id", "warehouse_id", "quantity"):
+            balances[(row["product_id"], row["warehouse_id"])] = row["quantity"]
+        tail = tail.filter(created_at__gte=day_start(boundary + datetime.timedelta(days=1)))
+
+    for row in tail.values("product_id", "warehouse_id").annotate(total=Sum("quantity")).order_by():
+        key = (row["product_id"], row["warehouse_id"])
+        balances[key] = balances.get(key, 0) + row["total"]
+    return balances
+
+
+def _previous_balances(day, pairs):
+    """Latest snapshot quantity before ``day`` for each of ``pairs``."""
+    latest_date = (
+        StockSnapshot.objects.filter(
+            product=OuterRef("product"), warehouse=OuterRef("warehouse"), date__lt=day
+        )
+        .order_by("-date")
+        .values("date")[:1]
+    )
+    rows = StockSnapshot.objects.filter(
+        date__lt=day,
+        warehouse_id__in={warehouse_id for _, warehouse_id in pairs},
+        product_id__in={product_id for product_id, _ in pairs},
+    ).filter(date=Subquery(latest_date))
+    return {
+        (row["product_id"], row["warehouse_id"]): row["quantity"]
+        for row in rows.values("product_id", "warehouse_id", "quantity")
+        if (row["product_id"], row["warehouse_id"]) in pairs
+    }
+
+
+def compact_stock_ledger(through=None, batch_size=2000, log=None):
+    """
+    Writes a StockSnapshot for every product and warehouse with movements on
+    each day after the checkpoint, up to ``through`` (default: yesterday,
+    UTC). Each day is one transaction that also advances the checkpoint, so
+    an interrupted run resumes where it stopped. Returns (days, snapshots).
+    """
+    log = log or (lambda message: None)
+    through = through or _utc_date(timezone.now()) - datetime.timedelta(days=1)
+    checkpoint = StockLedgerCheckpoint.load().compacted_through
+    if checkpoint is None:
+        first = StockMovement.objects.order_by("created_at").values_list("created_at", flat=True).first()
+        if first is None:
+            return 0, 0
+        checkpoint = _utc_date(first) - datetime.timedelta(days=1)
+
+    days = snapshots = 0
+    day = checkpoint + datetime.timedelta(days=1)
+    while day <= through:
+        with transaction.atomic():
+            locked = StockLedgerCheckpoint.load(for_update=True)
+            if locked.compacted_through is not None and locked.compacted_through >= day:
+                # Another run got here first.
+                day = locked.compacted_through + datetime.timedelta(days=1)
+                continue
+            totals = {
+                (row["product_id"], row["warehouse_id"]): row["total"]
+                for row in StockMovement.objects.filter(
+                    created_at__gte=day_start(day),
+                    created_at__lt=day_start(day + datetime.timedelta(days=1)),
+                )
+                .values("product_id", "warehouse_id")
+                .annotate(total=Sum("quantity"))
+                .order_by()
+            }
+            if totals:
+                previous = _previous_balances(day, set(totals))
+                StockSnapshot.objects.bulk_create(
+                    [
+                        StockSnapshot(
+                            product_id=product_id,
+                            warehouse_id=warehouse_id,
+                            date=day,
+                            quantity=previous.get((product_id, warehouse_id), 0) + total,
+                        )
+                        for (product_id, warehouse_id), total in totals.items()
+                    ],
+                    batch_size=batch_size,
+                )
+            locked.compacted_through = day
+            locked.save(update_fields=["compacted_through"])
+        log(f"{day}: {len(totals)} snapshot(s)")
+        days += 1
+        snapshots += len(totals)
+        day += datetime.timedelta(days=1)
+    return days, snapshots
+
+
+# Product totals --------------------------------------------------------------
+
+def _stocked_totals(product_ids):
+    return dict(
+        ProductStock.objects.filter(product_id__in=product_ids)
+        .values("product_id")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+        .values_list("product_id", "total")
+    )
+
+
+@transaction.atomic
+def _fix_product_quantities(product_ids):
+    # Stock writers update their stock rows before the product row, so with
+    # the product rows locked every committed change is visible and every
+    # uncommitted one will still add its delta on top of what is written.
+    recorded = dict(
+        Product.objects.select_for_update()
+        .filter(pk__in=product_ids)
+        .order_by("pk")
+        .values_list("pk", "quantity")
+    )
+    totals = _stocked_totals(recorded)
+    fixed = [
+        (product_id, quantity, totals.get(product_id, 0))
+        for product_id, quantity in sorted(recorded.items())
+        if quantity != totals.get(product_id, 0)
+    ]
+    Product.objects.bulk_update(
+        [Product(pk=product_id, quantity=actual) for product_id, _, actual in fixed], ["quantity"]
+    )
+    return fixed
+
+
+def verify_product_quantities(chunk_size=1000, fix=False, log=None):
+    """
+    Recomputes Product.quantity from the product's stock rows, ``chunk_size``
+    products at a time in primary key order, and returns the products that
+    disagree as (product id, recorded, actual) triples. With ``fix`` their
+    quantity is set to the actual total.
+    """
+    stocked = (
+        ProductStock.objects.filter(product_id=OuterRef("pk"))
+        .values("product_id")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    products = Product.objects.annotate(
+        stocked=Coalesce(Subquery(stocked, output_field=IntegerField()), Value(0))
+    ).order_by("pk")
+    drifted, checked, last_pk = [], 0, 0
+    while True:
+        # Recorded and actual are read in one statement, so they agree
+        # unless the product has really drifted.
+        chunk = list(products.filter(pk__gt=last_pk).values_list("pk", "quantity", "stocked")[:chunk_size])
+        if not chunk:
+            break
+        last_pk, checked = chunk[-1][0], checked + len(chunk)
+        found = [row for row in chunk if row[1] != row[2]]
+        if found and fix:
+            found = _fix_product_quantities([product_id for product_id, _, _ in found])
+        drifted.extend(found)
+        if log:
+            log(f"Checked {checked} products, {len(drifted)} drifted.")
+    return drifted
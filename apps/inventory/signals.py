@@ -0,0 +1,10 @@
+# apps/inventory/signals.py
+from django.db.models.signals import post_delete, post_save
+
+from apps.core.caching import bump_model_version_receiver
+
+from .models import Supplier, Warehouse
+
+for model in (Supplier, Warehouse):
+    post_save.connect(bump_model_version_receiver, sender=model, dispatch_uid=f"bump_version_{model.__name__}")
+    post_delete.connect(bump_model_version_receiver, sender=model, dispatch_uid=f"bump_version_{model.__name__}")
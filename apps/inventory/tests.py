@@ -1,3 +1,152 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.containers.models import Container
+from apps.users.models import User, UserRole
+
+from .models import Product, ProductStock, StockMovement, Warehouse
+from .services import verify_product_quantities
+
+
+class InventoryAPITestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", role=UserRole.ADMIN)
+        cls.warehouse = Warehouse.objects.create(name="Main", location_address="1 Dock Road")
+        cls.product = Product.objects.create(name="Widget", cost_of_product=1, selling_price=2)
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def create_stock(self, quantity, product=None, warehouse=None):
+        response = self.client.post(
+            "/api/inventory/product-stock/",
+            {
+                "product_id": (product or self.product).pk,
+                "warehouse_id": (warehouse or self.warehouse).pk,
+                "quantity": quantity,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return ProductStock.objects.get(pk=response.data["id"])
+
+
+class ProtectedDeleteTests(InventoryAPITestCase):
+    def test_product_with_stock_history_is_not_deleted(self):
+        self.create_stock(5)
+        response = self.client.delete(f"/api/inventory/products/{self.product.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(Product.objects.filter(pk=self.product.pk).exists())
+
+    def test_warehouse_with_stock_history_is_not_deleted(self):
+        self.create_stock(5)
+        response = self.client.delete(f"/api/inventory/warehouses/{self.warehouse.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertTrue(Warehouse.objects.filter(pk=self.warehouse.pk).exists())
+
+    def test_unused_product_is_deleted(self):
+        response = self.client.delete(f"/api/inventory/products/{self.product.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Product.objects.filter(pk=self.product.pk).exists())
+
+
+class StockVersionTests(InventoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.stock = self.create_stock(100)
+        self.url = f"/api/inventory/product-stock/{self.stock.pk}/"
+
+    def patch(self, quantity, if_match=None):
+        headers = {"if-match": f'"{if_match}"'} if if_match is not None else {}
+        return self.client.patch(self.url, {"quantity": quantity}, format="json", headers=headers)
+
+    def test_read_returns_the_version_as_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["ETag"], f'"{self.stock.version}"')
+
+    def test_matching_if_match_updates_and_bumps_the_version(self):
+        response = self.patch(90, if_match=self.stock.version)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 90)
+        self.assertEqual(response["ETag"], f'"{self.stock.version}"')
+
+    def test_stale_if_match_is_rejected(self):
+        stale = self.stock.version
+        self.assertEqual(self.patch(90, if_match=stale).status_code, status.HTTP_200_OK)
+        response = self.patch(50, if_match=stale)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 90)
+        self.assertEqual(response.data["version"], self.stock.version)
+
+    def test_update_without_if_match_applies_to_the_current_version(self):
+        self.assertEqual(self.patch(90).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.patch(70).status_code, status.HTTP_200_OK)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 70)
+
+    def test_adjustments_are_recorded_in_the_ledger(self):
+        self.patch(90, if_match=self.stock.version)
+        self.assertEqual(
+            list(StockMovement.objects.filter(product=self.product).order_by("pk").values_list("movement_type", "quantity")),
+            [(StockMovement.MovementType.RECEIPT, 100), (StockMovement.MovementType.ADJUSTMENT, -10)],
+        )
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity, 90)
+        self.assertEqual(verify_product_quantities(), [])
+
+
+class ProductQuantityTests(InventoryAPITestCase):
+    """Product.quantity is the sum of the product's stock rows after every operation."""
+
+    def assertProductQuantity(self, quantity):
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity, quantity)
+        self.assertEqual(verify_product_quantities(), [])
+
+    def test_quantity_is_not_writable(self):
+        response = self.client.post(
+            "/api/inventory/products/",
+            {"name": "Gadget", "quantity": 999, "cost_of_product": "1.00", "selling_price": "2.00"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        self.assertEqual(response.data["quantity"], 0)
+
+    def test_receipts_in_several_warehouses(self):
+        self.create_stock(100)
+        self.create_stock(40, warehouse=Warehouse.objects.create(name="Second", location_address="3 Quay"))
+        self.assertProductQuantity(140)
+
+    def test_transfer_keeps_the_total(self):
+        self.create_stock(100)
+        self.product.container = Container.objects.create(
+            container_id_code="#C-00001", type="20ft Dry Standard", current_warehouse=self.warehouse
+        )
+        self.product.save()
+        second = Warehouse.objects.create(name="Second", location_address="3 Quay")
+        response = self.client.post(
+            "/api/inventory/products/transfer-stock/",
+            {"product": self.product.pk, "to_warehouse": second.pk, "quantity": 30},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(ProductStock.objects.get(product=self.product, warehouse=second).quantity, 30)
+        self.assertProductQuantity(100)
+
+    def test_deleting_a_stock_row(self):
+        stock = self.create_stock(100)
+        response = self.client.delete(f"/api/inventory/product-stock/{stock.pk}/")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertProductQuantity(0)
+
+    def test_verify_command_reports_and_fixes_drift(self):
+        self.create_stock(100)
+        Product.objects.filter(pk=self.product.pk).update(quantity=5)
+        with self.assertRaises(CommandError):
+            call_command("verify_product_quantities", stdout=io.StringIO())
+        call_command("verify_product_quantities", "--fix", stdout=io.StringIO())
+        self.assertProductQuantity(100)
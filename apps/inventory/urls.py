@@ -3,7 +3,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     SupplierViewSet, WarehouseViewSet, ProductViewSet,
-    ProductStockViewSet, ProductTransferLogViewSet 
+    ProductStockViewSet, ProductTransferLogViewSet, StockMovementViewSet
 )
 
 router = DefaultRouter()
@@ -12,6 +12,7 @@ router.register(r'warehouses', WarehouseViewSet)
 router.register(r'products', ProductViewSet)
 router.register(r'product-stock', ProductStockViewSet, basename='productstock') 
 router.register(r'product-transfer-logs', ProductTransferLogViewSet, basename='producttransferlog') 
+router.register(r'stock-movements', StockMovementViewSet, basename='stockmovement')
 
 urlpatterns = [
     path('', include(router.urls)),
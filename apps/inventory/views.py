@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import ProtectedError
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
@@ -9,6 +13,7 @@ from .models import (
     Product,
     ProductStock,
     ProductTransferLog,
+    StockMovement,
 )
 from .serializers import (
     SupplierSerializer,
@@ -17,37 +22,82 @@ from .serializers import (
     ProductStockSerializer,
     ProductTransferLogSerializer,
     ProductTransferActionSerializer,
+    StockMovementSerializer,
+    eager_load_products,
 )
+from .services import (
+    InsufficientStockError,
+    MovementType,
+    StockConflictError,
+    compare_and_set,
+    record_movements,
+    stock_at,
+)
+from apps.users.models import User
 from apps.users.permissions import (
     IsWarehouseManagerRole,
     IsAdminUserRole,
 )
+from apps.core.caching import CachedResponseMixin
+from apps.core.metrics import STOCK_UPDATE_CONFLICTS
+from apps.core.exports import ExportMixin
+from apps.core.pagination import KeysetCursorPagination
+from apps.audit_logs.views import parse_timestamp_param
 from apps.audit_logs.services import (
     create_action_log,
+    log_model_changes,
 )
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
-    queryset = Supplier.objects.all()
+class ProtectedDestroyMixin:
+    """
+    Answers 409 instead of failing with a 500 when rows that must outlive
+    the object (on_delete=PROTECT, e.g. the stock ledger) still refer to it.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().destroy(request, *args, **kwargs)
+        except ProtectedError as exc:
+            referenced_by = sorted({str(obj._meta.verbose_name_plural) for obj in exc.protected_objects})
+            return Response(
+                {
+                    "detail": f"This {self.queryset.model._meta.verbose_name} cannot be deleted while "
+                    f"it has {', '.join(referenced_by)}.",
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+
+class SupplierViewSet(CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Supplier.objects.select_related("created_by").all()
     serializer_class = SupplierSerializer
     permission_classes = [IsAuthenticated]
+    cache_models = (Supplier, User)
 
 
-class WarehouseViewSet(viewsets.ModelViewSet):
-    queryset = Warehouse.objects.all()
+class WarehouseViewSet(ProtectedDestroyMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    queryset = Warehouse.objects.select_related("created_by").all()
     serializer_class = WarehouseSerializer
     permission_classes = [IsAuthenticated]
+    cache_models = (Warehouse, User)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.select_related(
-        "supplier",
-        "container",
-        "created_by",
-    ).all()
+class ProductViewSet(ProtectedDestroyMixin, viewsets.ModelViewSet):
+    queryset = eager_load_products(Product.objects.all())
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
 
+    def perform_update(self, serializer):
+        product = serializer.save()
+        log_model_changes(
+            product,
+            "PRODUCT_UPDATED",
+            user=self.request.user,
+            details={"name": product.name},
+        )
+
     @action(
         detail=False,
         methods=["post"],
@@ -93,6 +143,12 @@ class ProductViewSet(viewsets.ModelViewSet):
                     ProductTransferLogSerializer(log_entry).data,
                     status=status.HTTP_200_OK,
                 )
+            except InsufficientStockError as e:
+                return Response(
+                    {"quantity": [str(e)]}, status=status.HTTP_400_BAD_REQUEST
+                )
+            except StockConflictError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
             except Exception as e:
                 return Response(
                     {
@@ -104,28 +160,181 @@ class ProductViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ProductStockViewSet(viewsets.ModelViewSet):
-    queryset = ProductStock.objects.select_related(
-        "product", "warehouse", "product__supplier"
-    ).all()
+class ProductStockViewSet(ExportMixin, viewsets.ModelViewSet):
+    queryset = eager_load_products(
+        ProductStock.objects.select_related("warehouse__created_by"), "product__"
+    )
     serializer_class = ProductStockSerializer
     permission_classes = [IsAuthenticated]
     filterset_fields = [
         "product",
         "warehouse",
     ]
+    export_fields = (
+        "id",
+        "product_id",
+        "product__name",
+        "warehouse_id",
+        "warehouse__name",
+        "quantity",
+        "reserved",
+        "last_updated",
+    )
+    export_filename = "product-stock"
+
+    def _if_match_version(self, request):
+        """
+        Returns the stock version a write is conditional on, from an If-Match
+        header such as ``3`` or ``"3"``; None when absent or ``*``.
+        """
+        header = request.headers.get("If-Match", "").strip()
+        if not header or header == "*":
+            return None
+        value = header.removeprefix("W/").strip('"')
+        if not value.isdigit():
+            raise ValidationError({"If-Match": ["Expected the stock record's version number."]})
+        return int(value)
+
+    def _with_etag(self, response):
+        if response.status_code == 200 and "version" in response.data:
+            response["ETag"] = '"%s"' % response.data["version"]
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._with_etag(super().retrieve(request, *args, **kwargs))
+
+    # Direct edits of stock rows go to the ledger as receipts and adjustments.
+
+    @transaction.atomic
+    def perform_create(self, serializer):
+        stock = serializer.save()
+        record_movements(
+            [(stock.product_id, stock.warehouse_id, MovementType.RECEIPT, stock.quantity)],
+            created_by=self.request.user,
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Locked so the ledger writes off exactly what is deleted.
+        instance = ProductStock.objects.select_for_update().get(pk=instance.pk)
+        if instance.reserved:
+            raise ValidationError({"detail": "Stock with active reservations cannot be deleted."})
+        record_movements(
+            [(instance.product_id, instance.warehouse_id, MovementType.ADJUSTMENT, -instance.quantity)],
+            created_by=self.request.user,
+            note="Stock record deleted",
+        )
+        instance.delete()
+
+    def _record_adjustment(self, before, stock):
+        product_id, warehouse_id, quantity = before
+        if (product_id, warehouse_id) == (stock.product_id, stock.warehouse_id):
+            entries = [(product_id, warehouse_id, MovementType.ADJUSTMENT, stock.quantity - quantity)]
+        else:
+            entries = [
+                (product_id, warehouse_id, MovementType.ADJUSTMENT, -quantity),
+                (stock.product_id, stock.warehouse_id, MovementType.ADJUSTMENT, stock.quantity),
+            ]
+        record_movements(entries, created_by=self.request.user)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Every write is a compare-and-swap on the version, so it never
+        overwrites a reservation, deduction or restock that landed after the
+        row was read. With If-Match the write is applied only if nobody
+        changed the row since the client read it, and answered with 412
+        Precondition Failed otherwise. Without it the row is re-read and the
+        write retried, up to STOCK_UPDATE_RETRIES times (then 409 Conflict).
+        """
+        expected_version = self._if_match_version(request)
+        attempts = 1 if expected_version is not None else settings.STOCK_UPDATE_RETRIES
+        for _ in range(attempts):
+            instance = self.get_object()
+            serializer = self.get_serializer(
+                instance, data=request.data, partial=kwargs.get("partial", False)
+            )
+            serializer.is_valid(raise_exception=True)
+            if expected_version is not None and expected_version != instance.version:
+                break
+            # The swap matches the version the row was read at, so ``before``
+            # is exactly what it replaces and the ledger delta is exact.
+            before = (instance.product_id, instance.warehouse_id, instance.quantity)
+            try:
+                with transaction.atomic():
+                    updated = compare_and_set(
+                        instance.pk, instance.version, "api_update", **serializer.validated_data
+                    )
+                    if updated:
+                        instance.refresh_from_db()
+                        self._record_adjustment(before, instance)
+            except IntegrityError:
+                raise ValidationError(
+                    {"quantity": ["Quantity cannot drop below the units reserved for pending shipments."]}
+                )
+            if updated:
+                return self._with_etag(Response(self.get_serializer(instance).data))
+            STOCK_UPDATE_CONFLICTS.labels(operation="api_update").inc()
+
+        instance.refresh_from_db(fields=["version"])
+        if expected_version is not None:
+            return Response(
+                {
+                    "detail": "The stock record was modified by another request.",
+                    "version": instance.version,
+                },
+                status=status.HTTP_412_PRECONDITION_FAILED,
+            )
+        return Response(
+            {
+                "detail": "The stock record is being changed concurrently; please retry.",
+                "version": instance.version,
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    @action(detail=False, methods=["get"])
+    def at(self, request):
+        """
+        Stock on hand at a past instant, rebuilt from the movement ledger:
+        ``?at=<ISO date/datetime>&warehouse=<id>`` and/or ``&product=<id>``.
+        """
+        if "at" not in request.query_params:
+            raise ValidationError({"at": ["This query parameter is required."]})
+        at = parse_timestamp_param(request.query_params["at"], "at")
+        filters = {}
+        for param in ("warehouse", "product"):
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            if not value.isdigit():
+                raise ValidationError({param: ["Expected an id."]})
+            filters[f"{param}_id"] = int(value)
+        if not filters:
+            raise ValidationError({"detail": "Pass a warehouse, a product, or both."})
+
+        balances = stock_at(at, **filters)
+        results = [
+            {"product_id": product_id, "warehouse_id": warehouse_id, "quantity": quantity}
+            for (product_id, warehouse_id), quantity in sorted(balances.items())
+            if quantity
+        ]
+        return Response({"at": at, "results": results}, status=status.HTTP_200_OK)
 
 
 class ProductTransferLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = (
-        ProductTransferLog.objects.select_related(
-            "product", "from_warehouse", "to_warehouse", "transferred_by"
+        eager_load_products(
+            ProductTransferLog.objects.select_related(
+                "from_warehouse__created_by", "to_warehouse__created_by", "transferred_by"
+            ),
+            "product__",
         )
-        .all()
         .order_by("-timestamp")
     )
     serializer_class = ProductTransferLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    ordering = ("-timestamp", "-id")
     filterset_fields = ["product", "from_warehouse", "to_warehouse", "transferred_by"]
     search_fields = [
         "product__name",
@@ -133,3 +342,16 @@ class ProductTransferLogViewSet(viewsets.ReadOnlyModelViewSet):
         "description",
         "transferred_by__email",
     ]
+
+
+class StockMovementViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    The append-only stock ledger: one row per receipt, shipment, transfer
+    leg or adjustment, newest first.
+    """
+    queryset = StockMovement.objects.all()
+    serializer_class = StockMovementSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    ordering = ("-created_at", "-id")
+    filterset_fields = ["product", "warehouse", "movement_type", "shipment", "transfer"]
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from apps.core.pagination import EstimatedCountPaginator
 from .models import Notification
 
 @admin.register(Notification)
@@ -14,6 +15,9 @@ class NotificationAdmin(admin.ModelAdmin):
         'related_object', 'action_url', 'created_at', 'sent_at', 'read_at'
     ) 
     date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    # Skip the second, unfiltered COUNT(*) the changelist runs when filtering.
+    show_full_result_count = False
 
     fieldsets = (
         (None, {'fields': ('recipient', 'channel', 'status')}),
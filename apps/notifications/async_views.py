@@ -0,0 +1,69 @@
+# apps/notifications/async_views.py
+import asyncio
+
+from apps.core.async_api import async_api_view, bounded_int, json_response
+from .models import Notification
+
+UNREAD_STATUSES = (Notification.NotificationStatus.SENT, Notification.NotificationStatus.PENDING)
+FEED_FIELDS = (
+    "id",
+    "title",
+    "message",
+    "channel",
+    "status",
+    "content_type__model",
+    "object_id",
+    "action_url",
+    "created_at",
+    "read_at",
+    "sent_at",
+)
+
+
+def _visible(user):
+    return Notification.objects.filter(recipient=user).exclude(
+        status=Notification.NotificationStatus.ARCHIVED
+    )
+
+
+def _unread(user):
+    return Notification.objects.filter(recipient=user, status__in=UNREAD_STATUSES)
+
+
+def _feed_item(row):
+    model_name = row.pop("content_type__model")
+    row["channel_display"] = Notification.NotificationChannel(row["channel"]).label
+    row["status_display"] = Notification.NotificationStatus(row["status"]).label
+    row["related_object"] = {"type": model_name, "id": row["object_id"]} if model_name else None
+    del row["object_id"]
+    return row
+
+
+@async_api_view
+async def notification_feed(request):
+    """
+    The user's most recent notifications, newest first, with the unread count.
+    - limit: number of notifications (default 50, at most 200)
+    - before: only notifications older than this notification id
+    """
+    limit = bounded_int(request.GET.get("limit"), default=50, maximum=200)
+    queryset = _visible(request.user)
+    before = request.GET.get("before")
+    if before and before.isdigit():
+        queryset = queryset.filter(id__lt=int(before))
+    queryset = queryset.order_by("-created_at", "-id").values(*FEED_FIELDS)[:limit]
+
+    async def fetch_rows():
+        return [_feed_item(row) async for row in queryset]
+
+    results, unread_count = await asyncio.gather(fetch_rows(), _unread(request.user).acount())
+    return json_response({
+        "unread_count": unread_count,
+        "next_before": results[-1]["id"] if len(results) == limit else None,
+        "results": results,
+    })
+
+
+@async_api_view
+async def unread_count(request):
+    return json_response({"unread_count": await _unread(request.user).acount()})
@@ -58,6 +58,9 @@ class Notification(models.Model):
         verbose_name = _("notification")
         verbose_name_plural = _("notifications")
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notif_recipient_created_idx'),
+        ]
 
     def __str__(self):
         return f"Notification for {self.recipient.email} ({self.get_channel_display()}) - {self.title[:50]}"
@@ -4,7 +4,11 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.mail import send_mail
 from django.conf import settings
 
-from .models import Notification, NotificationChannel, NotificationStatus
+from apps.core.metrics import NOTIFICATION_DISPATCH
+from .models import Notification
+
+NotificationChannel = Notification.NotificationChannel
+NotificationStatus = Notification.NotificationStatus
 
 # from config.celery import app as celery_app # If using Celery for dispatching
 
@@ -63,6 +67,9 @@ def dispatch_notification_task(notification_id):
         failure_reason = str(e)
         sent_successfully = False
 
+    NOTIFICATION_DISPATCH.labels(
+        channel=notification.channel, result="success" if sent_successfully else "failure"
+    ).inc()
     if sent_successfully:
         notification.mark_as_sent()
     else:
@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import NotificationViewSet
+from .async_views import notification_feed, unread_count
 
 router = DefaultRouter()
 router.register(r'', NotificationViewSet, basename='notification') # /api/notifications/
 
 urlpatterns = [
+    path('feed/', notification_feed, name='notification-feed'),
+    path('unread-count/', unread_count, name='notification-unread-count'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
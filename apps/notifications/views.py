@@ -3,14 +3,19 @@ from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.contrib.contenttypes.prefetch import GenericPrefetch
 from django.utils import timezone
 
 from .models import Notification
 from .serializers import NotificationSerializer
+from apps.shipments.models import Shipment
+from apps.core.pagination import KeysetCursorPagination
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet): 
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetCursorPagination
+    ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         """
@@ -25,7 +30,10 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
             recipient=user
         ).exclude(
             status=Notification.NotificationStatus.ARCHIVED
-        ).select_related('recipient', 'content_type').order_by('-created_at')
+        ).select_related('recipient', 'content_type').prefetch_related(
+            # Shipment.__str__ shows the customer's email.
+            GenericPrefetch('related_object', [Shipment.objects.select_related('customer')])
+        ).order_by('-created_at')
 
     @action(detail=True, methods=['post'], url_path='mark-as-read')
     def mark_as_read_action(self, request, pk=None):
@@ -0,0 +1,66 @@
+# apps/shipments/async_views.py
+import asyncio
+
+from rest_framework import status
+
+from apps.core.async_api import async_api_view, json_response
+from apps.deliveries.models import DeliveryTask
+from apps.users.models import UserRole
+from .models import Shipment
+
+TRACKING_FIELDS = (
+    "id",
+    "shipment_tracking_id",
+    "status",
+    "customer_id",
+    "origin_warehouse__name",
+    "destination_address",
+    "estimated_departure_date",
+    "actual_departure_date",
+    "estimated_delivery_date",
+    "actual_delivery_date",
+    "updated_at",
+)
+DELIVERY_FIELDS = (
+    "dispatcher_id",
+    "status",
+    "scheduled_pickup_datetime",
+    "actual_pickup_datetime",
+    "scheduled_delivery_datetime",
+    "actual_delivery_datetime",
+)
+
+
+def _can_track(user, shipment, delivery):
+    if user.role in (UserRole.ADMIN, UserRole.WAREHOUSE_MANAGER):
+        return True
+    if user.role == UserRole.CUSTOMER:
+        return shipment["customer_id"] == user.pk
+    if user.role == UserRole.DISPATCHER:
+        return delivery is not None and delivery["dispatcher_id"] == user.pk
+    return False
+
+
+@async_api_view
+async def track_shipment(request, tracking_id):
+    """
+    Tracking summary for one shipment: its status and dates plus the state of
+    its delivery task. Shipments the user may not see are reported as missing.
+    """
+    shipment, delivery = await asyncio.gather(
+        Shipment.objects.filter(shipment_tracking_id=tracking_id).values(*TRACKING_FIELDS).afirst(),
+        DeliveryTask.objects.filter(shipment__shipment_tracking_id=tracking_id)
+        .values(*DELIVERY_FIELDS)
+        .afirst(),
+    )
+    if shipment is None or not _can_track(request.user, shipment, delivery):
+        return json_response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    shipment["status_display"] = Shipment.ShipmentStatus(shipment["status"]).label
+    shipment["origin_warehouse"] = shipment.pop("origin_warehouse__name")
+    del shipment["customer_id"]
+    if delivery is not None:
+        delivery["status_display"] = DeliveryTask.DeliveryStatus(delivery["status"]).label
+        del delivery["dispatcher_id"]
+    shipment["delivery"] = delivery
+    return json_response(shipment)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shipments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shipment',
+            name='restocked_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='restocked at'),
+        ),
+    ]
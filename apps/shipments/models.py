@@ -1,11 +1,13 @@
 # apps/shipments/models.py
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from apps.users.models import UserRole # For limit_choices_to
+from apps.audit_logs.tracking import TrackedModelMixin
+from apps.inventory.services import commit_reservations, release_reservations
 
-class Shipment(models.Model):
+class Shipment(TrackedModelMixin, models.Model):
     class ShipmentStatus(models.TextChoices):
         PENDING_CONFIRMATION = 'PC', _('Pending Confirmation') 
         PROCESSING = 'PR', _('Processing') 
@@ -67,6 +69,9 @@ class Shipment(models.Model):
         null=True, blank=True,
         verbose_name=_("created by")
     )
+    # Set when a cancellation or return put the items back into stock, so
+    # that happens at most once per shipment.
+    restocked_at = models.DateTimeField(_("restocked at"), null=True, blank=True, editable=False)
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
     updated_at = models.DateTimeField(_("updated at"), auto_now=True)
 
@@ -78,7 +83,29 @@ class Shipment(models.Model):
     def save(self, *args, **kwargs):
         if not self.shipment_tracking_id:
             self.shipment_tracking_id = f"SHP-{uuid.uuid4().hex[:10].upper()}"
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            old_status = self.saved_changes.get("status", (None,))[0]
+            # Its goods went back to stock; moving it on would ship them
+            # again without taking them out. Rolls back the save.
+            if old_status == self.ShipmentStatus.CANCELLED:
+                from .services import ShipmentCancelledError
+
+                raise ShipmentCancelledError(self.pk)
+            # Cancelling gives the goods back; confirming a pending shipment
+            # takes the stock held for it.
+            if old_status is not None and self.status == self.ShipmentStatus.CANCELLED:
+                from .services import NOT_CANCELLABLE_STATUSES, return_stock
+
+                if old_status not in NOT_CANCELLABLE_STATUSES and return_stock([self.pk]):
+                    self.refresh_from_db(fields=["restocked_at"])
+            elif old_status == self.ShipmentStatus.PENDING_CONFIRMATION:
+                commit_reservations(self)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            release_reservations([self.pk])
+            return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"{self.shipment_tracking_id} for {self.customer.email}"
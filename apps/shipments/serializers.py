@@ -1,13 +1,25 @@
 # apps/shipments/serializers.py
+from contextlib import contextmanager
+
 from rest_framework import serializers
 from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
 from .models import Shipment, ShipmentItem
 from apps.users.serializers import UserSimpleSerializer
-from apps.inventory.serializers import ProductSerializer, WarehouseSerializer
+from apps.inventory.serializers import ProductSerializer, WarehouseSerializer, eager_load_products
 from apps.containers.serializers import ContainerSerializer
-from apps.inventory.models import Product, Warehouse, ProductStock 
+from apps.inventory.models import Product, Warehouse
 from apps.users.models import User, UserRole
 from apps.containers.models import Container
+from apps.inventory.services import (
+    InsufficientStockError,
+    StockConflictError,
+    available_to_promise,
+    deduct_stock,
+    release_reservations,
+    reserve_stock,
+)
 
 class ShipmentItemSerializer(serializers.ModelSerializer):
     product_id = serializers.PrimaryKeyRelatedField(
@@ -49,10 +61,10 @@ class ShipmentSerializer(serializers.ModelSerializer):
             'destination_address', 'status', 'status_display',
             'estimated_departure_date', 'actual_departure_date',
             'estimated_delivery_date', 'actual_delivery_date',
-            'notes', 'customer_notes', 'items',
+            'notes', 'customer_notes', 'items', 'restocked_at',
             'created_by', 'created_at', 'updated_at'
         )
-        read_only_fields = ('shipment_tracking_id', 'created_at', 'updated_at', 'created_by', 'status_display')
+        read_only_fields = ('shipment_tracking_id', 'restocked_at', 'created_at', 'updated_at', 'created_by', 'status_display')
 
     def validate_items(self, items_data):
         if not items_data:
@@ -63,56 +75,145 @@ class ShipmentSerializer(serializers.ModelSerializer):
         return items_data
 
     def validate(self, data):
+        if self.instance is not None:
+            current = self.instance.status
+            # Its goods went back to stock; reopening would ship them again
+            # without taking them out.
+            if current == Shipment.ShipmentStatus.CANCELLED and data.get('status', current) != current:
+                raise serializers.ValidationError({'status': ["A cancelled shipment cannot be reopened."]})
+            # Confirming took its stock; pending again, its items could be
+            # changed and reserved, and confirmed a second time.
+            if (
+                current != Shipment.ShipmentStatus.PENDING_CONFIRMATION
+                and data.get('status') == Shipment.ShipmentStatus.PENDING_CONFIRMATION
+            ):
+                raise serializers.ValidationError(
+                    {'status': ["A confirmed shipment cannot go back to pending confirmation."]}
+                )
+            # Once stock has been taken, what was taken and from where is fixed:
+            # cancelling or returning the shipment gives back exactly that.
+            if current != Shipment.ShipmentStatus.PENDING_CONFIRMATION:
+                items_data = data.get('items')
+                if items_data is not None and self._quantities(items_data) != dict(
+                    self.instance.items.values_list('product_id', 'quantity')
+                ):
+                    raise serializers.ValidationError(
+                        {'items': ["Items can only be changed while the shipment is pending confirmation."]}
+                    )
+                if data.get('origin_warehouse', self.instance.origin_warehouse) != self.instance.origin_warehouse:
+                    raise serializers.ValidationError(
+                        {'origin_warehouse_id': ["The origin can only be changed while the shipment is pending confirmation."]}
+                    )
         if self.instance is None: 
             origin_warehouse = data.get('origin_warehouse')
             items_data = data.get('items')
             if origin_warehouse and items_data:
+                # Reserved stock is already promised to pending shipments.
+                available = available_to_promise(
+                    origin_warehouse.pk, [item_data['product'].pk for item_data in items_data]
+                )
                 for item_data in items_data:
                     product = item_data['product']
                     quantity_requested = item_data['quantity']
-                    try:
-                        stock = ProductStock.objects.get(product=product, warehouse=origin_warehouse)
-                        if stock.quantity < quantity_requested:
-                            raise serializers.ValidationError(
-                                f"Insufficient stock for product '{product.name}' in warehouse '{origin_warehouse.name}'. "
-                                f"Available: {stock.quantity}, Requested: {quantity_requested}."
-                            )
-                    except ProductStock.DoesNotExist:
+                    if product.pk not in available:
                         raise serializers.ValidationError(
                             f"Product '{product.name}' not found or no stock record in warehouse '{origin_warehouse.name}'."
                         )
+                    if available[product.pk] < quantity_requested:
+                        raise serializers.ValidationError(
+                            f"Insufficient stock for product '{product.name}' in warehouse '{origin_warehouse.name}'. "
+                            f"Available: {available[product.pk]}, Requested: {quantity_requested}."
+                        )
         return data
 
+    @staticmethod
+    def _quantities(items_data):
+        return {item_data['product'].pk: item_data['quantity'] for item_data in items_data}
+
     @transaction.atomic
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         validated_data['created_by'] = self.context['request'].user
+        if validated_data.get('status') == Shipment.ShipmentStatus.CANCELLED:
+            # Created cancelled, it takes no stock and has none to give back.
+            validated_data['restocked_at'] = timezone.now()
         shipment = Shipment.objects.create(**validated_data)
 
         origin_warehouse = shipment.origin_warehouse
-        for item_data in items_data:
-            product = item_data['product'] # Product instance
-            quantity_shipped = item_data['quantity']
-            ShipmentItem.objects.create(shipment=shipment, product=product, quantity=quantity_shipped)
-            try:
-                stock_item = ProductStock.objects.select_for_update().get(
-                    product=product,
-                    warehouse=origin_warehouse
+        ShipmentItem.objects.bulk_create([
+            ShipmentItem(shipment=shipment, product=item_data['product'], quantity=item_data['quantity'])
+            for item_data in items_data
+        ])
+        quantities = self._quantities(items_data)
+        with self._stock_errors(shipment):
+            # Pending shipments only hold their stock until they are confirmed.
+            if shipment.status == Shipment.ShipmentStatus.PENDING_CONFIRMATION:
+                reserve_stock(shipment, quantities)
+            elif shipment.status != Shipment.ShipmentStatus.CANCELLED:
+                deduct_stock(
+                    origin_warehouse.pk,
+                    quantities,
+                    shipment=shipment,
+                    user=validated_data['created_by'],
                 )
-                if stock_item.quantity < quantity_shipped:
-                    raise serializers.ValidationError(f"Race condition or validation bypass: Insufficient stock for {product.name}.")
-                stock_item.quantity -= quantity_shipped
-                stock_item.save()
-            except ProductStock.DoesNotExist:
-                raise serializers.ValidationError(f"Race condition or validation bypass: Stock record not found for {product.name} in {origin_warehouse.name}.")
         return shipment
 
+    @contextmanager
+    def _stock_errors(self, shipment):
+        """Turns stock service errors into validation errors naming the product."""
+        try:
+            yield
+        except InsufficientStockError as exc:
+            product = Product.objects.get(pk=exc.product_id)
+            if exc.available is None:
+                raise serializers.ValidationError(f"Race condition or validation bypass: Stock record not found for {product.name} in {shipment.origin_warehouse.name}.")
+            raise serializers.ValidationError(
+                f"Insufficient stock for {product.name}. Available: {exc.available}, Requested: {exc.requested}."
+            )
+        except StockConflictError as exc:
+            product = Product.objects.get(pk=exc.product_id)
+            raise serializers.ValidationError(
+                f"Stock for {product.name} is being changed concurrently; please retry."
+            )
+
     @transaction.atomic
     def update(self, instance, validated_data):
         items_data = validated_data.pop('items', None)
-        shipment = super().update(instance, validated_data)
-        if items_data is not None:
-            instance.items.all().delete()
-            for item_data in items_data:
-                ShipmentItem.objects.create(shipment=instance, **item_data)
-        return shipment
\ No newline at end of file
+        origin = validated_data.get('origin_warehouse', instance.origin_warehouse)
+        moved = origin != instance.origin_warehouse
+        with self._stock_errors(instance):
+            if items_data is not None:
+                instance.items.all().delete()
+                for item_data in items_data:
+                    ShipmentItem.objects.create(shipment=instance, **item_data)
+            # A pending shipment's holds follow its items and origin.
+            if instance.status == Shipment.ShipmentStatus.PENDING_CONFIRMATION and (items_data is not None or moved):
+                quantities = (
+                    self._quantities(items_data) if items_data is not None
+                    else dict(instance.items.values_list('product_id', 'quantity'))
+                )
+                release_reservations([instance.pk])
+                instance.origin_warehouse = origin
+                reserve_stock(instance, quantities)
+            # Confirming or cancelling settles the holds (see Shipment.save).
+            shipment = super().update(instance, validated_data)
+        return shipment
+
+
+def eager_load_shipments(queryset, prefix=""):
+    """
+    Loads what ShipmentSerializer shows for the shipments at ``prefix`` (e.g.
+    ``"shipment__"``) of ``queryset`` in a fixed number of queries.
+    """
+    return queryset.select_related(
+        f"{prefix}customer", f"{prefix}origin_warehouse__created_by", f"{prefix}created_by"
+    ).prefetch_related(
+        Prefetch(f"{prefix}container", queryset=Container.objects.with_details()),
+        Prefetch(f"{prefix}items", queryset=eager_load_products(ShipmentItem.objects.all(), "product__")),
+    )
+
+
+class ShipmentBulkCancelSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000
+    )
@@ -0,0 +1,117 @@
+# apps/shipments/services.py
+"""
+Stock side of cancelling and returning shipments.
+
+A cancelled shipment gives its goods back: its holds are released, and
+if its stock had been taken it is restocked. A delivery task marked Returned restocks its shipment the same
+way. Restocking is set-based - the items of every shipment involved are
+summed per warehouse and added back with one UPDATE per warehouse - and
+happens at most once per shipment (``Shipment.restocked_at``).
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from apps.inventory.models import StockMovement
+from apps.inventory.services import (
+    release_reservations,
+    restock,
+    save_movements,
+    shipments_only_holding_stock,
+)
+
+from .models import Shipment, ShipmentItem
+
+ShipmentStatus = Shipment.ShipmentStatus
+
+# The goods are with the customer; they come back through a returned delivery.
+DELIVERED_STATUSES = {ShipmentStatus.DELIVERED, ShipmentStatus.PARTIALLY_DELIVERED}
+NOT_CANCELLABLE_STATUSES = DELIVERED_STATUSES | {ShipmentStatus.CANCELLED}
+
+
+class ShipmentCancelledError(Exception):
+    """A cancelled shipment's status was changed; its goods are already back in stock."""
+
+    def __init__(self, shipment_id):
+        self.shipment_id = shipment_id
+        super().__init__(f"Shipment {shipment_id} is cancelled and cannot change status.")
+
+
+@transaction.atomic
+def restock_shipments(shipment_ids, user=None):
+    """
+    Puts the items of ``shipment_ids`` back into their origin warehouses,
+    skipping shipments that were already restocked. Returns the ids
+    restocked.
+    """
+    claimed = list(
+        Shipment.objects.select_for_update()
+        .filter(pk__in=shipment_ids, restocked_at__isnull=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    if not claimed:
+        return []
+    Shipment.objects.filter(pk__in=claimed).update(restocked_at=timezone.now())
+
+    items = list(
+        ShipmentItem.objects.filter(shipment_id__in=claimed).values_list(
+            "shipment_id", "shipment__origin_warehouse_id", "product_id", "quantity"
+        )
+    )
+    by_warehouse = {}
+    for _, warehouse_id, product_id, quantity in items:
+        quantities = by_warehouse.setdefault(warehouse_id, {})
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    for warehouse_id in sorted(by_warehouse):
+        restock(warehouse_id, by_warehouse[warehouse_id])
+
+    save_movements([
+        StockMovement(
+            product_id=product_id,
+            warehouse_id=warehouse_id,
+            movement_type=StockMovement.MovementType.RESTOCK,
+            quantity=quantity,
+            shipment_id=shipment_id,
+            created_by=user,
+        )
+        for shipment_id, warehouse_id, product_id, quantity in items
+        if quantity
+    ])
+    return claimed
+
+
+@transaction.atomic
+def return_stock(shipment_ids, user=None):
+    """
+    Gives back the goods of ``shipment_ids``: active holds are released,
+    and shipments whose stock was taken are restocked. What happens follows
+    the stock, not the status, so a shipment moved back and forth between
+    statuses is neither restocked without having been taken from nor
+    skipped after it was. Returns the ids restocked.
+    """
+    release_reservations(shipment_ids)
+    held_only = shipments_only_holding_stock(shipment_ids)
+    return restock_shipments([pk for pk in shipment_ids if pk not in held_only], user=user)
+
+
+@transaction.atomic
+def cancel_shipments(shipment_ids, user=None):
+    """
+    Cancels every shipment of ``shipment_ids`` that can still be cancelled
+    (not delivered or already cancelled) and gives back its goods, with one
+    status UPDATE for all of them. Returns the ids cancelled.
+    """
+    cancelled = list(
+        Shipment.objects.select_for_update()
+        .filter(pk__in=shipment_ids)
+        .exclude(status__in=NOT_CANCELLABLE_STATUSES)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    if not cancelled:
+        return []
+    return_stock(cancelled, user=user)
+    Shipment.objects.filter(pk__in=cancelled).update(
+        status=ShipmentStatus.CANCELLED, updated_at=timezone.now()
+    )
+    return cancelled
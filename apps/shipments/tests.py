@@ -1,3 +1,143 @@
-from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from apps.inventory.models import Product, ProductStock, Warehouse
+from apps.inventory.services import verify_product_quantities
+from apps.users.models import User, UserRole
+
+from .models import Shipment
+from .services import ShipmentCancelledError
+
+ShipmentStatus = Shipment.ShipmentStatus
+
+
+class ShipmentStockTestCase(APITestCase):
+    """Shipments of 20 widgets from a warehouse that starts with 100."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@example.com", role=UserRole.ADMIN)
+        cls.customer = User.objects.create_user(email="customer@example.com", role=UserRole.CUSTOMER)
+        cls.warehouse = Warehouse.objects.create(name="Main", location_address="1 Dock Road")
+        cls.product = Product.objects.create(name="Widget", cost_of_product=1, selling_price=2)
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(
+            "/api/inventory/product-stock/",
+            {"product_id": self.product.pk, "warehouse_id": self.warehouse.pk, "quantity": 100},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+
+    def create_shipment(self, quantity=20, status_code=None):
+        data = {
+            "customer_id": self.customer.pk,
+            "origin_warehouse_id": self.warehouse.pk,
+            "destination_address": "2 Harbour Street",
+            "items": [{"product_id": self.product.pk, "quantity": quantity}],
+        }
+        if status_code:
+            data["status"] = status_code
+        response = self.client.post("/api/shipments/", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.content)
+        return Shipment.objects.get(pk=response.data["id"])
+
+    def set_status(self, shipment, status_code):
+        return self.client.patch(f"/api/shipments/{shipment.pk}/", {"status": status_code}, format="json")
+
+    def assertStock(self, quantity, reserved=0):
+        stock = ProductStock.objects.get(product=self.product, warehouse=self.warehouse)
+        self.assertEqual((stock.quantity, stock.reserved), (quantity, reserved))
+        self.assertEqual(Product.objects.get(pk=self.product.pk).quantity, quantity)
+        self.assertEqual(verify_product_quantities(), [])
+
+
+class ReservationTests(ShipmentStockTestCase):
+    def test_pending_shipment_holds_stock(self):
+        self.create_shipment()
+        self.assertStock(100, reserved=20)
+
+    def test_confirming_takes_the_held_stock(self):
+        shipment = self.create_shipment()
+        self.assertEqual(self.set_status(shipment, ShipmentStatus.PROCESSING).status_code, status.HTTP_200_OK)
+        self.assertStock(80)
+
+    def test_cancelling_a_pending_shipment_releases_its_hold(self):
+        shipment = self.create_shipment()
+        self.assertEqual(self.set_status(shipment, ShipmentStatus.CANCELLED).status_code, status.HTTP_200_OK)
+        self.assertStock(100)
+
+    def test_cancelling_a_confirmed_shipment_restocks(self):
+        shipment = self.create_shipment()
+        self.set_status(shipment, ShipmentStatus.PROCESSING)
+        self.assertEqual(self.set_status(shipment, ShipmentStatus.CANCELLED).status_code, status.HTTP_200_OK)
+        self.assertStock(100)
+
+    def test_confirmed_shipment_cannot_go_back_to_pending(self):
+        shipment = self.create_shipment()
+        self.set_status(shipment, ShipmentStatus.PROCESSING)
+        response = self.set_status(shipment, ShipmentStatus.PENDING_CONFIRMATION)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertStock(80)
+
+    def test_reconfirming_does_not_take_stock_twice(self):
+        shipment = self.create_shipment()
+        for status_code in (ShipmentStatus.PROCESSING, ShipmentStatus.PENDING_CONFIRMATION, ShipmentStatus.PROCESSING):
+            shipment.status = status_code
+            shipment.save()
+        self.assertStock(80)
+
+    def test_cancelling_after_going_back_to_pending_restocks(self):
+        shipment = self.create_shipment()
+        for status_code in (ShipmentStatus.PROCESSING, ShipmentStatus.PENDING_CONFIRMATION, ShipmentStatus.CANCELLED):
+            shipment.status = status_code
+            shipment.save()
+        self.assertStock(100)
+
+
+class CancelledShipmentTests(ShipmentStockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.shipment = self.create_shipment(status_code=ShipmentStatus.PROCESSING)
+        self.set_status(self.shipment, ShipmentStatus.CANCELLED)
+
+    def test_cannot_be_reopened_through_the_api(self):
+        response = self.set_status(self.shipment, ShipmentStatus.PROCESSING)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertStock(100)
+
+    def test_cannot_be_reopened_by_saving(self):
+        shipment = Shipment.objects.get(pk=self.shipment.pk)
+        shipment.status = ShipmentStatus.OUT_FOR_DELIVERY
+        with self.assertRaises(ShipmentCancelledError):
+            shipment.save()
+        self.assertEqual(Shipment.objects.get(pk=shipment.pk).status, ShipmentStatus.CANCELLED)
+        self.assertStock(100)
+
+
+class BulkCancelTests(ShipmentStockTestCase):
+    def bulk_cancel(self, *shipments):
+        response = self.client.post(
+            "/api/shipments/bulk-cancel/", {"ids": [shipment.pk for shipment in shipments]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        return response.data
+
+    def test_gives_back_stock_and_skips_delivered_shipments(self):
+        pending = self.create_shipment()
+        processing = self.create_shipment(status_code=ShipmentStatus.PROCESSING)
+        delivered = self.create_shipment(status_code=ShipmentStatus.DELIVERED)
+        self.assertStock(60, reserved=20)
+
+        result = self.bulk_cancel(pending, processing, delivered)
+        self.assertEqual(result, {"cancelled": sorted([pending.pk, processing.pk]), "skipped": [delivered.pk]})
+        self.assertEqual(Shipment.objects.get(pk=delivered.pk).status, ShipmentStatus.DELIVERED)
+        self.assertStock(80)
+
+    def test_cancelling_again_changes_nothing(self):
+        shipment = self.create_shipment(status_code=ShipmentStatus.PROCESSING)
+        self.bulk_cancel(shipment)
+        result = self.bulk_cancel(shipment)
+        self.assertEqual(result, {"cancelled": [], "skipped": [shipment.pk]})
+        self.assertStock(100)
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ShipmentViewSet
+from .async_views import track_shipment
 
 router = DefaultRouter()
 router.register(r'', ShipmentViewSet, basename='shipment')
 
 urlpatterns = [
+    path('track/<str:tracking_id>/', track_shipment, name='shipment-track'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
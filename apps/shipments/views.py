@@ -6,21 +6,46 @@ from rest_framework.response import Response
 from django.db.models import Q
 
 from .models import Shipment, ShipmentItem
-from .serializers import ShipmentSerializer, ShipmentItemSerializer
+from .serializers import (
+    ShipmentSerializer,
+    ShipmentItemSerializer,
+    ShipmentBulkCancelSerializer,
+    eager_load_shipments,
+)
+from .services import cancel_shipments
 from apps.users.models import UserRole
 from apps.users.permissions import IsAdminUserRole, IsWarehouseManagerRole
 from .permissions import IsShipmentOwnerOrRelatedStaff
+from apps.audit_logs.services import create_action_log, log_model_changes
+from apps.core.conditional import ConditionalGetMixin
+from apps.core.exports import ExportMixin
 
 
-class ShipmentViewSet(viewsets.ModelViewSet):
+class ShipmentViewSet(ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
     serializer_class = ShipmentSerializer
     permission_classes = [IsAuthenticated]
+    export_fields = (
+        "id",
+        "shipment_tracking_id",
+        "status",
+        "customer_id",
+        "customer__email",
+        "origin_warehouse_id",
+        "origin_warehouse__name",
+        "container_id",
+        "destination_address",
+        "estimated_departure_date",
+        "actual_departure_date",
+        "estimated_delivery_date",
+        "actual_delivery_date",
+        "created_at",
+        "updated_at",
+    )
+    export_filename = "shipments"
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Shipment.objects.select_related(
-            "customer", "container", "origin_warehouse", "created_by"
-        ).prefetch_related("items__product", "delivery_task")
+        queryset = eager_load_shipments(Shipment.objects.all()).prefetch_related("delivery_task")
 
         if not user or not user.is_authenticated:
             return Shipment.objects.none()
@@ -37,7 +62,7 @@ class ShipmentViewSet(viewsets.ModelViewSet):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action in ["create", "destroy"]:
+        if self.action in ["create", "destroy", "bulk_cancel"]:
             return [IsAuthenticated(), (IsAdminUserRole | IsWarehouseManagerRole)()]
         elif self.action in ["update", "partial_update", "retrieve"]:
             return [IsAuthenticated(), IsShipmentOwnerOrRelatedStaff()]
@@ -48,3 +73,33 @@ class ShipmentViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         shipment = serializer.save()
+        log_model_changes(
+            shipment,
+            "SHIPMENT_UPDATED",
+            user=self.request.user,
+            details={"tracking_id": shipment.shipment_tracking_id},
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk-cancel")
+    def bulk_cancel(self, request):
+        """
+        Cancels many shipments at once and gives back their goods: released
+        holds for pending shipments, one restock per warehouse for the rest.
+        Delivered and already cancelled shipments are skipped.
+        """
+        serializer = ShipmentBulkCancelSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data["ids"])
+        visible = self.get_queryset().filter(pk__in=ids).values_list("pk", flat=True)
+        cancelled = cancel_shipments(list(visible), user=request.user)
+        for shipment in Shipment.objects.filter(pk__in=cancelled).only("pk", "shipment_tracking_id"):
+            create_action_log(
+                user=request.user,
+                action_verb="SHIPMENT_CANCELLED",
+                related_object=shipment,
+                details={"tracking_id": shipment.shipment_tracking_id, "bulk": True},
+            )
+        return Response(
+            {"cancelled": sorted(cancelled), "skipped": sorted(ids - set(cancelled))},
+            status=status.HTTP_200_OK,
+        )
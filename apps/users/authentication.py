@@ -0,0 +1,69 @@
+# apps/users/authentication.py
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .services import get_token_version
+
+TOKEN_VERSION_CLAIM = "token_version"
+# Claims copied onto the user built from a token. Everything else on the
+# user is left deferred and loaded from the database only if accessed.
+USER_CLAIM_FIELDS = ("email", "role", "is_superuser", "is_staff")
+
+
+def build_user_from_claims(validated_token):
+    """
+    Returns a User instance populated from token claims without querying the
+    database. It behaves like a normal user (comparisons, foreign key
+    assignment, filtering); fields not carried in the token are deferred.
+    """
+    User = get_user_model()
+    values = {
+        User._meta.pk.attname: validated_token[api_settings.USER_ID_CLAIM],
+        "is_active": True,
+        "token_version": validated_token[TOKEN_VERSION_CLAIM],
+    }
+    for claim in USER_CLAIM_FIELDS:
+        if claim in validated_token:
+            values[claim] = validated_token[claim]
+
+    # Claims may be serialized differently from the column type (the user id
+    # is a string in recent Simple JWT releases), so normalise through the field.
+    fields = [f for f in User._meta.concrete_fields if f.attname in values]
+    return User.from_db(
+        router.db_for_read(User),
+        [f.attname for f in fields],
+        [f.to_python(values[f.attname]) for f in fields],
+    )
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds request.user from the access token claims
+    (role, is_superuser, ...) instead of loading the User row on every call.
+
+    Tokens carry the user's token_version; it is compared against a cached
+    copy, so role changes, deactivation and password changes (which bump the
+    version) revoke outstanding tokens. Tokens issued before the claims were
+    added fall back to the regular database lookup.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        current_version = get_token_version(user_id)
+        if current_version is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if current_version != validated_token[TOKEN_VERSION_CLAIM]:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        return build_user_from_claims(validated_token)
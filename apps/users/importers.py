@@ -0,0 +1,243 @@
+# apps/users/importers.py
+"""
+Bulk user import from CSV or JSONL.
+
+Rows are validated in-process, existing emails are found with one query,
+and users are inserted with bulk_create. Every input row gets a report entry.
+Password hashing (the expensive part) runs in-process unless the caller asks
+for workers; only the import_users command does, so web requests never fork
+a process pool.
+"""
+import csv
+import io
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db.models.functions import Lower
+from django.db import IntegrityError, transaction
+
+from apps.core.caching import bump_model_version
+
+from .models import UserRole
+
+IMPORT_FIELDS = ("email", "password", "first_name", "last_name", "phone_number", "role")
+SUPPORTED_FORMATS = ("csv", "jsonl")
+# Below this many passwords a process pool costs more than it saves.
+PARALLEL_HASH_THRESHOLD = 50
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(filename, default="csv"):
+    lowered = (filename or "").lower()
+    if lowered.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def read_rows(stream, fmt):
+    """Yields one dict per record from a text stream in CSV or JSONL format."""
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield row
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ImportFormatError(f"Line {line_number}: invalid JSON ({exc.msg}).")
+            if not isinstance(row, dict):
+                raise ImportFormatError(f"Line {line_number}: expected a JSON object.")
+            yield row
+    else:
+        raise ImportFormatError(f"Unsupported format '{fmt}'. Use one of: {', '.join(SUPPORTED_FORMATS)}.")
+
+
+def read_uploaded_file(uploaded_file, fmt=None):
+    fmt = fmt or detect_format(uploaded_file.name)
+    stream = io.TextIOWrapper(uploaded_file.file, encoding="utf-8-sig")
+    return list(read_rows(stream, fmt))
+
+
+def _init_hash_worker():
+    import django
+
+    django.setup()
+
+
+def _hash_password(raw_password):
+    return make_password(raw_password)
+
+
+def hash_passwords(passwords, workers=None):
+    """Hashes passwords in order, in parallel when there are enough of them."""
+    if len(passwords) < PARALLEL_HASH_THRESHOLD or workers == 1:
+        return [make_password(password) for password in passwords]
+    workers = workers or settings.USER_IMPORT_HASH_WORKERS
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_hash_worker) as pool:
+        chunksize = max(1, len(passwords) // ((workers or 1) * 4))
+        return list(pool.map(_hash_password, passwords, chunksize=chunksize))
+
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def _validate_row(row, allowed_roles):
+    """Returns (field values, errors) for one input row."""
+    User = get_user_model()
+    if not isinstance(row, dict):
+        return dict.fromkeys(IMPORT_FIELDS, ""), {"non_field_errors": ["Expected an object of user fields."]}
+
+    errors = {}
+    values = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        if value is not None and not isinstance(value, str):
+            errors[field] = ["Must be a string."]
+            value = None
+        values[field] = _clean(value) or ""
+
+    email = values["email"]
+    if "email" in errors:
+        pass
+    elif not email:
+        errors["email"] = ["This field is required."]
+    else:
+        try:
+            validate_email(email)
+            values["email"] = User.objects.normalize_email(email)
+        except DjangoValidationError as exc:
+            errors["email"] = exc.messages
+
+    values["role"] = values["role"] or UserRole.CUSTOMER
+    if "role" in errors:
+        pass
+    elif values["role"] not in UserRole.values:
+        errors["role"] = [f"'{values['role']}' is not a valid role."]
+    elif values["role"] not in allowed_roles:
+        errors["role"] = [f"You cannot assign the {UserRole(values['role']).label} role."]
+
+    if "password" in errors:
+        pass
+    elif not values["password"]:
+        errors["password"] = ["This field is required."]
+    elif "email" not in errors:
+        candidate = User(
+            email=values["email"],
+            first_name=values["first_name"],
+            last_name=values["last_name"],
+        )
+        try:
+            validate_password(values["password"], user=candidate)
+        except DjangoValidationError as exc:
+            errors["password"] = exc.messages
+
+    values["phone_number"] = values["phone_number"] or None
+    return values, errors
+
+
+def import_users(rows, allowed_roles=None, workers=1, batch_size=500, dry_run=False):
+    """
+    Validates and creates users from ``rows`` (dicts keyed by IMPORT_FIELDS).
+
+    Returns a report with one entry per row: ``status`` is ``created``,
+    ``duplicate`` (email already registered or repeated in the input),
+    ``invalid`` (with ``errors``) or ``valid`` for a dry run. ``workers``
+    is passed to hash_passwords; ``None`` means USER_IMPORT_HASH_WORKERS.
+    """
+    User = get_user_model()
+    allowed_roles = set(allowed_roles or UserRole.values)
+    report = []
+    pending = []
+    seen_emails = set()
+
+    for row_number, row in enumerate(rows, start=1):
+        values, errors = _validate_row(row, allowed_roles)
+        entry = {"row": row_number, "email": values["email"]}
+        if errors:
+            entry.update(status="invalid", errors=errors)
+        elif values["email"].lower() in seen_emails:
+            entry.update(status="duplicate", errors={"email": ["Repeated earlier in the import."]})
+        else:
+            seen_emails.add(values["email"].lower())
+            pending.append((entry, values))
+        report.append(entry)
+
+    existing = set()
+    if pending:
+        existing = set(
+            User.objects.annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=[values["email"].lower() for _, values in pending])
+            .values_list("email_lower", flat=True)
+        )
+    to_create = []
+    for entry, values in pending:
+        if values["email"].lower() in existing:
+            entry.update(status="duplicate", errors={"email": ["A user with this email already exists."]})
+        else:
+            to_create.append((entry, values))
+
+    if dry_run:
+        for entry, _ in to_create:
+            entry["status"] = "valid"
+        return report
+
+    hashes = hash_passwords([values["password"] for _, values in to_create], workers=workers)
+    users = [
+        User(
+            email=values["email"],
+            password=password_hash,
+            first_name=values["first_name"],
+            last_name=values["last_name"],
+            phone_number=values["phone_number"],
+            role=values["role"],
+        )
+        for (_, values), password_hash in zip(to_create, hashes)
+    ]
+    created = 0
+    for start in range(0, len(users), batch_size):
+        batch = list(zip(to_create[start:start + batch_size], users[start:start + batch_size]))
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user in batch])
+        except IntegrityError:
+            # Another request registered one of these emails since the
+            # existence check; retry the batch row by row to find it.
+            for (entry, _), user in batch:
+                try:
+                    with transaction.atomic():
+                        User.objects.bulk_create([user])
+                except IntegrityError:
+                    entry.update(status="duplicate", errors={"email": ["A user with this email already exists."]})
+                else:
+                    entry.update(status="created", id=user.pk)
+                    created += 1
+        else:
+            for (entry, _), user in batch:
+                entry.update(status="created", id=user.pk)
+            created += len(batch)
+    # bulk_create sends no post_save signals.
+    if created:
+        bump_model_version(User)
+    return report
+
+
+def summarize(report):
+    summary = {}
+    for entry in report:
+        summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+    return summary
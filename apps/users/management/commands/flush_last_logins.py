@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.services import flush_last_logins
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes last-login timestamps buffered in the cache to the users table. "
+        "Only useful with a shared cache backend such as Redis."
+    )
+
+    def handle(self, *args, **options):
+        updated = flush_last_logins()
+        self.stdout.write(self.style.SUCCESS(f"Updated last_login for {updated} users."))
@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.importers import (
+    ImportFormatError,
+    SUPPORTED_FORMATS,
+    detect_format,
+    import_users,
+    read_rows,
+    summarize,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports users from a CSV (with header) or JSONL file. Passwords are "
+        "hashed across a process pool and users are inserted in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import.")
+        parser.add_argument(
+            "--format",
+            choices=SUPPORTED_FORMATS,
+            help="Input format; detected from the file extension by default.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Password hashing processes (default: USER_IMPORT_HASH_WORKERS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true", help="Validate without creating users.")
+        parser.add_argument(
+            "--report",
+            help="Write the per-row report as JSONL to this path.",
+        )
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or detect_format(options["path"])
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                rows = list(read_rows(stream, fmt))
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        report = import_users(
+            rows,
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            dry_run=options["dry_run"],
+        )
+
+        if options["report"]:
+            with open(options["report"], "w", encoding="utf-8") as handle:
+                for entry in report:
+                    handle.write(json.dumps(entry) + "\n")
+        else:
+            for entry in report:
+                if entry["status"] in ("invalid", "duplicate"):
+                    self.stdout.write(f"Row {entry['row']} ({entry['email']}): {entry['status']} {entry['errors']}")
+
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(summarize(report).items()))
+        self.stdout.write(self.style.SUCCESS(f"Processed {len(report)} rows: {summary or 'nothing to do'}."))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired outstanding and blacklisted JWTs in chunks. "
+        "Schedule it (e.g. daily) to keep the token_blacklist tables bounded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=10000,
+            help="Outstanding tokens deleted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        now = timezone.now()
+        # Expired rows are the oldest ones, so walking the primary key finds
+        # them without scanning the unexpired tail of the table.
+        expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by("pk")
+
+        outstanding_deleted = 0
+        blacklisted_deleted = 0
+        while True:
+            ids = list(expired.values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                break
+            blacklisted_deleted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+            outstanding_deleted += OutstandingToken.objects.filter(pk__in=ids).delete()[0]
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {outstanding_deleted} outstanding and "
+                f"{blacklisted_deleted} blacklisted expired tokens."
+            )
+        )
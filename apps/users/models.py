@@ -1,6 +1,9 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from apps.audit_logs.tracking import TrackedModelMixin
+
+
 class UserRole(models.TextChoices):
     WAREHOUSE_MANAGER = 'WM', _('Warehouse Manager')
     CUSTOMER = 'CU', _('Customer')
@@ -39,7 +42,7 @@ class UserManager(BaseUserManager):
         return self._create_user(email, password, **extra_fields)
 
 
-class User(AbstractUser):
+class User(TrackedModelMixin, AbstractUser):
     username = None
     email = models.EmailField(_('email address'), unique=True)
     role = models.CharField(
@@ -49,15 +52,42 @@ class User(AbstractUser):
         help_text=_('User role in the system')
     )
     phone_number = models.CharField(_('phone number'), max_length=20, blank=True, null=True)
+    token_version = models.PositiveIntegerField(
+        _('token version'),
+        default=0,
+        editable=False,
+        help_text=_('Embedded in issued JWTs; bumping it revokes every outstanding token.')
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = [] 
 
+    # Changing any of these invalidates the claims carried by issued tokens.
+    TOKEN_CLAIM_FIELDS = ('email', 'password', 'role', 'is_active', 'is_staff', 'is_superuser')
+
     objects = UserManager()
 
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            changed = self.get_changed_fields()
+            if any(field_name in changed for field_name in self.TOKEN_CLAIM_FIELDS):
+                self.token_version += 1
+                update_fields = kwargs.get('update_fields')
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Users built from token claims have most fields deferred; load them
+        # all on first access instead of one query per field.
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
\ No newline at end of file
@@ -1,10 +1,15 @@
 # apps/users/serializers.py
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from .models import UserRole
+from .authentication import TOKEN_VERSION_CLAIM
+from .services import get_token_version, record_last_login
+from .tokens import CachedRefreshToken
 
 User = get_user_model()
 
@@ -75,10 +80,60 @@ class ChangePasswordSerializer(serializers.Serializer):
         return user
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Issues tokens carrying the claims StatelessJWTAuthentication relies on.
+    Last-login timestamps are buffered and bulk-written (UPDATE_LAST_LOGIN
+    is off in SIMPLE_JWT) so logins do not each update the users table.
+    """
+    token_class = CachedRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        record_last_login(self.user)
+        return data
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
         token['email'] = user.email
         token['role'] = user.role
         token['first_name'] = user.first_name
-        return token
\ No newline at end of file
+        token['is_superuser'] = user.is_superuser
+        token['is_staff'] = user.is_staff
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Rejects refresh tokens minted before the user's token version was bumped
+    (role change, deactivation, password change), so stale claims cannot be
+    carried into new access tokens. The cached version check also covers the
+    active-user check, so versioned tokens refresh without loading the user.
+    """
+    token_class = CachedRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if TOKEN_VERSION_CLAIM not in refresh:
+            return super().validate(attrs)
+
+        current_version = get_token_version(refresh[api_settings.USER_ID_CLAIM])
+        if current_version != refresh[TOKEN_VERSION_CLAIM]:
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            # Blacklist before issuing anything: of two requests replaying the
+            # same token, only the one that blacklists it gets new tokens.
+            _, created = refresh.blacklist()
+            if not created:
+                raise AuthenticationFailed("Token is blacklisted", code="token_not_valid")
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        return data
@@ -0,0 +1,117 @@
+# apps/users/services.py
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.core.caching import cache_is_shared
+from apps.core.metrics import record_cache_lookup
+
+TOKEN_VERSION_CACHE_KEY = "users:token_version:{user_id}"
+# Cached for inactive users so their tokens never match a real version.
+INACTIVE_TOKEN_VERSION = -1
+
+
+def _token_version_key(user_id):
+    return TOKEN_VERSION_CACHE_KEY.format(user_id=user_id)
+
+
+def cache_token_version(user):
+    version = user.token_version if user.is_active else INACTIVE_TOKEN_VERSION
+    cache.set(_token_version_key(user.pk), version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def get_token_version(user_id):
+    """
+    Returns the current token version for a user, or None if the user does
+    not exist. Served from the cache; only a miss reads the users table.
+    """
+    key = _token_version_key(user_id)
+    version = cache.get(key)
+    record_cache_lookup("token_version", hit=version is not None)
+    if version is not None:
+        return version
+
+    User = get_user_model()
+    row = User.objects.filter(pk=user_id).values_list("token_version", "is_active").first()
+    if row is None:
+        return None
+    token_version, is_active = row
+    version = token_version if is_active else INACTIVE_TOKEN_VERSION
+    cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+
+LAST_LOGIN_KEY = "users:last_login:{user_id}"
+LAST_LOGIN_QUEUED_KEY = "users:last_login:queued:{user_id}"
+LAST_LOGIN_SLOT_KEY = "users:last_login:slot:{slot}"
+LAST_LOGIN_SEQUENCE_KEY = "users:last_login:sequence"
+LAST_LOGIN_FLUSHED_KEY = "users:last_login:flushed"
+LAST_LOGIN_FLUSH_LOCK_KEY = "users:last_login:flush_lock"
+# Buffered timestamps survive this long if nothing flushes them.
+LAST_LOGIN_RETENTION = 24 * 60 * 60
+
+
+def record_last_login(user, when=None):
+    """
+    Buffers a login timestamp in the cache instead of writing the users table.
+
+    Each user is queued at most once per flush: the timestamp key is simply
+    overwritten by later logins. The queue is a cache counter plus one slot
+    key per queued user, so it works on any backend that supports incr().
+    At most once per LAST_LOGIN_FLUSH_INTERVAL, the login that finds the
+    flush due writes the whole buffer with one bulk update.
+
+    Without a shared cache the buffer would die with the process (and the
+    flush_last_logins command could not see it), so the timestamp is
+    written straight away instead.
+    """
+    when = when or timezone.now()
+    if not cache_is_shared():
+        get_user_model().objects.filter(pk=user.pk).update(last_login=when)
+        return
+    interval = settings.LAST_LOGIN_FLUSH_INTERVAL
+    cache.set(LAST_LOGIN_KEY.format(user_id=user.pk), when, LAST_LOGIN_RETENTION)
+    # The queued marker expires on its own so a slot lost to eviction or a
+    # race with the flusher only delays, never drops, later updates.
+    if cache.add(LAST_LOGIN_QUEUED_KEY.format(user_id=user.pk), True, interval * 2):
+        cache.add(LAST_LOGIN_SEQUENCE_KEY, 0, None)
+        slot = cache.incr(LAST_LOGIN_SEQUENCE_KEY)
+        cache.set(LAST_LOGIN_SLOT_KEY.format(slot=slot), user.pk, LAST_LOGIN_RETENTION)
+
+    if cache.add(LAST_LOGIN_FLUSH_LOCK_KEY, True, interval):
+        flush_last_logins()
+
+
+def flush_last_logins():
+    """
+    Writes every buffered login timestamp to User.last_login in one
+    bulk_update and returns the number of users updated.
+    """
+    head = cache.get(LAST_LOGIN_SEQUENCE_KEY) or 0
+    flushed = cache.get(LAST_LOGIN_FLUSHED_KEY) or 0
+    if head < flushed:
+        # The sequence was evicted and restarted; start over from slot 1.
+        flushed = 0
+    if head == flushed:
+        return 0
+
+    slot_keys = [LAST_LOGIN_SLOT_KEY.format(slot=slot) for slot in range(flushed + 1, head + 1)]
+    user_ids = set(cache.get_many(slot_keys).values())
+    # Unqueue before reading timestamps: a login racing with this flush then
+    # queues itself again rather than being dropped.
+    cache.delete_many([LAST_LOGIN_QUEUED_KEY.format(user_id=user_id) for user_id in user_ids])
+    timestamps = cache.get_many([LAST_LOGIN_KEY.format(user_id=user_id) for user_id in user_ids])
+    cache.set(LAST_LOGIN_FLUSHED_KEY, head, None)
+    cache.delete_many(slot_keys)
+
+    User = get_user_model()
+    users = []
+    for user_id in user_ids:
+        when = timestamps.get(LAST_LOGIN_KEY.format(user_id=user_id))
+        if when is not None:
+            users.append(User(pk=user_id, last_login=when))
+    User.objects.bulk_update(users, ["last_login"], batch_size=500)
+    return len(users)
@@ -0,0 +1,37 @@
+# apps/users/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.core.caching import bump_model_version_receiver
+
+from .services import cache_token_version
+from .tokens import remember_token_state
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def refresh_cached_token_version(sender, instance, **kwargs):
+    """Keeps the cached token version in step with the users table."""
+    if "token_version" in instance.__dict__ and "is_active" in instance.__dict__:
+        cache_token_version(instance)
+
+
+# Cached responses (user lookups, nested created_by users) depend on users.
+post_save.connect(bump_model_version_receiver, sender=User, dispatch_uid="bump_version_User")
+post_delete.connect(bump_model_version_receiver, sender=User, dispatch_uid="bump_version_User")
+
+
+@receiver(post_save, sender=OutstandingToken)
+def remember_outstanding_token(sender, instance, created, **kwargs):
+    if created:
+        remember_token_state(instance.jti, instance.expires_at, blacklisted=False)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def remember_blacklisted_token(sender, instance, created, **kwargs):
+    # Deleting a blacklist row does not clear the cache; the entry simply
+    # expires with the token.
+    remember_token_state(instance.token.jti, instance.token.expires_at, blacklisted=True)
@@ -0,0 +1,93 @@
+# apps/users/tokens.py
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from apps.core.caching import cache_is_shared
+from apps.core.metrics import record_cache_lookup
+
+from .services import get_token_version
+
+BLACKLIST_CACHE_KEY = "users:jwt_blacklisted:{jti}"
+
+
+def _blacklist_key(jti):
+    return BLACKLIST_CACHE_KEY.format(jti=jti)
+
+
+def _seconds_until(expires_at):
+    return max(int((expires_at - timezone.now()).total_seconds()), 1)
+
+
+def remember_token_state(jti, expires_at, blacklisted):
+    """
+    Caches whether a refresh token is blacklisted until the token expires.
+    A known "not blacklisted" state never overwrites a blacklisted one, and
+    is only cached in a shared cache: a per-process cache would keep
+    answering "not blacklisted" after another worker blacklisted the token.
+    """
+    if expires_at <= timezone.now():
+        return
+    if blacklisted:
+        cache.set(_blacklist_key(jti), True, _seconds_until(expires_at))
+    elif cache_is_shared():
+        cache.add(_blacklist_key(jti), False, _seconds_until(expires_at))
+
+
+def is_token_blacklisted(jti, expires_at):
+    """
+    Answers from the cache when the token's state is known (it is recorded
+    when the token is issued and when it is blacklisted), so the blacklist
+    tables are only queried for tokens the cache has not seen. Without a
+    shared cache only "blacklisted" is cached, so every other check queries
+    the blacklist table.
+    """
+    state = cache.get(_blacklist_key(jti))
+    record_cache_lookup("token_blacklist", hit=state is not None)
+    if state is not None:
+        return state
+    blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    remember_token_state(jti, expires_at, blacklisted)
+    return blacklisted
+
+
+class CachedRefreshToken(RefreshToken):
+    """
+    Refresh token whose blacklist check goes through the cache, and which
+    records outstanding/blacklisted rows by user id instead of loading the
+    user first.
+    """
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if is_token_blacklisted(jti, datetime_from_epoch(self.payload["exp"])):
+            raise TokenError(_("Token is blacklisted"))
+
+    def _outstanding_defaults(self):
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None and get_token_version(user_id) is None:
+            user_id = None
+        return {
+            "user_id": user_id,
+            "created_at": self.current_time,
+            "token": str(self),
+            "expires_at": datetime_from_epoch(self.payload["exp"]),
+        }
+
+    def outstand(self):
+        return OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults=self._outstanding_defaults(),
+        )
+
+    def blacklist(self):
+        token, _ = OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults=self._outstanding_defaults(),
+        )
+        return BlacklistedToken.objects.get_or_create(token=token)
@@ -13,8 +13,22 @@ from .serializers import (
     UserDetailSerializer,
     ChangePasswordSerializer,
 )
-from .permissions import CanManageUser, IsOwnerOrAdminOrSuperuser
+from .permissions import (
+    CanManageUser,
+    IsOwnerOrAdminOrSuperuser,
+    IsAdminUserRole,
+    IsWarehouseManagerRole,
+)
 from .models import UserRole
+from .importers import (
+    ImportFormatError,
+    SUPPORTED_FORMATS,
+    import_users,
+    read_uploaded_file,
+    summarize,
+)
+from apps.audit_logs.services import create_action_log
+from apps.core.caching import CachedResponseMixin
 from django.contrib.auth import logout as django_logout
 
 User = get_user_model()
@@ -26,10 +40,13 @@ class UserRegistrationView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     queryset = User.objects.all().order_by("email")
     serializer_class = UserDetailSerializer
     permission_classes = [IsAuthenticated, CanManageUser]
+    cache_models = (User,)
+    # Lookups are scoped by the requester's role.
+    cache_per_user = True
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -125,6 +142,58 @@ class UserViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-import",
+        permission_classes=[IsAuthenticated, (IsAdminUserRole | IsWarehouseManagerRole)],
+    )
+    def bulk_import(self, request):
+        """
+        Creates many users at once.
+
+        Send either a multipart `file` (CSV with a header row, or JSONL) with
+        an optional `format` of csv/jsonl, or a JSON body {"users": [...]}.
+        Each record takes email, password, first_name, last_name,
+        phone_number and role. Set `dry_run` to validate without creating.
+        Returns a summary and one report entry per row.
+        """
+        upload = request.FILES.get("file")
+        fmt = request.data.get("format") or None
+        if fmt and fmt not in SUPPORTED_FORMATS:
+            return Response(
+                {"format": f"Use one of: {', '.join(SUPPORTED_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            if upload is not None:
+                rows = read_uploaded_file(upload, fmt)
+            else:
+                rows = request.data.get("users")
+                if not isinstance(rows, list):
+                    return Response(
+                        {"error": "Upload a file or send a 'users' list."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+        except (ImportFormatError, UnicodeDecodeError) as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.user.is_superuser or request.user.role == UserRole.ADMIN:
+            allowed_roles = UserRole.values
+        else:
+            allowed_roles = [UserRole.CUSTOMER, UserRole.DISPATCHER]
+
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+        report = import_users(rows, allowed_roles=allowed_roles, dry_run=dry_run)
+        summary = summarize(report)
+        if not dry_run and summary.get("created"):
+            create_action_log(
+                user=request.user,
+                action_verb="USERS_BULK_IMPORTED",
+                details={"rows": len(report), **summary},
+            )
+        return Response({"summary": summary, "rows": report}, status=status.HTTP_200_OK)
+
     def perform_create(self, serializer):
         requesting_user = self.request.user
         role_to_assign = serializer.validated_data.get("role", UserRole.CUSTOMER)
@@ -0,0 +1,14 @@
+# config/gunicorn.conf.py
+# gunicorn -c config/gunicorn.conf.py config.wsgi:application
+#
+# With PROMETHEUS_MULTIPROC_DIR set, every worker writes its metric samples
+# to that directory and /metrics aggregates them; samples of workers that
+# exit are folded into the totals here.
+import os
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     "corsheaders",  
     "drf_yasg",  
     "django_filters",
+    "apps.core.apps.CoreConfig",
     "apps.users.apps.UsersConfig",
     "apps.inventory.apps.InventoryConfig",
     "apps.containers.apps.ContainersConfig",
@@ -68,15 +69,19 @@ CORS_ALLOW_HEADERS = [
 ]
 
 MIDDLEWARE = [
+    "apps.core.middleware.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "apps.core.middleware.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.core.middleware.ReplicaRoutingMiddleware",
+    "apps.audit_logs.middleware.AuditContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "apps.core.middleware.AsyncWhiteNoiseMiddleware",
 ]
 
 ROOT_URLCONF = (
@@ -124,6 +129,18 @@ else:
         
     }
 
+# Optional read replica. When set, safe-method API requests read from it
+# (see apps.core.routers); clients who just wrote stay on the primary for
+# DATABASE_REPLICA_PIN_SECONDS so they read their own writes. The pin is a
+# signed cookie, plus a per-user cache entry when the cache is shared.
+DATABASE_REPLICAS = []
+if os.getenv("DATABASE_REPLICA_URL"):
+    DATABASES["replica"] = dj_database_url.parse(os.getenv("DATABASE_REPLICA_URL"))
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS = ["replica"]
+DATABASE_ROUTERS = ["apps.core.routers.PrimaryReplicaRouter"]
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DATABASE_REPLICA_PIN_SECONDS", "10"))
+
 # DATABASES = {
 #     "default": dj_database_url.config(
 #         default=os.getenv("DATABASE_URL")
@@ -180,21 +197,65 @@ AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': ( 
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': ( 
         'rest_framework.permissions.AllowAny',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.EstimatedPageNumberPagination',
 }
 
+# orjson-backed JSON rendering and parsing (falls back to the standard library
+# encoder when orjson isn't installed). Set API_FAST_JSON=false to use DRF's
+# stock JSON classes. `manage.py benchmark_json` compares the two.
+if os.getenv("API_FAST_JSON", "true").lower() == "true":
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = (
+        'apps.core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = (
+        'apps.core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    )
+
+# Above this many rows (per the PostgreSQL planner estimate) paginators report
+# the estimate instead of running an exact COUNT(*).
+PAGINATION_ESTIMATE_THRESHOLD = int(os.getenv("PAGINATION_ESTIMATE_THRESHOLD", "100000"))
+
+# Per-request SQL accounting (apps.core.middleware.QueryBudgetMiddleware):
+# query count and time go in a Server-Timing header, and requests running more
+# queries than their view's `query_budget` (or this default) are logged.
+QUERY_BUDGET_ENABLED = os.getenv("QUERY_BUDGET_ENABLED", str(DEBUG)).lower() == "true"
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERY_BUDGET_DEFAULT", "25"))
+
+# Prometheus metrics (apps.core.metrics), scraped from /metrics. Scrapers must
+# send `Authorization: Bearer <METRICS_TOKEN>`; while no token is set, only
+# requests from the local host (127.0.0.1 / ::1) are answered, others get 403.
+# Under gunicorn, also set PROMETHEUS_MULTIPROC_DIR (see config/gunicorn.conf.py).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Rows fetched per database round trip by the streaming `export` endpoints.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+# Stock rows are updated with compare-and-swap on ProductStock.version; an
+# update that keeps losing to concurrent writers gives up after this many tries.
+STOCK_UPDATE_RETRIES = int(os.getenv("STOCK_UPDATE_RETRIES", "5"))
+
+# Shipments created as Pending Confirmation hold their stock for this long;
+# release_expired_reservations gives back holds that were never confirmed.
+STOCK_RESERVATION_TTL_MINUTES = int(os.getenv("STOCK_RESERVATION_TTL_MINUTES", "30"))
+
 # Simple JWT settings
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
-    "UPDATE_LAST_LOGIN": True,
+    # Last-login timestamps are buffered in the cache and bulk-written by
+    # MyTokenObtainPairSerializer instead (see LAST_LOGIN_FLUSH_INTERVAL).
+    "UPDATE_LAST_LOGIN": False,
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,  # Uses the Django SECRET_KEY
     "VERIFYING_KEY": None,
@@ -211,10 +272,63 @@ SIMPLE_JWT = {
     "TOKEN_TYPE_CLAIM": "token_type",
     "TOKEN_USER_CLASS": "rest_framework_simplejwt.models.TokenUser",
     "JTI_CLAIM": "jti",
-    # If you want to add custom claims like 'role' to the token payload:
-    # 'TOKEN_OBTAIN_SERIALIZER': 'apps.users.serializers.MyTokenObtainPairSerializer',
+    # Embeds role, is_superuser and the token version so authentication can
+    # skip the users-table lookup (see apps.users.authentication).
+    "TOKEN_OBTAIN_SERIALIZER": "apps.users.serializers.MyTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.users.serializers.MyTokenRefreshSerializer",
 }
 
+# How long a user's token version is cached before re-reading the users table.
+# Bumps are written to the cache immediately; with a per-process cache, other
+# workers notice within this window.
+TOKEN_VERSION_CACHE_TIMEOUT = int(os.getenv("TOKEN_VERSION_CACHE_TIMEOUT", "300"))
+
+# Seconds between bulk writes of buffered last-login timestamps. The
+# `flush_last_logins` command can also be scheduled to flush on a timer.
+# Buffering needs a shared cache (REDIS_URL); otherwise logins are written
+# to the users table directly.
+LAST_LOGIN_FLUSH_INTERVAL = int(os.getenv("LAST_LOGIN_FLUSH_INTERVAL", "60"))
+
+# Caches. With REDIS_URL set, the default cache and the response cache live in
+# Redis (django-redis) and are shared by every worker; otherwise each process
+# gets its own in-memory cache.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        },
+        "responses": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "responses",
+            "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
+        },
+    }
+else:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "responses": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "responses",
+        },
+    }
+
+# Versioned response cache for reference-data endpoints (apps.core.caching):
+# the shared tier, its timeout in seconds, and the per-process LRU size and
+# timeout. Model versions live in the default cache, so responses are only
+# cached when it is shared (REDIS_URL set).
+RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "600"))
+RESPONSE_CACHE_LRU_SIZE = int(os.getenv("RESPONSE_CACHE_LRU_SIZE", "512"))
+RESPONSE_CACHE_LRU_TIMEOUT = int(os.getenv("RESPONSE_CACHE_LRU_TIMEOUT", "30"))
+
+# Processes used to hash passwords in the import_users command (the
+# bulk_import endpoint always hashes in-process).
+USER_IMPORT_HASH_WORKERS = int(os.getenv("USER_IMPORT_HASH_WORKERS", str(os.cpu_count() or 1)))
+
 # Celery Configuration (Basic - adjust broker URL as needed)
 # Ensure Redis server is running if you use it as a broker
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
@@ -224,6 +338,17 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE  # Use Django's timezone
 
+# Audit log retention
+# ActionLog is partitioned by month on PostgreSQL; months older than the
+# retention window are archived to gzipped JSONL and dropped by the
+# `archive_action_logs` management command (run it daily from cron/beat).
+AUDIT_LOG_RETENTION_MONTHS = int(os.getenv("AUDIT_LOG_RETENTION_MONTHS", "12"))
+AUDIT_LOG_PARTITIONS_AHEAD = int(os.getenv("AUDIT_LOG_PARTITIONS_AHEAD", "3"))
+AUDIT_LOG_ARCHIVE_DIR = os.getenv("AUDIT_LOG_ARCHIVE_DIR", str(BASE_DIR / "archive" / "audit_logs"))
+# Look-back window of the action log API for `?recent=true` requests that
+# give no `since`; without either, the API lists every log.
+AUDIT_LOG_DEFAULT_WINDOW_DAYS = int(os.getenv("AUDIT_LOG_DEFAULT_WINDOW_DAYS", "30"))
+
 # Email Configuration (Example for console backend during development)
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 # For production, configure SMTP settings: